@@ -1,5 +1,73 @@
+import numpy as np
 from numpy import where, nan
-from pandas import isna, DataFrame
+from pandas import isna, concat, DataFrame
+
+
+def thresholds(variation, scheme: str = 'binario', dead_band=None):
+    """
+    Calcula os limites das classes de `classify` sobre todo o histórico de cada coluna.
+
+    Args:
+        variation (array): Variações com formato (dias,) ou (dias, horizontes). NaN indica alvo ausente.
+        scheme (str): Esquema de classes ('binario', 'ternario', 'quaternario' ou 'quinario').
+        dead_band (float): Limite da zona neutra do esquema ternário. Se informado, é retornado sem alteração.
+
+    Returns:
+        O limite da zona neutra (esquema ternário), os limites dos quantis com formato (k - 1,) ou
+        (k - 1, horizontes) (esquemas quaternário e quinário) ou None (esquema binário).
+    """
+    variation = np.asarray(variation, dtype=np.float64)
+    if scheme == 'ternario':
+        return np.nanquantile(np.abs(variation), 1 / 3, axis=0) if dead_band is None else dead_band
+    if scheme in Alvos.QUANTILES:
+        k = Alvos.QUANTILES[scheme]
+        return np.nanquantile(variation, np.arange(1, k) / k, axis=0)
+    if scheme != 'binario':
+        raise ValueError(f"Esquema de alvo '{scheme}' inválido. Opções: {Alvos.SCHEMES}")
+    return None
+
+
+def classify(variation, scheme: str = 'binario', dead_band=None, limits=None) -> np.ndarray:
+    """
+    Converte variações absolutas em classes inteiras (int8), coluna a coluna.
+
+    - 'binario': 0 (queda ou estável) e 1 (alta).
+    - 'ternario': 0 (queda), 1 (dentro da zona neutra `|variação| <= dead_band`) e 2 (alta).
+    - 'quaternario' e 'quinario': quartis e quintis da variação (0 = menores variações).
+
+    Se `limits` não for informado, os limites da zona neutra e dos quantis são calculados sobre todo o
+    histórico de cada coluna (ver `thresholds`).
+
+    Args:
+        variation (array): Variações com formato (dias,) ou (dias, horizontes). NaN indica alvo ausente.
+        scheme (str): Esquema de classes ('binario', 'ternario', 'quaternario' ou 'quinario').
+        dead_band (float): Limite da zona neutra do esquema ternário. Se None, usa o tercil de `|variação|`
+            de cada coluna, o que deixa cerca de um terço dos dias na classe neutra.
+        limits: Limites já ajustados, no formato de `thresholds`. Permite classificar novas variações
+            com os mesmos limites do histórico (atualização incremental).
+
+    Returns:
+        np.ndarray: Classes com o mesmo formato de `variation`; -1 onde a variação é ausente.
+    """
+    variation = np.asarray(variation, dtype=np.float64)
+    missing = np.isnan(variation)
+    if limits is None:
+        limits = thresholds(variation, scheme, dead_band)
+
+    if scheme == 'binario':
+        codes = variation > 0
+    elif scheme == 'ternario':
+        dead_band = np.asarray(limits, dtype=np.float64)
+        codes = np.where(variation > dead_band, 2, np.where(variation < -dead_band, 0, 1))
+    elif scheme in Alvos.QUANTILES:
+        # Código = número de limites menores ou iguais à variação (uma comparação vetorizada por limite)
+        codes = np.zeros(variation.shape, dtype=np.int8)
+        for edge in np.asarray(limits, dtype=np.float64):
+            codes += variation >= edge
+    else:
+        raise ValueError(f"Esquema de alvo '{scheme}' inválido. Opções: {Alvos.SCHEMES}")
+
+    return np.where(missing, -1, codes).astype(np.int8)
 
 
 class Alvos:
@@ -13,15 +81,34 @@ class Alvos:
     Atributos:
         df (DataFrame): DataFrame contendo os dados de preços, incluindo as colunas 'Close' e 'Open'.
         p (int): Número de períodos para deslocamento dos alvos.
+        dead_band (float): Limite da zona neutra do alvo ternário (ver `classify`).
+        limits (dict): Limites já ajustados dos alvos multiclasse, {coluna do alvo: limites}.
+        copy (bool): Se False, as colunas de alvo são adicionadas ao próprio DataFrame recebido.
+
+    Os limites usados pelos alvos multiclasse ficam registrados em `df.attrs['limites']`, no mesmo
+    formato de `limits`, para que `update` classifique as novas barras com os mesmos limites.
     """
 
-    def __init__(self, df: DataFrame, p: int):
+    SCHEMES = ('binario', 'ternario', 'quaternario', 'quinario')
+    QUANTILES = {'quaternario': 4, 'quinario': 5}
+    # Número de classes de cada esquema
+    CLASSES = {'binario': 2, 'ternario': 3, **QUANTILES}
+    # Esquema de classes de cada tipo de alvo (propriedades desta classe)
+    TARGET_TYPES = {'A_BINARIO': 'binario', 'B_TERNARIO': 'ternario', 'C_QUATERNARIO': 'quaternario',
+                    'D_QUINARIO': 'quinario'}
+
+    def __init__(self, df: DataFrame, p: int, dead_band=None, copy: bool = True, limits: dict = None):
         """
         Inicializa a classe Alvos com o DataFrame de preços e o período de deslocamento.
 
         Args:
             df (DataFrame): DataFrame contendo os dados de preços.
             p (int): Número de períodos para deslocar os alvos.
+            dead_band (float): Limite da zona neutra do alvo ternário. Se None, usa o tercil de `|variação|`.
+            copy (bool): Se False, não copia o DataFrame: as novas colunas são adicionadas a ele. Use
+                `df.copy(deep=False)` para obter um DataFrame próprio sem copiar os dados de preço.
+            limits (dict): Limites já ajustados, {coluna do alvo: limites} (ex.: `df.attrs['limites']` de
+                um DataFrame calculado anteriormente). Se None, são calculados sobre todo o histórico.
 
         Raises:
             ValueError: Se o DataFrame não contém as colunas 'Close' e 'Open'.
@@ -34,15 +121,15 @@ class Alvos:
         if not isinstance(p, int) or p <= 0:
             raise ValueError("O parâmetro 'p' deve ser um número inteiro positivo.")
 
-        self.df = df.copy() 
+        self.df = df.copy() if copy else df
         self.p = p
+        self.dead_band = dead_band
+        self.limits = limits or {}
 
-        self.df['date_target'] = df.index
-        self.df['date_target'] = self.df['date_target'].shift(-p)
+        self.df['date_target'] = self.df.index.to_series(index=self.df.index).shift(-p)
         
         # Calcula a variação absoluta (Close - Open) e a desloca para o futuro
-        self.df['variacao_absoluta'] = self.df['Close'] - self.df['Open']
-        self.df['variacao_absoluta'] = self.df['variacao_absoluta'].shift(-p)
+        self.df['variacao_absoluta'] = (self.df['Close'] - self.df['Open']).shift(-p)
 
     def _correct_last_value(self, name_alvo: str) -> DataFrame:
         """
@@ -72,32 +159,167 @@ class Alvos:
         self.df['alvo_binario'] = where(self.df['variacao_absoluta'] > 0, 1, 0)
         return self._correct_last_value('alvo_binario')
 
+    def _multiclass(self, scheme: str) -> DataFrame:
+        """
+        Adiciona a coluna 'alvo_<scheme>' com as classes de `classify` (NaN onde a variação é ausente).
+
+        Args:
+            scheme (str): Esquema de classes ('ternario', 'quaternario' ou 'quinario').
+
+        Returns:
+            DataFrame: DataFrame com a coluna do alvo adicionada.
+        """
+        column = f'alvo_{scheme}'
+        variation = self.df['variacao_absoluta'].to_numpy()
+        limits = self.limits.get(column)
+        if limits is None:
+            limits = thresholds(variation, scheme, self.dead_band)
+
+        codes = classify(variation, scheme, limits=limits)
+        self.df[column] = where(codes >= 0, codes, nan)
+        # Limites como float/lista: os attrs são comparados com `==` quando DataFrames são concatenados
+        self.df.attrs['limites'] = {**self.df.attrs.get('limites', {}), column: np.asarray(limits).tolist()}
+        return self.df
+
     @property
     def B_TERNARIO(self) -> DataFrame:
         """
-        Placeholder para o cálculo de um alvo ternário.
+        Calcula o alvo ternário: queda (0), zona neutra (1) e alta (2).
 
         Retorna:
-            DataFrame: DataFrame com a lógica do alvo ternário aplicada (não implementado).
+            DataFrame: DataFrame com a coluna 'alvo_ternario' adicionada.
         """
-        raise NotImplementedError("O método 'B_TERNARIO' ainda não foi implementado.")
+        return self._multiclass('ternario')
 
     @property
     def C_QUATERNARIO(self) -> DataFrame:
         """
-        Placeholder para o cálculo de um alvo quaternário.
+        Calcula o alvo quaternário: quartil da variação absoluta (0 a 3).
 
         Retorna:
-            DataFrame: DataFrame com a lógica do alvo quaternário aplicada (não implementado).
+            DataFrame: DataFrame com a coluna 'alvo_quaternario' adicionada.
         """
-        raise NotImplementedError("O método 'C_QUATERNARIO' ainda não foi implementado.")
+        return self._multiclass('quaternario')
 
     @property
     def D_QUINARIO(self) -> DataFrame:
         """
-        Placeholder para o cálculo de um alvo quinário.
+        Calcula o alvo quinário: quintil da variação absoluta (0 a 4).
 
         Retorna:
-            DataFrame: DataFrame com a lógica do alvo quinário aplicada (não implementado).
+            DataFrame: DataFrame com a coluna 'alvo_quinario' adicionada.
+        """
+        return self._multiclass('quinario')
+
+    @classmethod
+    def build(cls, df: DataFrame, horizons, schemes=SCHEMES, dead_band=None) -> DataFrame:
+        """
+        Calcula os alvos de vários horizontes e esquemas em uma única passagem vetorizada.
+
+        A variação `Close - Open` é calculada uma vez e deslocada para todos os horizontes ao mesmo tempo
+        (matriz dias x horizontes). Os dados de preço não são copiados: o resultado contém apenas as
+        colunas de alvo, que podem ser unidas ao DataFrame original quando necessário.
+
+        Args:
+            df (DataFrame): DataFrame com as colunas 'Close' e 'Open'.
+            horizons (list[int]): Horizontes (períodos de deslocamento) dos alvos.
+            schemes (tuple[str]): Esquemas de classes (ver `classify`).
+            dead_band (float): Limite da zona neutra do esquema ternário.
+
+        Returns:
+            DataFrame: Colunas int8 'alvo_<esquema>_<horizonte>', com -1 onde o alvo ainda não é conhecido.
+        """
+        if not {'Close', 'Open'}.issubset(df.columns):
+            raise ValueError("O DataFrame deve conter as colunas 'Close' e 'Open'.")
+        horizons = np.asarray(horizons, dtype=np.int64)
+        if horizons.ndim != 1 or (horizons <= 0).any():
+            raise ValueError("Os horizontes devem ser números inteiros positivos.")
+
+        n = len(df)
+        variation = np.append(df['Close'].to_numpy(np.float64) - df['Open'].to_numpy(np.float64), nan)
+
+        # Variação deslocada de cada horizonte: posições além do fim apontam para o NaN final
+        positions = np.minimum(np.arange(n)[:, None] + horizons[None, :], n)
+        shifted = variation[positions]
+
+        columns = {}
+        for scheme in schemes:
+            codes = classify(shifted, scheme, dead_band)
+            columns.update({f'alvo_{scheme}_{h}': codes[:, i] for i, h in enumerate(horizons)})
+        return DataFrame(columns, index=df.index)
+
+    @classmethod
+    def paths(cls, open_, close, p: int, target_type: str = 'A_BINARIO', dead_band=None):
+        """
+        Calcula a variação e o alvo de várias trajetórias de preço de uma vez, direto em arrays NumPy.
+
+        Cada coluna é uma trajetória e recebe o mesmo alvo que `getattr(Alvos(df, p), target_type)`
+        calcularia para ela (os limites dos alvos multiclasse são calculados por trajetória).
+
+        Args:
+            open_ (array): Aberturas com formato (dias, trajetórias).
+            close (array): Fechamentos com formato (dias, trajetórias).
+            p (int): Número de períodos para deslocar os alvos.
+            target_type (str): Tipo de alvo (uma das chaves de `TARGET_TYPES`).
+            dead_band (float): Limite da zona neutra do alvo ternário.
+
+        Returns:
+            tuple: (variação, alvo), arrays (dias, trajetórias) em float64 e int8; a variação é NaN e o
+            alvo é -1 nas últimas `p` linhas, cujo alvo ainda não é conhecido.
+        """
+        if target_type not in cls.TARGET_TYPES:
+            raise ValueError(f"Tipo de alvo '{target_type}' inválido. Opções: {list(cls.TARGET_TYPES)}")
+        if not isinstance(p, int) or p <= 0:
+            raise ValueError("O parâmetro 'p' deve ser um número inteiro positivo.")
+
+        difference = np.asarray(close, dtype=np.float64) - np.asarray(open_, dtype=np.float64)
+        variation = np.full(difference.shape, nan)
+        variation[:-p] = difference[p:]
+        return variation, classify(variation, cls.TARGET_TYPES[target_type], dead_band)
+
+    @classmethod
+    def update(cls, previous: DataFrame, new: DataFrame, p: int, target_type: str = 'A_BINARIO',
+               dead_band=None) -> DataFrame:
+        """
+        Atualiza de forma incremental um DataFrame já processado com novas barras de preço.
+
+        Somente as últimas `p` linhas de `previous` (cujo alvo dependia de barras ainda não disponíveis)
+        e as linhas novas são recalculadas, em vez de todo o histórico. Colunas adicionais de
+        `previous` (por exemplo, features) ficam com NaN nas linhas novas.
+
+        Os alvos multiclasse da cauda são classificados com os limites do histórico de `previous`
+        (`previous.attrs['limites']`), e não com quantis de poucas linhas. O resultado é igual ao de
+        `getattr(Alvos(precos, p, limits=previous.attrs['limites']), target_type)` sobre todo o histórico.
+        Para reajustar os limites com as novas barras, recalcule os alvos por completo.
+
+        Args:
+            previous (DataFrame): DataFrame retornado anteriormente por um dos alvos desta classe.
+            new (DataFrame): Novas barras de preço. Linhas com datas já presentes em `previous` são ignoradas.
+            p (int): Número de períodos para deslocamento dos alvos.
+            target_type (str): Nome do alvo a ser calculado (ex.: 'A_BINARIO').
+            dead_band (float): Limite da zona neutra do alvo ternário, usado apenas se `previous` não
+                registra os seus limites (nesse caso, eles são recalculados sobre `previous`).
+
+        Returns:
+            DataFrame: Novo DataFrame com as linhas novas adicionadas e os alvos finais corrigidos.
         """
-        raise NotImplementedError("O método 'D_QUINARIO' ainda não foi implementado.")
+        new = new[new.index > previous.index[-1]]
+        if new.empty:
+            return previous
+
+        limits = dict(previous.attrs.get('limites', {}))
+        scheme = cls.TARGET_TYPES.get(target_type, 'binario')
+        column = f'alvo_{scheme}'
+        if scheme != 'binario' and column not in limits:
+            limits[column] = np.asarray(thresholds(previous['variacao_absoluta'], scheme, dead_band)).tolist()
+
+        # Recalcula os alvos da cauda: as últimas `p` linhas anteriores mais as novas barras
+        tail = getattr(cls(concat([previous[new.columns].iloc[-p:], new]), p, limits=limits), target_type)
+        targets = [c for c in tail.columns if c not in new.columns]
+
+        df = concat([previous, tail.iloc[-len(new):]])
+        for column in targets:
+            df.iloc[-len(tail):, df.columns.get_loc(column)] = tail[column].to_numpy()
+        if limits:
+            df.attrs['limites'] = limits
+        return df
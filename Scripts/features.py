@@ -1,31 +1,256 @@
 
 
-from pandas import DataFrame
-from typing import Union, List
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from pandas import DataFrame, Series
+from typing import Callable, Dict, Iterable, Optional, Union, List
+
+
+# -----------------------------------------------------------------------------------------
+
+# Kernels de estatísticas móveis em NumPy
+
+# As funções abaixo operam sobre arrays float64/float32 (1-D ou 2-D, com o tempo no eixo 0) usando
+# uma visão de janelas deslizantes, sem cópia dos dados. As estatísticas de uma mesma janela são
+# calculadas juntas, e o resultado segue a convenção do pandas `rolling(window)`: as primeiras
+# `window - 1` linhas e as janelas com valores ausentes são NaN. Os quantis são idênticos aos do pandas;
+# soma, média e desvio padrão diferem apenas por arredondamento (ver `rolling_moments`) e, por isso, só são
+# usados pelas features com `Features.NUMPY_MOMENTS = True`.
+
+def _windows(values, window: int):
+    """
+    Retorna o array de entrada (float) e a visão das janelas deslizantes, com a janela no último eixo.
+    """
+    if not isinstance(window, (int, np.integer)) or window <= 0:
+        raise ValueError("O parâmetro 'window' deve ser um número inteiro positivo.")
+
+    values = np.asarray(values)
+    if values.dtype.kind != 'f':
+        values = values.astype(np.float64)
+
+    if len(values) < window:
+        return values, None
+    return values, sliding_window_view(values, window, axis=0)
+
+
+def _pad(result: np.ndarray, values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Preenche com NaN as primeiras `window - 1` linhas, alinhando o resultado com a entrada.
+    """
+    output = np.full(values.shape, np.nan, dtype=values.dtype)
+    if result is not None:
+        output[window - 1:] = result
+    return output
+
+
+def rolling_moments(values, window: int) -> Dict[str, np.ndarray]:
+    """
+    Calcula soma, média e desvio padrão amostral móveis em uma única passagem pelas janelas.
+
+    Cada janela é somada por inteiro (e o desvio padrão usa duas passagens sobre a janela), enquanto o
+    pandas atualiza somas acumuladas a cada linha. Por isso os resultados não são bit a bit iguais aos do
+    `rolling` do pandas:
+    - soma e média: diferença absoluta de no máximo 1e-12 vezes a soma dos |valores| da janela;
+    - desvio padrão: igual, até o arredondamento (tolerância relativa de 1e-12), ao desvio padrão de cada
+      janela calculado isoladamente. A diferença em relação ao pandas vem do algoritmo online dele, que
+      acumula erro com o tamanho e o nível da série (em 5 mil barras de preço, até cerca de 1e-8 vezes o
+      maior |valor| da janela, com janela 2).
+
+    Como essas diferenças mudariam as features já calculadas (e os modelos treinados com elas), `Features`
+    usa o `rolling` do pandas por padrão e só usa esta função com `Features.NUMPY_MOMENTS = True`.
+
+    Args:
+        values (array): Dados de entrada (1-D ou 2-D, com o tempo no eixo 0).
+        window (int): Tamanho da janela.
+
+    Returns:
+        dict: {'sum', 'mean', 'std'} com arrays do mesmo formato da entrada.
+    """
+    values, windows = _windows(values, window)
+    if windows is None:
+        return {name: _pad(None, values, window) for name in ('sum', 'mean', 'std')}
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        total = windows.sum(axis=-1)
+        mean = total / window
+        deviation = windows - mean[..., None]
+        std = np.sqrt((deviation * deviation).sum(axis=-1) / (window - 1))
+
+    return {
+        'sum': _pad(total, values, window),
+        'mean': _pad(mean, values, window),
+        'std': _pad(std, values, window),
+    }
+
+
+def rolling_quantiles(values, window: int, quantiles: Iterable[float]) -> Dict[float, np.ndarray]:
+    """
+    Calcula quantis móveis (interpolação linear, como no pandas) ordenando cada janela uma única vez.
+
+    Args:
+        values (array): Dados de entrada (1-D ou 2-D, com o tempo no eixo 0).
+        window (int): Tamanho da janela.
+        quantiles (Iterable[float]): Quantis desejados, entre 0 e 1.
+
+    Returns:
+        dict: {quantil: array do mesmo formato da entrada}.
+    """
+    quantiles = list(quantiles)
+    if any(not 0 <= q <= 1 for q in quantiles):
+        raise ValueError("Os quantis devem estar entre 0 e 1.")
+
+    values, windows = _windows(values, window)
+    if windows is None:
+        return {q: _pad(None, values, window) for q in quantiles}
+
+    ordered = np.sort(windows, axis=-1)
+    missing = np.isnan(ordered[..., -1])  # NaN é ordenado para o fim da janela
+
+    output = {}
+    for q in quantiles:
+        position = q * (window - 1)
+        low = int(position)
+        result = ordered[..., low]
+        if position != low:
+            result = result + (ordered[..., low + 1] - result) * (position - low)
+        output[q] = _pad(np.where(missing, np.nan, result), values, window)
+    return output
+
+
+def _like(values: np.ndarray, data: Union[Series, DataFrame]) -> Union[Series, DataFrame]:
+    """
+    Converte um array no mesmo tipo (Series ou DataFrame) e com o mesmo índice de `data`.
+    """
+    if isinstance(data, DataFrame):
+        return DataFrame(values, index=data.index, columns=data.columns)
+    return Series(values, index=data.index, name=data.name)
+
+
+def feature(*inputs: str, lookback: Optional[int] = None) -> Callable:
+    """
+    Registra um método `__N__` como feature, declarando as colunas de preço que ele utiliza.
+
+    Args:
+        *inputs (str): Colunas do DataFrame de preços usadas pela feature (ex.: 'Close', 'Open').
+        lookback (int, opcional): Número de linhas anteriores necessárias para calcular o valor de
+            uma linha. Se None, a atualização incremental recalcula a feature desde o início.
+
+    Returns:
+        Callable: Decorador que anota o método com as colunas de entrada e o lookback.
+    """
+    def decorator(method: Callable) -> Callable:
+        method.inputs = inputs
+        method.lookback = lookback
+        return method
+    return decorator
+
 
 class Features:
     """
     Classe para calcular diferentes tipos de features a partir de dados de preços.
 
+    Cada feature é um método `__N__` que descreve seu cálculo como um grafo de nós intermediários
+    (`self.node(operacao, *args)`), por exemplo `self.node('rolling_quantile', low, 6, 0.10)`.
+    Um nó é identificado pela operação e pelos seus argumentos, e é calculado uma única vez por
+    DataFrame: features que compartilham retornos, janelas móveis ou diferenças reaproveitam os
+    resultados já calculados.
+
     Attributes:
         df (pd.DataFrame): DataFrame contendo os dados de preços, como 'Close' e 'Open'.
+        memo (dict): Nós intermediários já calculados, indexados pela sua chave.
 
     Methods:
         get(F: Union[list[int], int]) -> pd.DataFrame:
             Calcula as features especificadas e as adiciona ao DataFrame.
 
+        node(op: str, *args) -> pd.Series:
+            Calcula (ou reaproveita) um nó intermediário.
+
+        registry() -> dict:
+            Retorna as features implementadas.
+
+        update(df: pd.DataFrame, F: list[int], start: int) -> pd.DataFrame:
+            Recalcula as features apenas a partir de uma posição (atualização incremental).
+
+        panel(prices: dict, F: list[int]) -> dict:
+            Calcula as features de várias trajetórias de preço de uma vez.
+
         __?__() -> pd.Series:
             ...
 
     """
-    def __init__(self, df: DataFrame):
+    # Operações disponíveis para os nós intermediários. Argumentos que são tuplas são outros nós.
+    OPERATIONS: Dict[str, Callable] = {
+        'column': lambda df, name: df[name],
+        'pct_change': lambda s, periods=1: s.pct_change(periods),
+        'diff': lambda s, periods=1: s.diff(periods),
+        'rolling_moments': lambda s, window: {
+            name: _like(values, s) for name, values in rolling_moments(s.to_numpy(), window).items()
+        },
+        'rolling_quantile': lambda s, window, quantile: _like(
+            rolling_quantiles(s.to_numpy(), window, [quantile])[quantile], s
+        ),
+        'add': lambda a, b: a + b,
+        'sub': lambda a, b: a - b,
+        'mul': lambda a, b: a * b,
+        'div': lambda a, b: a / b,
+        'pow': lambda s, exponent: s ** exponent,
+    }
+
+    # Estatísticas móveis: com o pandas (`rolling(window).sum()`, `.mean()` e `.std()`), idênticas às versões
+    # anteriores das features, ou, com `NUMPY_MOMENTS = True`, extraídas do nó 'rolling_moments', calculado
+    # uma única vez por (entrada, janela), que difere do pandas por arredondamento (ver `rolling_moments`)
+    MOMENTS = {'rolling_sum': 'sum', 'rolling_mean': 'mean', 'rolling_std': 'std'}
+    NUMPY_MOMENTS = False
+
+    def __init__(self, df: DataFrame, copy: bool = True):
         """
         Inicializa a classe Features com um DataFrame de preços.
 
         Args:
             df (pd.DataFrame): DataFrame contendo os dados de preços.
+            copy (bool): Se False, as features são adicionadas ao próprio DataFrame recebido.
+        """
+        self.df = df.copy() if copy else df
+        self.memo = {}
+
+    @classmethod
+    def registry(cls) -> Dict[int, Callable]:
         """
-        self.df = df.copy()
+        Retorna as features implementadas.
+
+        Returns:
+            dict: Dicionário {número da feature: método}.
+        """
+        return {
+            int(name[2:-2]): getattr(cls, name) for name in dir(cls)
+            if name.startswith('__') and name.endswith('__') and name[2:-2].isdigit()
+        }
+
+    def node(self, op: str, *args) -> Series:
+        """
+        Calcula um nó intermediário, reaproveitando o resultado se ele já foi calculado.
+
+        Args:
+            op (str): Nome da operação (uma das chaves de `OPERATIONS` ou de `MOMENTS`).
+            *args: Argumentos da operação. Tuplas são interpretadas como nós de entrada.
+
+        Returns:
+            pd.Series: Resultado do nó.
+        """
+        key = (op, *args)
+        if key not in self.memo:
+            if op in self.MOMENTS and self.NUMPY_MOMENTS:
+                self.memo[key] = self.node('rolling_moments', *args)[self.MOMENTS[op]]
+            elif op in self.MOMENTS:
+                values, window = args
+                self.memo[key] = getattr(self.node(*values).rolling(window), self.MOMENTS[op])()
+            elif op == 'column':
+                self.memo[key] = self.OPERATIONS[op](self.df, *args)
+            else:
+                values = [self.node(*arg) if isinstance(arg, tuple) else arg for arg in args]
+                self.memo[key] = self.OPERATIONS[op](*values)
+        return self.memo[key]
 
     def get(self, F: Union[int, List[int]]) -> DataFrame:
         """
@@ -39,23 +264,105 @@ class Features:
             pd.DataFrame: DataFrame com as novas features adicionadas.
 
         Raises:
-            ValueError: Se uma feature especificada não está implementada.
+            ValueError: Se uma feature especificada não está implementada ou se faltam colunas de entrada.
             TypeError: Se o argumento 'F' não for um inteiro ou uma lista de inteiros.
         """
         if isinstance(F, int):
-            self.F = [F]
+            F = [F]
         
         if isinstance(F, list):
+            registry = self.registry()
             for f in F:
-                method_name  = f'__{f}__'
-                if hasattr(self, method_name):
-                    self.df[f'__{f}__'] = getattr(self, method_name)()
-                else:
+                if f not in registry:
                     raise ValueError(f"A feature '__{f}__' não está implementada.")
+
+                missing = [c for c in getattr(registry[f], 'inputs', ()) if c not in self.df.columns]
+                if missing:
+                    raise ValueError(f"A feature '__{f}__' requer as colunas ausentes: {missing}")
+
+            for f in F:
+                self.df[f'__{f}__'] = getattr(self, f'__{f}__')()
         else:
             raise TypeError("O parâmetro 'F' deve ser um inteiro ou uma lista de inteiros.")
 
         return self.df
+
+    @classmethod
+    def lookback(cls, F: Union[int, List[int]]) -> Optional[int]:
+        """
+        Retorna o maior lookback declarado entre as features, ou None se alguma não o declara.
+        """
+        F = [F] if isinstance(F, int) else F
+        registry = cls.registry()
+
+        unknown = [f for f in F if f not in registry]
+        if unknown:
+            raise ValueError(f"As features {[f'__{f}__' for f in unknown]} não estão implementadas.")
+
+        lookbacks = [getattr(registry[f], 'lookback', None) for f in F]
+        return None if None in lookbacks else max(lookbacks, default=0)
+
+    @classmethod
+    def panel(cls, prices: Dict[str, DataFrame], F: Union[int, List[int]]) -> Dict[int, DataFrame]:
+        """
+        Calcula as features de várias trajetórias de preço de uma vez.
+
+        Cada coluna de preço é um DataFrame (dias x trajetórias). Os nós do grafo de cada feature são
+        calculados sobre o DataFrame inteiro (todas as operações atuam coluna a coluna, com o tempo no
+        eixo 0), portanto cada nó é calculado uma única vez para todas as trajetórias, com o mesmo
+        resultado de `Features(df).get(F)` aplicado a cada trajetória.
+
+        Args:
+            prices (dict): {coluna de preço (ex.: 'Close'): DataFrame dias x trajetórias}.
+            F (Union[int, list[int]]): Features a serem calculadas.
+
+        Returns:
+            dict: {número da feature: DataFrame dias x trajetórias}.
+        """
+        F = [F] if isinstance(F, int) else F
+        cls.lookback(F)
+
+        registry = cls.registry()
+        for f in F:
+            missing = [c for c in getattr(registry[f], 'inputs', ()) if c not in prices]
+            if missing:
+                raise ValueError(f"A feature '__{f}__' requer as colunas ausentes: {missing}")
+
+        features = cls(prices, copy=False)
+        return {f: getattr(features, f'__{f}__')() for f in F}
+
+    @classmethod
+    def update(cls, df: DataFrame, F: Union[int, List[int]], start: int) -> DataFrame:
+        """
+        Atualiza as features de forma incremental, a partir da linha `start`.
+
+        Apenas as linhas a partir de `start` são recalculadas, usando como histórico as `lookback`
+        linhas anteriores declaradas em `@feature`. O custo é proporcional ao lookback e ao número de
+        linhas novas, e não ao tamanho do histórico. Features sem lookback declarado são recalculadas
+        por completo. O DataFrame é alterado no próprio objeto.
+
+        Args:
+            df (pd.DataFrame): DataFrame com as features já calculadas até `start` e as novas linhas.
+            F (Union[int, list[int]]): Features a serem atualizadas.
+            start (int): Posição da primeira linha a ser recalculada.
+
+        Returns:
+            pd.DataFrame: O mesmo DataFrame, com as features atualizadas.
+        """
+        F = [F] if isinstance(F, int) else F
+        lookback = cls.lookback(F)
+        begin = 0 if lookback is None else max(start - lookback, 0)
+
+        # Calcula as features apenas sobre a cauda do DataFrame
+        tail = cls(df.iloc[begin:]).get(F)
+
+        for f in F:
+            column = f'__{f}__'
+            if column not in df.columns:
+                df[column] = float('nan')
+            df.iloc[start:, df.columns.get_loc(column)] = tail[column].to_numpy()[start - begin:]
+
+        return df
     
     # -----------------------------------------------------------------------------------------
 
@@ -63,22 +370,29 @@ class Features:
 
     # Colunas permitidas df[['Adj Close', 'Close', 'High', 'Low', 'Open',  'Volume']]
 
+    # Declare as colunas usadas e o lookback com @feature(...) e monte o cálculo com self.node(...)
+    # para compartilhar os nós intermediários entre as features.
+
+    @feature('Close', lookback=1)
     def __1__(self) -> DataFrame:
-        return self.df['Close'].diff()
+        return self.node('diff', ('column', 'Close'), 1)
     
+    @feature('Open', lookback=1)
     def __2__(self) -> DataFrame:
-        return self.df['Open'].diff()
+        return self.node('diff', ('column', 'Open'), 1)
 
+    # lookback = 1 (pct_change) + 5 (J) + 5 (S) + 5 (W) + 3 (W(q, 4))
+    @feature('Adj Close', 'Low', 'High', lookback=19)
     def __3__(self):
         # NOTE: ticker = BBDC4, start = '2012-05-11', end = '2022-05-11', p = 1
-        W = lambda x, window_size=5: x.rolling(window_size).sum()
-        S = lambda x, window_size=5: x.rolling(window_size).std() / x.rolling(window_size).mean()
-        J = lambda x, window_size=5, quantile=0.5: x.rolling(window_size).quantile(quantile)
-        U = lambda x: x.diff().diff()
-        adj_close = self.df['Adj Close'].pct_change(1)                
-        low = self.df['Low'].pct_change(1)        
-        high = self.df['High'].pct_change(1)       
-        q = W(S(J(low, 6, 0.10) - J(high, 6, 0.10), 6), 6)
-        r = W(q, 4) / J(U(adj_close), 5, 0.75) 
-        u = r ** 2
-        return u
\ No newline at end of file
+        W = lambda x, window_size=5: ('rolling_sum', x, window_size)
+        S = lambda x, window_size=5: ('div', ('rolling_std', x, window_size), ('rolling_mean', x, window_size))
+        J = lambda x, window_size=5, quantile=0.5: ('rolling_quantile', x, window_size, quantile)
+        U = lambda x: ('diff', ('diff', x, 1), 1)
+        adj_close = ('pct_change', ('column', 'Adj Close'), 1)
+        low = ('pct_change', ('column', 'Low'), 1)
+        high = ('pct_change', ('column', 'High'), 1)
+        q = W(S(('sub', J(low, 6, 0.10), J(high, 6, 0.10)), 6), 6)
+        r = ('div', W(q, 4), J(U(adj_close), 5, 0.75))
+        u = ('pow', r, 2)
+        return self.node(*u)
@@ -1,8 +1,78 @@
+import os
+import matplotlib
 import matplotlib.pyplot as plt
 import seaborn as sns
 import pandas as pd
 import numpy as np
 
+def minmax_downsample(values, n_buckets: int) -> np.ndarray:
+    """
+    Seleciona os pontos de mínimo e de máximo de cada bucket de uma série (downsampling min/max).
+
+    O formato da curva é preservado: picos e vales de cada bucket, além do primeiro e do último ponto,
+    são sempre mantidos. O custo é linear e a saída tem no máximo `2 * n_buckets + 2` pontos.
+
+    Parâmetros:
+        values (array): Valores da série, em ordem temporal.
+        n_buckets (int): Número de buckets (tipicamente metade da largura do gráfico em pixels).
+
+    Retorna:
+        np.ndarray: Posições dos pontos mantidos, em ordem crescente.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    n = len(values)
+    if n_buckets <= 0 or n <= 2 * n_buckets + 2:
+        return np.arange(n)
+
+    # Buckets de mesmo tamanho; o último é completado com NaN
+    width = -(-n // n_buckets)
+    n_buckets = -(-n // width)
+    padded = np.full(n_buckets * width, np.nan)
+    padded[:n] = values
+    padded = padded.reshape(n_buckets, width)
+
+    # NaN nunca é escolhido como mínimo ou máximo
+    offsets = np.arange(n_buckets) * width
+    lows = np.argmin(np.where(np.isnan(padded), np.inf, padded), axis=1) + offsets
+    highs = np.argmax(np.where(np.isnan(padded), -np.inf, padded), axis=1) + offsets
+
+    positions = np.unique(np.concatenate(([0, n - 1], lows, highs)))
+    return positions[positions < n]
+
+
+# Figura reutilizada entre os trabalhos de um mesmo processo do pool de renderização
+_WORKER_FIGURE = None
+
+
+def _init_render_worker():
+    """Configura um processo do pool de renderização para usar o backend sem interface gráfica (Agg)."""
+    matplotlib.use('Agg', force=True)
+
+
+def _render_job(job: dict, preview: bool = False, reuse: bool = False) -> str:
+    """
+    Renderiza um gráfico diretamente em arquivo e fecha (ou limpa) a figura em seguida.
+
+    Parâmetros:
+        job (dict): Trabalho com as chaves 'kind' (nome do método), 'df', 'column', 'path' e, opcionalmente,
+            'options' (argumentos do construtor) e 'args' (argumentos do método, ex.: métricas).
+        preview (bool): Usa a resolução reduzida de pré-visualização.
+        reuse (bool): Reaproveita a mesma figura entre trabalhos do processo em vez de criar uma nova.
+
+    Retorna:
+        str: Caminho do arquivo gerado.
+    """
+    global _WORKER_FIGURE
+    options = dict(job.get('options', {}), preview=preview)
+    if reuse:
+        if _WORKER_FIGURE is None:
+            _WORKER_FIGURE = plt.figure()
+        options['figure'] = _WORKER_FIGURE
+
+    graph = Graphs(job['df'], job.get('column'), **options)
+    return graph.save(job['kind'], job['path'], *job.get('args', ()))
+
+
 class Graphs:
     """
     Classe para criar gráficos estatísticos e visualizações avançadas usando Matplotlib e Seaborn.
@@ -18,11 +88,20 @@ class Graphs:
         ylabel (str): Rótulo do eixo Y.
         bins (int): Número de bins para histogramas.
         seta (bool): Define se deve exibir anotações no gráfico.
+        dpi (int): Resolução das figuras.
+        preview (bool): Se True, usa a resolução reduzida `PREVIEW_DPI` (pré-visualização rápida).
+        figure (Figure): Figura existente a ser limpa e reutilizada, em vez de criar uma nova a cada gráfico.
+        max_points (int): Número máximo de pontos em `linha`. Se None, usa a largura do gráfico em pixels;
+            se 0, desativa o downsampling.
     """
 
+    PREVIEW_DPI = 72
+    KINDS = ('linha', 'hisplot', 'correlacao', 'barplot', 'pio', 'comparar_retornos', 'comparar_metricas')
+
     def __init__(self, df, column, figsize=(10, 6), linewidth=2, marker=None, title='', 
                  xlabel='Data', ylabel='', bins=None, seta=False, fontsize_title=16,
-                 fontsize_xlabel=14, fontsize_ylabel=14, tick_params_labelsize=12, p=1):
+                 fontsize_xlabel=14, fontsize_ylabel=14, tick_params_labelsize=12, p=1, dpi=300,
+                 preview=False, figure=None, max_points=None):
         self.df = df
         self.column = column
         self.figsize = figsize
@@ -38,6 +117,125 @@ class Graphs:
         self.fontsize_ylabel = fontsize_ylabel
         self.tick_params_labelsize = tick_params_labelsize
         self.p = p
+        self.dpi = self.PREVIEW_DPI if preview else dpi
+        self.figure = figure
+        self.fig = None
+        self.max_points = max_points
+        self.downsample_info = None
+
+    def _subplots(self, dpi=None):
+        """Cria (ou reutiliza) a figura do gráfico com a resolução configurada."""
+        dpi = dpi or self.dpi
+        if self.figure is not None:
+            fig = self.figure
+            fig.clf()
+            fig.set_size_inches(self.figsize)
+            fig.set_dpi(dpi)
+            plt.figure(fig.number)
+            ax = fig.add_subplot()
+        else:
+            fig, ax = plt.subplots(figsize=self.figsize, dpi=dpi)
+        self.fig = fig
+        return fig, ax
+
+    def save(self, kind, path, *args):
+        """
+        Gera um gráfico e o salva em arquivo (o formato, ex.: PNG ou SVG, vem da extensão de `path`).
+
+        A figura é sempre fechada ao final (ou apenas limpa, quando reutilizada), evitando o acúmulo
+        de figuras abertas ao gerar muitos gráficos.
+
+        Parâmetros:
+            kind (str): Nome do método do gráfico (ex.: 'linha', 'comparar_retornos').
+            path (str): Caminho do arquivo de saída.
+            *args: Argumentos do método (ex.: o dicionário de métricas de 'comparar_retornos').
+
+        Retorna:
+            str: Caminho do arquivo gerado.
+        """
+        if kind not in self.KINDS:
+            raise ValueError(f"Tipo de gráfico '{kind}' inválido. Opções: {self.KINDS}")
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        try:
+            getattr(self, kind)(*args)
+            self.fig.savefig(path, dpi=self.fig.dpi)
+        finally:
+            if self.fig is not None:
+                if self.fig is self.figure:
+                    self.fig.clf()
+                else:
+                    plt.close(self.fig)
+        return path
+
+    @staticmethod
+    def render_batch(jobs, max_workers=None, preview=False):
+        """
+        Renderiza vários gráficos diretamente em arquivos, distribuindo os trabalhos entre processos.
+
+        Cada processo usa o backend Agg e reaproveita uma única figura entre os trabalhos. Com
+        `max_workers=1`, os gráficos são gerados no processo atual da mesma forma (Agg e figura
+        reaproveitada); ao final, a figura é fechada e o backend anterior é restaurado.
+
+        Parâmetros:
+            jobs (list): Lista de trabalhos (dicionários com 'kind', 'df', 'column', 'path' e, opcionalmente,
+                'options' e 'args'; ver `_render_job`).
+            max_workers (int): Número de processos. Se None, usa o número de CPUs.
+            preview (bool): Se True, gera os arquivos com a resolução reduzida de pré-visualização.
+
+        Retorna:
+            dict: "paths" com os arquivos gerados (None em caso de erro, na ordem dos trabalhos) e
+            "errors" com {índice do trabalho: mensagem de erro}.
+        """
+        from concurrent.futures import ProcessPoolExecutor
+
+        global _WORKER_FIGURE
+        paths, errors = [None] * len(jobs), {}
+        if max_workers == 1:
+            backend = matplotlib.get_backend()
+            _init_render_worker()
+            try:
+                for i, job in enumerate(jobs):
+                    try:
+                        paths[i] = _render_job(job, preview, True)
+                    except Exception as e:
+                        errors[i] = f'{type(e).__name__}: {e}'
+            finally:
+                if _WORKER_FIGURE is not None:
+                    plt.close(_WORKER_FIGURE)
+                    _WORKER_FIGURE = None
+                if backend.lower() != matplotlib.get_backend().lower():
+                    plt.switch_backend(backend)
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_render_worker) as executor:
+                futures = [executor.submit(_render_job, job, preview, True) for job in jobs]
+                for i, future in enumerate(futures):
+                    try:
+                        paths[i] = future.result()
+                    except Exception as e:
+                        errors[i] = f'{type(e).__name__}: {e}'
+        return {"paths": paths, "errors": errors}
+
+    def _downsample(self, data):
+        """
+        Reduz a série de `linha` aos pontos de mínimo e máximo por coluna de pixels, quando ela tem mais
+        pontos do que o gráfico consegue exibir. O resultado fica registrado em `downsample_info`.
+        """
+        max_points = self.max_points
+        if max_points is None:
+            max_points = int(self.figsize[0] * self.dpi)
+
+        if max_points:
+            positions = minmax_downsample(data[self.column].to_numpy(), max_points // 2)
+            if len(positions) < len(data):
+                data = data.iloc[positions]
+
+        total = len(self.df)
+        self.downsample_info = {'points': total, 'plotted': len(data), 'dropped': total - len(data)}
+        return data
 
     def linha(self):
         """Gráfico de linha com personalização estatística e anotações opcionais."""
@@ -46,10 +244,13 @@ class Graphs:
         sns.set(style="whitegrid", palette="muted")
         
         # Criar a figura e o eixo
-        fig, ax = plt.subplots(figsize=self.figsize, dpi=300)
+        fig, ax = self._subplots()
         
+        # Reduzir séries longas (mínimo e máximo por coluna de pixels) antes de desenhar
+        data = self._downsample(self.df)
+
         # Criar gráfico de linha
-        sns.lineplot(x=self.df.index, y=self.df[self.column], data=self.df, marker=self.marker, 
+        sns.lineplot(x=data.index, y=data[self.column], data=data, marker=self.marker, 
                     color='#66A3A1', linewidth=self.linewidth, ax=ax)
         
         # Personalização do gráfico
@@ -100,7 +301,7 @@ class Graphs:
 
         # Configuração do estilo do gráfico
         sns.set(style="whitegrid", palette="muted")
-        fig, ax = plt.subplots(figsize=self.figsize, dpi=300)
+        fig, ax = self._subplots()
         
         # Criar o histograma com KDE
         sns.histplot(self.df[self.column], kde=True, bins=self.bins, color='#4F9DC7', 
@@ -144,7 +345,7 @@ class Graphs:
         self.title = f"Correlação entre {self.column[0]} (Variação Percentual Deslocada) e {self.column[1]}"
         
         # Configuração do gráfico
-        fig, ax = plt.subplots(figsize=self.figsize, dpi=300)
+        fig, ax = self._subplots()
         
         # Criar gráfico de dispersão
         scatter = sns.scatterplot(data=self.df, x='variacao_percentual', y=self.column[1], color='#4F9DC7', ax=ax, s=100, edgecolor='black', linewidth=1.5)
@@ -189,7 +390,7 @@ class Graphs:
 
         # Configuração do gráfico
         sns.set(style="whitegrid")
-        fig, ax = plt.subplots(figsize=self.figsize, dpi=300)
+        fig, ax = self._subplots()
 
         # Criar gráfico de barras com a cor azul definida e largura ajustada
         sns.barplot(x=retornos_anuais.index, y=retornos_anuais.values, color=azul, ax=ax, width=0.5)  # Ajustar a largura das barras
@@ -236,7 +437,7 @@ class Graphs:
 
         # Definir o estilo do gráfico
         sns.set(style="whitegrid", palette="muted")
-        fig, ax = plt.subplots(figsize=self.figsize, dpi=100)
+        fig, ax = self._subplots(dpi=min(self.dpi, 100))
         
         # Criar gráfico de pizza com efeitos de borda e sombra
         wedges, texts, autotexts = plt.pie(valores, labels=labels, autopct='%1.1f%%', startangle=90, 
@@ -280,7 +481,7 @@ class Graphs:
         x = np.arange(len(metrics))  # Posições das métricas no eixo X
         width = 0.25  # Largura das barras
 
-        fig, ax = plt.subplots(figsize=self.figsize, dpi=300)
+        fig, ax = self._subplots()
 
         # Definir cores em tons de azul
         blues = ['#003366', '#4682b4', '#5f9ea0']  # Azul escuro, médio e claro
@@ -340,7 +541,7 @@ class Graphs:
         x = np.arange(len(metrics))  # Posições das métricas no eixo X
         width = 0.2  # Largura das barras ajustada para evitar sobreposição
 
-        fig, ax = plt.subplots(figsize=self.figsize, dpi=300)
+        fig, ax = self._subplots()
 
         # Definir cores para cada conjunto de dados
         colors = ['#003366', '#4682b4', '#5f9ea0'] # Azul escuro, médio e claro
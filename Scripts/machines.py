@@ -1,21 +1,199 @@
 from sklearn.tree import DecisionTreeClassifier
-from sklearn.metrics import accuracy_score
+from sklearn.ensemble import RandomForestClassifier, HistGradientBoostingClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.svm import LinearSVC
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+from sklearn.model_selection import GridSearchCV, RandomizedSearchCV, TimeSeriesSplit
+from time import perf_counter
+import hashlib
+import pickle
+import threading
+import tracemalloc
+import numpy as np
 import pandas as pd
 from warnings import filterwarnings
 filterwarnings('ignore')
-from sklearn.metrics import (
-    accuracy_score, precision_score, recall_score, f1_score, roc_auc_score, confusion_matrix
-)
+
+# O tracemalloc é global ao processo: medições de memória concorrentes (threads) são serializadas
+_TRACE_LOCK = threading.Lock()
+
+
+def confusion_metrics(y_true, y_pred, n_classes=2):
+    """
+    Calcula as métricas de classificação a partir da matriz de confusão, montada com um único `bincount`.
+
+    Aceita um vetor de predições ou uma matriz (estratégias x dias) com várias predições para os mesmos
+    alvos; nesse caso todas as matrizes de confusão são montadas juntas, em uma única passagem.
+    No alvo binário, precisão, recall e F1 referem-se à classe 1; nos alvos multiclasse, são médias macro
+    sobre as classes presentes nos alvos ou nas predições (`average='macro'` do scikit-learn). Como no
+    scikit-learn, valem 0 quando indefinidos.
+
+    Args:
+        y_true (array): Alvos reais (inteiros entre 0 e `n_classes - 1`).
+        y_pred (array): Predições, com formato (n,) ou (k, n).
+        n_classes (int): Número de classes.
+
+    Returns:
+        dict | list[dict]: Métricas de cada vetor de predições: accuracy, precision, recall, f1_score,
+        balanced_accuracy, mcc, hit_rate_<classe> (acerto quando a classe é prevista) e confusion_matrix
+        (linhas: classe real, colunas: classe prevista).
+    """
+    y_true = np.asarray(y_true).astype(np.int64)
+    y_pred = np.asarray(y_pred).astype(np.int64)
+    single = y_pred.ndim == 1
+    y_pred = np.atleast_2d(y_pred)
+
+    if y_pred.shape[1] != y_true.shape[-1]:
+        raise ValueError("Os alvos e as predições devem ter o mesmo número de observações.")
+    if (y_true.size and (y_true.min() < 0 or y_true.max() >= n_classes)) or \
+            (y_pred.size and (y_pred.min() < 0 or y_pred.max() >= n_classes)):
+        raise ValueError(f"Os rótulos devem ser inteiros entre 0 e {n_classes - 1}.")
+
+    # Um único bincount para todas as matrizes: código = estratégia * n_classes² + real * n_classes + previsto
+    k = len(y_pred)
+    codes = np.arange(k)[:, None] * n_classes ** 2 + y_true * n_classes + y_pred
+    cm = np.bincount(codes.ravel(), minlength=k * n_classes ** 2).reshape(k, n_classes, n_classes)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        total = cm.sum(axis=(1, 2))
+        correct = np.trace(cm, axis1=1, axis2=2)
+        actual = cm.sum(axis=2)      # total por classe real
+        predicted = cm.sum(axis=1)   # total por classe prevista
+        diagonal = np.diagonal(cm, axis1=1, axis2=2)
+
+        recall_by_class = np.nan_to_num(diagonal / actual)
+        hit_rate = np.nan_to_num(diagonal / predicted)
+
+        if n_classes == 2:
+            precision = hit_rate[:, 1]
+            recall = recall_by_class[:, 1]
+            f1 = np.nan_to_num(2 * precision * recall / (precision + recall))
+        else:
+            # Médias macro sobre as classes que aparecem nos alvos ou nas predições
+            labels = (actual + predicted) > 0
+            f1_by_class = np.nan_to_num(2 * hit_rate * recall_by_class / (hit_rate + recall_by_class))
+            precision, recall, f1 = (np.nan_to_num((values * labels).sum(axis=1) / labels.sum(axis=1))
+                                     for values in (hit_rate, recall_by_class, f1_by_class))
+        present = actual > 0
+        balanced = np.nan_to_num((recall_by_class * present).sum(axis=1) / present.sum(axis=1))
+
+        # Coeficiente de correlação de Matthews (forma multiclasse)
+        covariance = correct * total - (actual * predicted).sum(axis=1)
+        denominator = np.sqrt((total ** 2 - (predicted ** 2).sum(axis=1)).astype(np.float64)) * \
+            np.sqrt((total ** 2 - (actual ** 2).sum(axis=1)).astype(np.float64))
+        mcc = np.nan_to_num(covariance / denominator)
+        accuracy = np.nan_to_num(correct / total)
+
+    results = []
+    for i in range(k):
+        metrics = {
+            "accuracy": float(accuracy[i]),
+            "precision": float(precision[i]),
+            "recall": float(recall[i]),
+            "f1_score": float(f1[i]),
+            "balanced_accuracy": float(balanced[i]),
+            "mcc": float(mcc[i]),
+        }
+        metrics.update({f"hit_rate_{c}": float(hit_rate[i, c]) for c in range(n_classes)})
+        metrics["confusion_matrix"] = cm[i].tolist()
+        results.append(metrics)
+
+    return results[0] if single else results
+
+
+def feature_profile(X, bins=10):
+    """
+    Resume a distribuição de cada feature em faixas de quantis, para medir drift depois (ver `population_stability`).
+
+    Args:
+        X (array): Matriz (linhas, features).
+        bins (int): Número de faixas (10 = decis).
+
+    Returns:
+        dict: {"edges": limites internos das faixas (bins - 1, features), "proportions": fração das
+        linhas em cada faixa (bins, features)}, em listas serializáveis em JSON.
+    """
+    X = np.asarray(X, dtype=np.float64)
+    edges = np.nanquantile(X, np.linspace(0, 1, bins + 1)[1:-1], axis=0)
+    return {"edges": edges.tolist(), "proportions": _bin_proportions(X, edges).tolist()}
+
+
+def _bin_proportions(X, edges):
+    """
+    Fração das linhas de cada feature em cada faixa (código = número de limites <= valor); ignora NaN.
+    """
+    edges = np.asarray(edges, dtype=np.float64).reshape(-1, X.shape[1])
+    bins = len(edges) + 1
+    valid = ~np.isnan(X)
+    codes = np.zeros(X.shape, dtype=np.int64)
+    for edge in edges:
+        codes += X >= edge
+
+    # Um único bincount para todas as features: código = feature * bins + faixa
+    offsets = np.arange(X.shape[1]) * bins
+    counts = np.bincount((codes + offsets)[valid], minlength=bins * X.shape[1]).reshape(X.shape[1], bins).T
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return counts / valid.sum(axis=0)
+
+
+def population_stability(profile, X, eps=1e-4):
+    """
+    Calcula o PSI (population stability index) de cada feature entre o perfil de referência e novos dados.
+
+    PSI = soma((atual - referência) * ln(atual / referência)) nas faixas do perfil. Valores abaixo de 0,1
+    indicam distribuição estável; acima de 0,2, mudança relevante.
+
+    Args:
+        profile (dict): Perfil de referência (ver `feature_profile`).
+        X (array): Novos dados (linhas, features), com as features na mesma ordem do perfil.
+        eps (float): Fração mínima de cada faixa, para evitar log(0).
+
+    Returns:
+        np.ndarray: PSI de cada feature.
+    """
+    X = np.asarray(X, dtype=np.float64)
+    expected = np.clip(np.asarray(profile["proportions"], dtype=np.float64), eps, None)
+    actual = np.clip(_bin_proportions(X, profile["edges"]), eps, None)
+    return ((actual - expected) * np.log(actual / expected)).sum(axis=0)
+
 
 class Machines:
-    def __init__(self, train, test, after_test, F):
+    """
+    Classe para treinar modelos de classificação e avaliar suas previsões.
+
+    Os modelos disponíveis ficam em `MODELS` e podem ser treinados com `train_model(nome)` ou com os
+    métodos `train_<nome>` (ex.: `train_random_forest`), usados pelo `ml_model` do `MarketForecastConfig`.
+    Cada ajuste e cada predição registra tempo de execução e tamanho do modelo em `self.profile`, e
+    essas medidas são incluídas no resultado de `evaluate()`. O pico de memória só é medido com
+    `trace_memory=True`, pois o `tracemalloc` deixa o ajuste e a predição mais lentos.
+    """
+    # Modelos disponíveis: nome -> função que cria o estimador a partir dos hiperparâmetros
+    MODELS = {
+        'decision_tree': lambda **params: DecisionTreeClassifier(**{'max_depth': 3, 'random_state': 0, **params}),
+        'random_forest': lambda **params: RandomForestClassifier(**{'max_depth': 3, 'random_state': 0, **params}),
+        'gradient_boosting': lambda **params: HistGradientBoostingClassifier(**{'random_state': 0, **params}),
+        'logistic_regression': lambda **params: make_pipeline(StandardScaler(), LogisticRegression(**params)),
+        'linear_svm': lambda **params: make_pipeline(StandardScaler(), LinearSVC(**{'random_state': 0, **params})),
+    }
+
+    def __init__(self, train, test, after_test, F, trace_memory=False, n_classes=None):
         """
         Inicializa a classe com os conjuntos de dados e as features a serem usadas.
+
+        Args:
+            trace_memory (bool): Se True, mede também o pico de memória de cada ajuste e predição com o
+                `tracemalloc` (mais lento; medições de threads diferentes são executadas uma por vez).
+            n_classes (int): Número de classes do esquema do alvo (ex.: `Alvos.CLASSES`). Se None, é obtido dos
+                limites registrados por `Alvos` em `train.attrs['limites']` ou, na falta deles, do maior rótulo
+                entre treino, teste e pós-teste.
         """
         self.train = train
         self.test = test
         self.after_test = after_test
         self.F = [f'__{f}__' for f in F] if isinstance(F, list) else F
+        self.profile = {'train': {}, 'test': {}, 'after_test': {}}
+        self.trace_memory = trace_memory
 
         # Valida se as colunas das features existem nos conjuntos
         self._validate_features()
@@ -30,6 +208,25 @@ class Machines:
         self.x_after_test = self.after_test[self.F]
         self.y_after_test = self.after_test.filter(like='alvo').squeeze()
 
+        # Número de classes do alvo (2 no alvo binário; mais nos alvos ternário, quaternário e quinário)
+        self.n_classes = self._n_classes() if n_classes is None else n_classes
+
+    def _n_classes(self):
+        """
+        Obtém o número de classes do esquema do alvo, mesmo que alguma classe não apareça no treino.
+
+        Returns:
+            int: `len(limites) + 1` nos alvos por quantis, 3 no ternário (limite da zona neutra) ou, sem os
+            limites de `Alvos`, o maior rótulo entre treino, teste e pós-teste mais 1 (no mínimo 2).
+        """
+        limits = self.train.attrs.get('limites', {}).get(getattr(self.y_train, 'name', None))
+        if limits is not None:
+            return np.size(limits) + 1 if np.ndim(limits) else 3
+
+        labels = np.concatenate([np.asarray(y, dtype=np.float64).ravel()
+                                 for y in (self.y_train, self.y_test, self.y_after_test)])
+        return max(2, int(np.nanmax(labels)) + 1)
+
     def _validate_features(self):
         """
         Valida se todas as colunas de features existem nos conjuntos de dados.
@@ -39,33 +236,266 @@ class Machines:
             if missing_features:
                 raise ValueError(f"As seguintes features estão ausentes no conjunto {df_name}: {missing_features}")
 
-    def train_decision_tree(self, criterion='gini', max_depth=3):
+    def train_decision_tree(self, criterion='gini', max_depth=3, random_state=0):
         """
         Treina um modelo de Decision Tree Classifier.
 
         Args:
             criterion (str): Critério para medir a qualidade do split ('gini' ou 'entropy').
             max_depth (int): Profundidade máxima da árvore.
+            random_state (int): Semente usada no desempate entre features, para resultados reproduzíveis.
 
         Returns:
             DecisionTreeClassifier: Modelo treinado.
         """
-        model = DecisionTreeClassifier(criterion=criterion, max_depth=max_depth)
-        model.fit(self.x_train, self.y_train)
+        return self.train_model('decision_tree', criterion=criterion, max_depth=max_depth, random_state=random_state)
+
+    def train_model(self, name, n_jobs=None, **params):
+        """
+        Treina um dos modelos registrados em `MODELS`.
+
+        Args:
+            name (str): Nome do modelo (ex.: 'random_forest').
+            n_jobs (int, opcional): Número de núcleos, repassado aos modelos que aceitam esse parâmetro.
+            **params: Hiperparâmetros do modelo.
+
+        Returns:
+            Modelo treinado.
+        """
+        if name not in self.MODELS:
+            raise ValueError(f"O modelo '{name}' não está registrado. Modelos disponíveis: {list(self.MODELS)}")
+
+        model = self.MODELS[name](**params)
+        if n_jobs is not None and 'n_jobs' in model.get_params():
+            model.set_params(n_jobs=n_jobs)
+
+        _, elapsed, peak = self._measure(lambda: model.fit(self.x_train, self.y_train))
+        self.profile['train'].update({
+            'model': name,
+            'fit_time_ms': elapsed * 1e3,
+            'model_size_bytes': len(pickle.dumps(model)),
+        })
+        if peak is not None:
+            self.profile['train']['fit_peak_memory_bytes'] = peak
         return model
 
-    def _apply_predict(self, model, X):
+    def train_random_forest(self, n_estimators=100, max_depth=3, n_jobs=None, **params):
+        """
+        Treina um modelo de Random Forest Classifier.
+
+        Args:
+            n_estimators (int): Número de árvores.
+            max_depth (int): Profundidade máxima das árvores.
+            n_jobs (int, opcional): Número de núcleos usados no ajuste e na predição.
+
+        Returns:
+            RandomForestClassifier: Modelo treinado.
+        """
+        return self.train_model('random_forest', n_jobs=n_jobs, n_estimators=n_estimators, max_depth=max_depth, **params)
+
+    def train_gradient_boosting(self, max_iter=100, max_depth=3, learning_rate=0.1, **params):
+        """
+        Treina um modelo de gradient boosting baseado em histogramas (HistGradientBoostingClassifier).
+
+        Args:
+            max_iter (int): Número de iterações de boosting.
+            max_depth (int): Profundidade máxima das árvores.
+            learning_rate (float): Taxa de aprendizado.
+
+        Returns:
+            HistGradientBoostingClassifier: Modelo treinado.
+        """
+        return self.train_model('gradient_boosting', max_iter=max_iter, max_depth=max_depth,
+                                learning_rate=learning_rate, **params)
+
+    def train_logistic_regression(self, C=1.0, max_iter=1000, **params):
+        """
+        Treina uma regressão logística sobre as features padronizadas.
+
+        Args:
+            C (float): Inverso da força da regularização.
+            max_iter (int): Número máximo de iterações do otimizador.
+
+        Returns:
+            Pipeline: Modelo treinado (StandardScaler + LogisticRegression).
+        """
+        return self.train_model('logistic_regression', C=C, max_iter=max_iter, **params)
+
+    def train_linear_svm(self, C=1.0, **params):
+        """
+        Treina uma SVM linear sobre as features padronizadas.
+
+        Args:
+            C (float): Inverso da força da regularização.
+
+        Returns:
+            Pipeline: Modelo treinado (StandardScaler + LinearSVC).
+        """
+        return self.train_model('linear_svm', C=C, **params)
+
+    def _measure(self, func):
+        """
+        Executa `func` medindo o tempo de execução e, com `trace_memory=True`, o pico de memória alocada.
+
+        Returns:
+            tuple: (resultado, tempo em segundos, pico de memória em bytes ou None).
+        """
+        if not self.trace_memory:
+            start = perf_counter()
+            result = func()
+            return result, perf_counter() - start, None
+
+        with _TRACE_LOCK:
+            tracing = tracemalloc.is_tracing()
+            if not tracing:
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+
+            start = perf_counter()
+            try:
+                result = func()
+            finally:
+                elapsed = perf_counter() - start
+                peak = tracemalloc.get_traced_memory()[1] - base
+                if not tracing:
+                    tracemalloc.stop()
+        return result, elapsed, peak
+
+    def arrays(self):
+        """
+        Retorna `x_train` e `y_train` como arrays NumPy contíguos, extraídos uma única vez.
+
+        Returns:
+            tuple: (X, y) com X em float64 e y em int64.
+        """
+        if not hasattr(self, '_arrays'):
+            self._arrays = (
+                np.ascontiguousarray(self.x_train.to_numpy(dtype=np.float64)),
+                np.ascontiguousarray(np.asarray(self.y_train).astype(np.int64))
+            )
+        return self._arrays
+
+    def train_hash(self):
+        """
+        Retorna um hash dos dados de treino (features, alvo e nomes das colunas).
+
+        Se o hash não mudou, um novo ajuste produziria o mesmo modelo e um modelo salvo pode ser reutilizado.
+        """
+        X, y = self.arrays()
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(repr(list(self.F)).encode())
+        digest.update(X.tobytes())
+        digest.update(y.tobytes())
+        return digest.hexdigest()
+
+    def feature_profile(self, split='train', bins=10):
+        """
+        Retorna o perfil da distribuição das features de um conjunto (ver `feature_profile`).
+        """
+        return feature_profile(getattr(self, f'x_{split}').to_numpy(dtype=np.float64), bins)
+
+    def drift(self, profile, split='after_test'):
+        """
+        Mede o drift das features de um conjunto em relação a um perfil de referência (ex.: o treino de um
+        modelo salvo), pelo PSI de cada feature.
+
+        Returns:
+            dict: {feature: PSI}.
+        """
+        psi = population_stability(profile, getattr(self, f'x_{split}').to_numpy(dtype=np.float64))
+        return {f: float(v) for f, v in zip(self.F, psi)}
+
+    def search(self, param_grid, estimator=None, n_iter=None, n_splits=5, scoring='accuracy',
+               n_jobs=-1, random_state=0):
+        """
+        Busca hiperparâmetros em paralelo sobre os dados de treino, com validação temporal.
+
+        Os dados de treino são convertidos em arrays uma única vez e compartilhados entre os processos.
+        Cada combinação é avaliada com `TimeSeriesSplit` (as dobras de validação estão sempre no futuro
+        das dobras de treino), portanto não há vazamento de informação futura.
+
+        Args:
+            param_grid (dict): Grade de hiperparâmetros {nome: lista de valores} (ou distribuições, com `n_iter`).
+            estimator: Modelo base do scikit-learn ou nome de um modelo de `MODELS`.
+                Padrão: `DecisionTreeClassifier(random_state=0)`.
+            n_iter (int, opcional): Se informado, sorteia `n_iter` combinações em vez de testar a grade inteira.
+            n_splits (int): Número de dobras da validação temporal.
+            scoring (str): Métrica usada para ordenar as combinações.
+            n_jobs (int): Número de processos (-1 usa todos os núcleos).
+            random_state (int): Semente do sorteio das combinações.
+
+        Returns:
+            pandas.DataFrame: Combinações ordenadas pela métrica de validação (melhor primeiro).
+            O melhor modelo, reajustado em todo o treino, fica em `self.best_model`.
+        """
+        estimator = estimator if estimator is not None else DecisionTreeClassifier(random_state=0)
+        if isinstance(estimator, str):
+            estimator = self.MODELS[estimator]()
+        cv = TimeSeriesSplit(n_splits=n_splits)
+
+        if n_iter is None:
+            searcher = GridSearchCV(estimator, param_grid, scoring=scoring, cv=cv, n_jobs=n_jobs)
+        else:
+            searcher = RandomizedSearchCV(estimator, param_grid, n_iter=n_iter, scoring=scoring, cv=cv,
+                                          n_jobs=n_jobs, random_state=random_state)
+
+        X, y = self.arrays()
+        searcher.fit(X, y)
+        self.best_model = searcher.best_estimator_
+
+        results = pd.DataFrame(searcher.cv_results_)
+        columns = [c for c in results.columns if c.startswith('param_')] + [
+            'mean_test_score', 'std_test_score', 'rank_test_score', 'mean_fit_time', 'mean_score_time'
+        ]
+        return results[columns].sort_values('rank_test_score', kind='stable').reset_index(drop=True)
+
+    def _apply_predict(self, model, X, split=None):
         """
         Realiza predições com o modelo fornecido.
 
         Args:
             model: Modelo treinado.
             X: Conjunto de dados de entrada.
+            split (str, opcional): Conjunto de dados ('train', 'test' ou 'after_test') em que o tempo
+                e a memória da predição são registrados.
 
         Returns:
             pandas.Series: Predições realizadas.
         """
-        return pd.Series(model.predict(X), index=X.index, name='predicao')
+        predictions, elapsed, peak = self._measure(lambda: model.predict(X))
+        if split is not None:
+            self.profile[split]['predict_time_ms'] = elapsed * 1e3
+            if peak is not None:
+                self.profile[split]['predict_peak_memory_bytes'] = peak
+        return pd.Series(predictions, index=X.index, name='predicao')
+
+    @staticmethod
+    def predict_paths(model, features):
+        """
+        Prediz várias trajetórias com uma única chamada de `model.predict`.
+
+        As linhas de todas as trajetórias são empilhadas em uma só matriz, com as colunas na ordem
+        de `features` (a mesma ordem usada no treino). Linhas com alguma feature ausente ou infinita
+        não são preditas.
+
+        Args:
+            model: Modelo treinado.
+            features (dict): {coluna da feature (ex.: '__1__'): array (dias, trajetórias)}.
+
+        Returns:
+            np.ndarray: Predições (dias, trajetórias) em int64; -1 nas linhas não preditas.
+        """
+        columns = list(features)
+        stacked = np.stack([np.asarray(features[c], dtype=np.float64) for c in columns], axis=-1)
+        shape = stacked.shape[:-1]
+        X = stacked.reshape(-1, len(columns))
+        valid = np.isfinite(X).all(axis=1)
+
+        predictions = np.full(len(X), -1, dtype=np.int64)
+        if valid.any():
+            predictions[valid] = model.predict(pd.DataFrame(X[valid], columns=columns))
+        return predictions.reshape(shape)
 
     def predict_train(self, model):
         """
@@ -77,7 +507,7 @@ class Machines:
         Returns:
             pandas.DataFrame: Conjunto de treino com as predições.
         """
-        self.train['predicao'] = self._apply_predict(model, self.x_train)
+        self.train['predicao'] = self._apply_predict(model, self.x_train, 'train')
         return self.train
 
     def predict_test(self, model):
@@ -90,7 +520,7 @@ class Machines:
         Returns:
             pandas.DataFrame: Conjunto de teste com as predições.
         """
-        self.test['predicao'] = self._apply_predict(model, self.x_test)
+        self.test['predicao'] = self._apply_predict(model, self.x_test, 'test')
         return self.test
 
     def predict_after_test(self, model):
@@ -103,7 +533,7 @@ class Machines:
         Returns:
             pandas.DataFrame: Conjunto pós-teste com as predições.
         """
-        self.after_test['predicao'] = self._apply_predict(model, self.x_after_test)
+        self.after_test['predicao'] = self._apply_predict(model, self.x_after_test, 'after_test')
 
         return self.after_test
 
@@ -111,50 +541,37 @@ class Machines:
         """
         Avalia o modelo nos conjuntos de treino, teste e pós-teste usando diversas métricas.
 
+        As métricas de cada conjunto são derivadas de uma única matriz de confusão (ver `confusion_metrics`).
+
         Returns:
-            dict: Métricas de avaliação para treino, teste e pós-teste.
-        """
-        # Avaliação no conjunto de treino
-        train_accuracy = accuracy_score(self.y_train, self.train['predicao'])
-        train_precision = precision_score(self.y_train, self.train['predicao'])
-        train_recall = recall_score(self.y_train, self.train['predicao'])
-        train_f1 = f1_score(self.y_train, self.train['predicao'])
-        train_confusion = confusion_matrix(self.y_train, self.train['predicao'])
-
-        # Avaliação no conjunto de teste
-        test_accuracy = accuracy_score(self.y_test, self.test['predicao'])
-        test_precision = precision_score(self.y_test, self.test['predicao'])
-        test_recall = recall_score(self.y_test, self.test['predicao'])
-        test_f1 = f1_score(self.y_test, self.test['predicao'])
-        test_confusion = confusion_matrix(self.y_test, self.test['predicao'])
-
-        # Avaliação no conjunto after_test
-        after_test_accuracy = accuracy_score(self.y_after_test[:-1], self.after_test['predicao'][:-1])
-        after_test_precision = precision_score(self.y_after_test[:-1], self.after_test['predicao'][:-1])
-        after_test_recall = recall_score(self.y_after_test[:-1], self.after_test['predicao'][:-1])
-        after_test_f1 = f1_score(self.y_after_test[:-1], self.after_test['predicao'][:-1])
-        after_test_confusion = confusion_matrix(self.y_after_test[:-1], self.after_test['predicao'][:-1])
-
-        return {
-            "train": {
-                "accuracy": train_accuracy,
-                "precision": train_precision,
-                "recall": train_recall,
-                "f1_score": train_f1,
-                "confusion_matrix": train_confusion.tolist()
-            },
-            "test": {
-                "accuracy": test_accuracy,
-                "precision": test_precision,
-                "recall": test_recall,
-                "f1_score": test_f1,
-                "confusion_matrix": test_confusion.tolist()
-            },
-            "after_test": {
-                "accuracy": after_test_accuracy,
-                "precision": after_test_precision,
-                "recall": after_test_recall,
-                "f1_score": after_test_f1,
-                "confusion_matrix": after_test_confusion.tolist()
-            }
-        }
+            dict: Métricas de avaliação para treino, teste e pós-teste. A chave "timing" de cada conjunto
+            traz o tempo, o tamanho do modelo e o pico de memória (com `trace_memory=True`) registrados
+            em `self.profile`.
+        """
+        # Avaliação em cada conjunto: o último dia do pós-teste ainda não tem alvo
+        results = {}
+        for split, y, df, end in [('train', self.y_train, self.train, None),
+                                  ('test', self.y_test, self.test, None),
+                                  ('after_test', self.y_after_test, self.after_test, -1)]:
+            results[split] = confusion_metrics(np.asarray(y)[:end], df['predicao'].to_numpy()[:end],
+                                               self.n_classes)
+            results[split]["timing"] = dict(self.profile[split])
+
+        return results
+
+    def evaluate_many(self, predictions, split='test'):
+        """
+        Avalia várias predições (por exemplo, de muitos modelos) contra os alvos de um conjunto.
+
+        Args:
+            predictions (array): Matriz (modelos x dias) com as predições para o conjunto.
+            split (str): Conjunto de dados ('train', 'test' ou 'after_test').
+
+        Returns:
+            pandas.DataFrame: Uma linha de métricas por vetor de predições.
+        """
+        y = np.asarray({'train': self.y_train, 'test': self.y_test, 'after_test': self.y_after_test}[split])
+        predictions = np.atleast_2d(predictions)
+        if split == 'after_test':
+            y, predictions = y[:-1], predictions[:, :len(y) - 1]
+        return pd.DataFrame(confusion_metrics(y, predictions, self.n_classes)).drop(columns='confusion_matrix')
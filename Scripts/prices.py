@@ -1,8 +1,12 @@
 from yfinance import download
 import requests
-from pandas import read_csv
+from pandas import read_csv, read_pickle, read_parquet, concat, DataFrame, Timestamp
 from io import StringIO
+from typing import Callable, Dict, Iterable, Optional, Union
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import sys
+import os
+import time
 
 import MetaTrader5 as mt5
 from datetime import datetime, timedelta
@@ -11,45 +15,287 @@ import pandas as pd
 # Função para gerar a URL de um setor específico, acessando o repositório do GitHub
 url_setor = lambda setor: f'https://raw.githubusercontent.com/rianlucascs/b3-scraping-project/master/processed_data/1.%20%C3%8Dndices%20de%20Segmentos%20e%20Setoriais/Setores/{setor}/Tabela_{setor}.csv'
 
+def yfinance_fetcher(ticker: str, start: Optional[Timestamp] = None) -> DataFrame:
+    """
+    Baixa preços diários de um ativo pelo Yahoo Finance.
+
+    Args:
+        ticker (str): Ticker do ativo (exemplo: 'PETR4.SA').
+        start (Timestamp, opcional): Primeira data desejada. Se None, baixa todo o histórico.
+
+    Returns:
+        pandas.DataFrame: Dados históricos do ativo com colunas de nível único.
+    """
+    if start is None:
+        df = download(ticker, period='max', progress=False)
+    else:
+        df = download(ticker, start=start.strftime('%Y-%m-%d'), progress=False)
+
+    # Remove o nível extra das colunas, deixando apenas o nome da coluna
+    if df.columns.nlevels > 1:
+        df.columns = df.columns.droplevel(1)
+    df.columns = list(df.columns)
+
+    return df
+
+
+class PriceStore:
+    """
+    Armazenamento local de preços, com um arquivo por ticker.
+
+    Na primeira leitura o histórico completo é baixado pelo `fetcher` e salvo em disco (Parquet,
+    ou pickle quando o `pyarrow` não está instalado). Nas leituras seguintes o arquivo é lido
+    primeiro e somente o trecho final, a partir da última data armazenada, é buscado novamente.
+    Por padrão, enquanto o arquivo for mais recente que `max_age` segundos nenhum acesso à rede é
+    feito; `get(ticker, refresh=True)` busca o trecho final mesmo assim.
+
+    Atributos:
+        path (str): Diretório onde os arquivos são armazenados.
+        fetcher (Callable): Função `fetcher(ticker, start) -> DataFrame` usada para buscar os preços.
+            `start` é None quando o histórico completo deve ser baixado.
+        max_age (float): Tempo, em segundos, durante o qual o arquivo é considerado atualizado.
+        fetches (int): Número de chamadas feitas ao `fetcher` (útil em testes).
+    """
+    DEFAULT_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'predicao-dados-binarios', 'prices')
+
+    def __init__(self, path: Optional[str] = None, fetcher: Callable = yfinance_fetcher,
+                 max_age: float = 6 * 3600):
+        self.path = path or self.DEFAULT_PATH
+        self.fetcher = fetcher
+        self.max_age = max_age
+        self.fetches = 0
+
+        try:
+            import pyarrow  # noqa: F401
+            self.extension = 'parquet'
+        except ImportError:
+            self.extension = 'pkl'
+
+    def _file(self, ticker: str) -> str:
+        """
+        Retorna o caminho do arquivo de um ticker.
+        """
+        name = ''.join(c if c.isalnum() or c in '.-_' else '_' for c in ticker)
+        return os.path.join(self.path, f'{name}.{self.extension}')
+
+    def _fetch(self, ticker: str, start: Optional[Timestamp] = None) -> DataFrame:
+        self.fetches += 1
+        return self.fetcher(ticker, start)
+
+    def read(self, ticker: str) -> Optional[DataFrame]:
+        """
+        Lê os preços armazenados de um ticker.
+
+        Returns:
+            pandas.DataFrame | None: Preços armazenados ou None se o ticker não estiver no disco.
+        """
+        file = self._file(ticker)
+        if not os.path.exists(file):
+            return None
+        return read_parquet(file) if self.extension == 'parquet' else read_pickle(file)
+
+    def write(self, ticker: str, df: DataFrame):
+        """
+        Grava os preços de um ticker no disco, substituindo o arquivo de forma atômica.
+        """
+        os.makedirs(self.path, exist_ok=True)
+        file = self._file(ticker)
+        tmp = f'{file}.{os.getpid()}.tmp'
+        if self.extension == 'parquet':
+            df.to_parquet(tmp)
+        else:
+            df.to_pickle(tmp)
+        os.replace(tmp, file)
+
+    def is_fresh(self, ticker: str) -> bool:
+        """
+        Indica se o arquivo do ticker foi atualizado há menos de `max_age` segundos.
+        """
+        file = self._file(ticker)
+        return os.path.exists(file) and time.time() - os.path.getmtime(file) < self.max_age
+
+    def get(self, ticker: str, refresh: Optional[bool] = None) -> DataFrame:
+        """
+        Retorna os preços de um ticker, atualizando apenas o trecho final quando necessário.
+
+        Args:
+            ticker (str): Ticker do ativo.
+            refresh (bool, opcional): None busca o trecho final apenas se o arquivo for mais antigo que
+                `max_age`; True sempre busca o trecho final; False nunca acessa o `fetcher` quando há
+                dados no disco.
+
+        Returns:
+            pandas.DataFrame: Histórico completo de preços do ativo.
+        """
+        stored = self.read(ticker)
+
+        if stored is None or stored.empty:
+            df = self._fetch(ticker)
+            if df.empty:
+                raise ValueError(f"Nenhum preço encontrado para o ticker '{ticker}'.")
+            self.write(ticker, df)
+            return df
+
+        if refresh is False or (refresh is None and self.is_fresh(ticker)):
+            return stored
+
+        # Busca a partir da última data armazenada: a última barra pode ter sido gravada incompleta
+        tail = self._fetch(ticker, stored.index[-1])
+
+        if tail.empty:
+            os.utime(self._file(ticker))
+            return stored
+
+        # Se o 'Adj Close' da barra em comum mudou houve ajuste de proventos: o histórico inteiro muda
+        overlap = stored.index[-1]
+        if 'Adj Close' in stored.columns and overlap in tail.index:
+            before = stored.at[overlap, 'Adj Close']
+            after = tail.at[overlap, 'Adj Close']
+            if abs(before - after) > 1e-9 * max(abs(before), 1.0):
+                df = self._fetch(ticker)
+                self.write(ticker, df)
+                return df
+
+        df = concat([stored[stored.index < tail.index[0]], tail[stored.columns]])
+        self.write(ticker, df)
+        return df
+
+
 class Prices:
     """
     Classe para obtenção de preços históricos e dados de ativos setoriais.
 
+    Os preços são lidos do armazenamento local `Prices.store` (ver `PriceStore`), que só acessa
+    a rede para buscar as barras que ainda não estão no disco. Para usar outra fonte de dados,
+    por exemplo em testes, basta substituir `Prices.store` por um `PriceStore` com outro `fetcher`,
+    ou informar o `fetcher` em `get_many` e `get_setor_B3` (a assinatura é a mesma: `fetcher(ticker, start)`).
+
     Métodos:
         get(ticker: str) -> pandas.DataFrame:
             Retorna os preços históricos de um ativo financeiro.
 
-        get_setor(setor: str) -> dict:
+        get_many(tickers: list) -> dict:
+            Retorna séries históricas de vários ativos, baixadas em paralelo.
+
+        get_setor_B3(setor: str) -> dict:
             Retorna séries históricas dos ativos de um setor específico.
     """
+    store = PriceStore()
 
     @staticmethod
-    def get(ticker: str):
+    def get(ticker: str, refresh: Optional[bool] = None):
         """
         Obtém os preços históricos de um ativo.
 
         Args:
             ticker (str): Ticker do ativo (exemplo: 'PETR4.SA').
+            refresh (bool, opcional): None respeita o `max_age` do armazenamento; True sempre busca as
+                barras novas; False usa apenas os dados do disco quando existirem (ver `PriceStore.get`).
 
         Returns:
             pandas.DataFrame: Dados históricos do ativo.
         """
-        # Baixa os dados históricos do ativo usando a API do Yahoo Finance
-        df = download(ticker, period='max', progress=False)
+        if Prices.store is None:
+            return yfinance_fetcher(ticker)
 
-        # Remove o nível extra das colunas, deixando apenas o nome da coluna
-        df.columns = df.columns.droplevel(1)
-        df.columns = list(df.columns)
-
-        return df
+        return Prices.store.get(ticker, refresh=refresh)
     
     @staticmethod
-    def get_setor_B3(setor: str):
+    def _stored(ticker: str, start: Optional[Timestamp] = None) -> DataFrame:
+        """
+        Fetcher padrão de `get_many`: lê pelo armazenamento local (`Prices.get`), que já busca apenas o
+        trecho final; `start` é ignorado.
+        """
+        return Prices.get(ticker)
+
+    @staticmethod
+    def _get_with_retry(ticker: str, fetcher: Callable, retries: int, backoff: float) -> DataFrame:
+        """
+        Busca o histórico completo de um ticker, repetindo a tentativa com espera exponencial em caso de erro.
+        """
+        for attempt in range(retries + 1):
+            try:
+                return fetcher(ticker, None)
+            except Exception:
+                if attempt == retries:
+                    raise
+                time.sleep(backoff * 2 ** attempt)
+
+    @staticmethod
+    def get_many(tickers: Iterable[str], max_workers: int = 8, retries: int = 2, backoff: float = 0.5,
+                 fetcher: Optional[Callable] = None, wide: Union[bool, str] = False,
+                 progress: bool = True, return_errors: bool = False):
+        """
+        Obtém os preços de vários ativos em paralelo, com concorrência limitada.
+
+        Cada ticker é buscado em uma thread do pool. Falhas são isoladas: um ticker que continua
+        falhando após `retries` novas tentativas é omitido do resultado, e o erro é retornado com
+        `return_errors=True` (cada chamada tem os seus próprios erros, mesmo em chamadas simultâneas).
+
+        Args:
+            tickers (Iterable[str]): Tickers dos ativos.
+            max_workers (int): Número máximo de downloads simultâneos.
+            retries (int): Número de novas tentativas por ticker após uma falha.
+            backoff (float): Espera inicial, em segundos, entre tentativas (dobra a cada tentativa).
+            fetcher (Callable, opcional): Função `fetcher(ticker, start) -> DataFrame`, com a assinatura do
+                `PriceStore.fetcher` (ex.: `yfinance_fetcher`), chamada com `start=None` (histórico completo).
+                Padrão: o armazenamento local (`Prices.get`).
+            wide (bool | str): Se True, retorna um único DataFrame alinhado pelas datas com a coluna
+                'Adj Close' de cada ativo. Se for o nome de uma coluna, usa essa coluna.
+            progress (bool): Exibe a linha de progresso no stdout.
+            return_errors (bool): Se True, retorna também o dicionário {ticker: exceção} das falhas.
+
+        Returns:
+            dict | pandas.DataFrame: Dicionário {ticker: preços}, na ordem de `tickers`, ou o DataFrame largo
+            (vazio se todos os tickers falharem); com `return_errors=True`, a tupla (resultado, erros).
+        """
+        if max_workers < 1:
+            raise ValueError("O parâmetro 'max_workers' deve ser um número inteiro positivo.")
+
+        tickers = list(dict.fromkeys(tickers))
+        fetcher = fetcher or Prices._stored
+        results, errors = {}, {}
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(Prices._get_with_retry, ticker, fetcher, retries, backoff): ticker
+                       for ticker in tickers}
+            for future in as_completed(futures):
+                ticker = futures[future]
+                try:
+                    results[ticker] = future.result()
+                except Exception as e:
+                    errors[ticker] = e
+                if progress:
+                    sys.stdout.write(f'\r [*********************100%***********************]  '
+                                     f'{len(results) + len(errors)} of {len(tickers)} completed')
+
+        if progress and errors:
+            sys.stdout.write(f'\n{len(errors)} Failed downloads: {list(errors)}\n')
+
+        results = {ticker: results[ticker] for ticker in tickers if ticker in results}
+
+        if wide:
+            column = 'Adj Close' if wide is True else wide
+            series = {ticker: df[column] for ticker, df in results.items()}
+            results = concat(series, axis=1).sort_index() if series else DataFrame()
+
+        return (results, errors) if return_errors else results
+
+    @staticmethod
+    def get_setor_B3(setor: str, max_workers: int = 8, retries: int = 2, backoff: float = 0.5,
+                     fetcher: Optional[Callable] = None, wide: Union[bool, str] = False,
+                     return_errors: bool = False):
         """
         Obtém séries históricas de ativos de um setor.
 
         Args:
             setor (str): Nome do setor (exemplo: 'UTIL').
+            max_workers (int): Número máximo de downloads simultâneos.
+            retries (int): Número de novas tentativas por ticker após uma falha.
+            backoff (float): Espera inicial, em segundos, entre tentativas.
+            fetcher (Callable, opcional): Função `fetcher(ticker, start) -> DataFrame` (ver `Prices.get_many`).
+            wide (bool | str): Se verdadeiro, retorna um único DataFrame alinhado (ver `Prices.get_many`).
+            return_errors (bool): Se True, retorna também os erros de cada ticker (ver `Prices.get_many`).
 
         Returns:
             dict: Dicionário contendo os ativos como chaves e os preços históricos como valores.
@@ -63,15 +309,10 @@ class Prices:
         # Lê os tickers de um arquivo CSV no formato de texto e extrai a coluna 'Código'
         tickers_setor = read_csv(StringIO(response.text), delimiter=',')['Código'].values
 
-        # Cria um dicionário para armazenar as séries históricas dos ativos
-        dict_series_setor = {}
-        for i, ticker in enumerate(tickers_setor):
-            sys.stdout.write(f'\r [*********************100%***********************]  {i + 1} of {len(tickers_setor)} completed')
-            
-            # Para cada ticker, obtém os dados históricos e adiciona ao dicionário
-            dict_series_setor[f'{ticker}.SA'] = Prices.get(f'{ticker}.SA')
-
-        return dict_series_setor
+        # Baixa as séries históricas dos ativos em paralelo
+        return Prices.get_many([f'{ticker}.SA' for ticker in tickers_setor], max_workers=max_workers,
+                               retries=retries, backoff=backoff, fetcher=fetcher, wide=wide,
+                               return_errors=return_errors)
 
 # from datetime import datetime
 # df = Prices.get('BBDC4.SA')
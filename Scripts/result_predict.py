@@ -1,6 +1,199 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
 import pandas as pd
 
 
+def pnl_matrix(predictions, target, variation, lotes: int = 1, periods_per_year: int = 252) -> dict:
+    """
+    Calcula o resultado financeiro de várias estratégias de uma só vez, sem alterar os dados de entrada.
+
+    Cada linha de `predictions` é uma estratégia. O resultado diário segue a mesma regra de
+    `ResultPredict`: ganha `|variação|` quando a predição acerta o alvo e perde `|variação|` quando erra,
+    multiplicado pelo número de lotes. Dias sem variação conhecida (NaN) não entram nas estatísticas.
+
+    Args:
+        predictions (array): Predições com formato (dias,) ou (estratégias, dias).
+        target (array): Alvo real de cada dia, com formato (dias,) ou, quando cada estratégia é avaliada
+            em uma série diferente (ex.: trajetórias sintéticas), o mesmo formato de `predictions`.
+        variation (array): Variação absoluta (Close - Open) do dia alvo, com o mesmo formato de `target`.
+        lotes (int): Número de lotes. Se 0, o resultado não é multiplicado.
+        periods_per_year (int): Número de períodos por ano, usado para anualizar o Sharpe.
+
+    Returns:
+        dict: Arrays (estratégias, dias) em "daily", "equity" e "drawdown", e o DataFrame "summary" com
+        total, média, desvio padrão, Sharpe anualizado, drawdown máximo, taxa de acerto e turnover
+        (fração dos dias em que a posição muda) de cada estratégia.
+    """
+    predictions = np.atleast_2d(np.asarray(predictions, dtype=np.float64))
+    target = np.asarray(target, dtype=np.float64)
+    variation = np.asarray(variation, dtype=np.float64)
+
+    if target.shape[-1] != predictions.shape[1] or target.shape != variation.shape or \
+            (target.ndim == 2 and target.shape != predictions.shape):
+        raise ValueError("As predições, o alvo e a variação devem ter o mesmo número de dias.")
+
+    # Resultado diário: +|variação| no acerto e -|variação| no erro
+    factor = lotes if lotes != 0 else 1
+    daily = np.abs(variation) * (2 * (predictions == target) - 1) * factor
+
+    valid = ~np.isnan(daily)
+    n = valid.sum(axis=1)
+    filled = np.where(valid, daily, 0.0)
+
+    equity = np.cumsum(filled, axis=1)
+    peak = np.maximum(np.maximum.accumulate(equity, axis=1), 0.0)
+    drawdown = equity - peak
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = filled.sum(axis=1) / n
+        std = np.sqrt(((filled - mean[:, None]) ** 2 * valid).sum(axis=1) / (n - 1))
+        sharpe = mean / std * np.sqrt(periods_per_year)
+        win_rate = (filled > 0).sum(axis=1) / n
+        turnover = (np.diff(predictions, axis=1) != 0).sum(axis=1) / (predictions.shape[1] - 1)
+
+    summary = pd.DataFrame({
+        "total": equity[:, -1] if equity.shape[1] else np.zeros(len(equity)),
+        "mean": mean,
+        "std": std,
+        "sharpe": sharpe,
+        "max_drawdown": drawdown.min(axis=1) if drawdown.shape[1] else np.zeros(len(drawdown)),
+        "win_rate": win_rate,
+        "turnover": turnover,
+    })
+
+    return {
+        "daily": daily,
+        "equity": equity,
+        "drawdown": drawdown,
+        "summary": summary
+    }
+
+
+class PeriodAggregator:
+    """
+    Agrega resultados diários por semana, mês, trimestre e ano usando códigos de período pré-calculados.
+
+    Os códigos de cada calendário (DatetimeIndex) são calculados uma única vez e guardados em cache,
+    identificados por um hash do índice, de modo que execuções diferentes sobre o mesmo calendário
+    reutilizam os mesmos códigos. O cache é compartilhado pelo processo e protegido por um lock, pois
+    pode ser usado por várias threads ao mesmo tempo. As agregações são feitas com `np.bincount`, sem
+    `resample`.
+
+    Os períodos seguem as mesmas fronteiras do `resample` do pandas: semanas terminam no domingo ('W'),
+    meses, trimestres e anos seguem o calendário civil.
+    """
+
+    FREQUENCIES = ('day', 'week', 'month', 'quarter', 'year')
+    CACHE_SIZE = 64
+    _cache = OrderedDict()
+    _lock = threading.Lock()
+
+    def __init__(self, index: pd.DatetimeIndex):
+        """
+        Inicializa o agregador com o calendário dos dados.
+
+        Args:
+            index (pd.DatetimeIndex): Índice de datas dos resultados diários.
+        """
+        self.index = index
+        self.codes = self.codes_for(index)
+
+    @staticmethod
+    def _key(index: pd.DatetimeIndex) -> tuple:
+        """Gera a chave de cache de um índice de datas (fuso horário e hash dos valores)."""
+        digest = hashlib.blake2b(np.ascontiguousarray(index.asi8).tobytes(), digest_size=16).hexdigest()
+        return str(index.tz), digest
+
+    @classmethod
+    def codes_for(cls, index: pd.DatetimeIndex) -> dict:
+        """
+        Retorna os códigos de período (0, 1, 2, ...) de cada data para cada frequência, usando o cache.
+
+        Args:
+            index (pd.DatetimeIndex): Índice de datas.
+
+        Returns:
+            dict: Para cada frequência, a tupla (códigos, número de períodos).
+        """
+        key = cls._key(index)
+        with cls._lock:
+            if key in cls._cache:
+                cls._cache.move_to_end(key)
+                return cls._cache[key]
+
+        # Usa a data local (sem fuso horário) para definir as fronteiras dos períodos
+        local = index.tz_localize(None) if index.tz is not None else index
+        days = local.asi8 // (86_400 * 10**9)
+        year, month = local.year.to_numpy(np.int64), local.month.to_numpy(np.int64)
+
+        raw = {
+            'day': days,
+            'week': (days + 3) // 7,  # 01/01/1970 foi quinta-feira: semanas de segunda a domingo
+            'month': year * 12 + month - 1,
+            'quarter': year * 4 + (month - 1) // 3,
+            'year': year,
+        }
+
+        codes = {}
+        for frequency, values in raw.items():
+            # Códigos densos: o índice é ordenado, então um novo período começa quando o valor muda
+            dense = np.concatenate(([0], np.cumsum(np.diff(values) != 0))) if len(values) else values
+            codes[frequency] = (dense, int(dense[-1]) + 1 if len(dense) else 0)
+
+        with cls._lock:
+            cls._cache[key] = codes
+            cls._cache.move_to_end(key)
+            while len(cls._cache) > cls.CACHE_SIZE:
+                cls._cache.popitem(last=False)
+        return codes
+
+    def aggregate(self, values) -> pd.DataFrame:
+        """
+        Calcula, para cada frequência, a média dos períodos, a soma total, a taxa de períodos positivos,
+        o pior período e o número de períodos. Valores NaN são ignorados, como no `resample`.
+
+        Args:
+            values (array): Resultados diários com formato (dias,) ou (estratégias, dias).
+
+        Returns:
+            pd.DataFrame: Uma linha por frequência (e por estratégia, quando `values` é 2-D) com as colunas
+            'mean', 'sum', 'win_rate', 'worst' e 'n_periods'.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        matrix = np.atleast_2d(values)
+        k = len(matrix)
+        valid = ~np.isnan(matrix)
+        filled = np.where(valid, matrix, 0.0).ravel()
+        valid = valid.ravel().astype(np.float64)
+
+        rows = {}
+        for frequency in self.FREQUENCIES:
+            codes, n_periods = self.codes[frequency]
+            # Desloca os códigos de cada estratégia para somar todas em um único bincount
+            flat = (codes + np.arange(k)[:, None] * n_periods).ravel()
+            sums = np.bincount(flat, weights=filled, minlength=k * n_periods).reshape(k, n_periods)
+            counts = np.bincount(flat, weights=valid, minlength=k * n_periods).reshape(k, n_periods)
+
+            present = counts > 0
+            with np.errstate(invalid='ignore', divide='ignore'):
+                means = np.where(present, sums / counts, np.nan)
+                n = present.sum(axis=1)
+                rows[frequency] = {
+                    'mean': np.nansum(means, axis=1) / n,
+                    'sum': sums.sum(axis=1),
+                    'win_rate': (present & (sums > 0)).sum(axis=1) / n,
+                    'worst': np.where(n > 0, np.where(present, sums, np.inf).min(axis=1), np.nan),
+                    'n_periods': n,
+                }
+
+        frames = {frequency: pd.DataFrame(stats) for frequency, stats in rows.items()}
+        result = pd.concat(frames, names=['frequency', 'strategy'])
+        return result.droplevel('strategy') if values.ndim == 1 else result
+
+
 class ResultPredict:
     """
     Classe para calcular e avaliar o impacto das previsões de lotes sobre os retornos financeiros.
@@ -30,6 +223,9 @@ class ResultPredict:
         # Validar se os DataFrames possuem índice de data
         self._verificar_indice_datetime()
 
+        # Nome da coluna do alvo, identificado uma única vez
+        self.alvo = train.filter(like='alvo').columns[0]
+
     def _verificar_indice_datetime(self):
         """
         Verifica se o índice dos DataFrames é do tipo DatetimeIndex e converte, se necessário.
@@ -48,18 +244,58 @@ class ResultPredict:
         Returns:
             pd.DataFrame: DataFrame com as colunas de impacto calculadas.
         """
-        # Calcular o impacto da previsão (resultado de predicao)
-        df['resultado_predicao'] = df['variacao_absoluta'].abs() * (
-            2 * (df['predicao'] == df.filter(like='alvo').squeeze()) - 1
-        )
-        
-        # Aplicar o fator de lotes se for diferente de zero
-        if self.lotes != 0:
-            df['resultado_predicao'] *= self.lotes
+        # Calcular o impacto da previsão (resultado de predicao), já multiplicado pelo número de lotes
+        daily = pnl_matrix(df['predicao'].to_numpy(), df[self.alvo].to_numpy(),
+                           df['variacao_absoluta'].to_numpy(), lotes=self.lotes)['daily'][0]
+        df['resultado_predicao'] = daily
         
         # Calcular o acumulado
         df['resultado_predicao_acumulado'] = df['resultado_predicao'].cumsum()
         return df
+
+    def score_strategies(self, predictions, split: str = 'test') -> dict:
+        """
+        Avalia várias estratégias (vetores de predição) sobre um conjunto, sem alterar os DataFrames.
+
+        Args:
+            predictions (array): Matriz (estratégias x dias) com as predições para o conjunto.
+            split (str): Conjunto de dados ('train', 'test' ou 'after_test').
+
+        Returns:
+            dict: Resultado de `pnl_matrix` (resultado diário, patrimônio, drawdown e resumo por estratégia).
+        """
+        df = {'train': self.train, 'test': self.test, 'after_test': self.after_test}[split]
+        return pnl_matrix(predictions, df[self.alvo].to_numpy(), df['variacao_absoluta'].to_numpy(),
+                          lotes=self.lotes)
+    
+    @staticmethod
+    def score_paths(predictions, target, variation, lotes: int = 1) -> pd.DataFrame:
+        """
+        Avalia de uma só vez as predições de várias séries (ex.: trajetórias sintéticas), uma por linha.
+
+        Dias sem predição ou sem alvo conhecido (valores negativos) não entram nas métricas.
+
+        Args:
+            predictions (array): Predições (séries, dias).
+            target (array): Alvo de cada série e dia (séries, dias).
+            variation (array): Variação absoluta (Close - Open) do dia alvo (séries, dias).
+            lotes (int): Número de lotes.
+
+        Returns:
+            pd.DataFrame: Uma linha por série com a acurácia, o número de dias avaliados e o resumo
+            financeiro de `pnl_matrix`.
+        """
+        predictions = np.asarray(predictions)
+        target = np.asarray(target)
+        valid = (predictions >= 0) & (target >= 0)
+        n = valid.sum(axis=1)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            accuracy = ((predictions == target) & valid).sum(axis=1) / n
+        summary = pnl_matrix(predictions, target, np.where(valid, variation, np.nan), lotes=lotes)['summary']
+        summary.insert(0, 'accuracy', accuracy)
+        summary.insert(1, 'n_days', n)
+        return summary
     
     def calcula_train_day(self) -> pd.DataFrame:
         """
@@ -96,27 +332,42 @@ class ResultPredict:
         Avalia os resultados para os conjuntos de treino, teste e pós-teste.
 
         Returns:
-            dict: Dicionário contendo as métricas médias para cada conjunto de dados.
+            dict: Dicionário contendo as métricas médias para cada conjunto de dados. "average_daily_returns"
+            é a média por linha de 'resultado_predicao'; em dados intradiários, a média por dia do calendário
+            está em `evaluate_periods()` (frequência 'day').
         """
-        def calcular_metricas(df: pd.DataFrame) -> dict:
+        def calcular_metricas(df: pd.DataFrame, periods: pd.DataFrame) -> dict:
             """
-            Função auxiliar para calcular as métricas médias de retorno.
+            Função auxiliar para extrair as métricas médias de retorno da agregação por período.
 
             Args:
-                df (pd.DataFrame): O DataFrame contendo os resultados de previsão.
+                df (pd.DataFrame): Conjunto de dados com a coluna 'resultado_predicao'.
+                periods (pd.DataFrame): Agregação retornada por `PeriodAggregator.aggregate`.
 
             Returns:
                 dict: Dicionário com as métricas calculadas.
             """
             return {
                 "average_daily_returns": df['resultado_predicao'].mean(),
-                "average_weekly_returns": df['resultado_predicao'].resample('W').mean().mean(),
-                "average_monthly_returns": df['resultado_predicao'].resample('M').mean().mean(),
-                "average_quarterly_return": df['resultado_predicao'].resample('Q').mean().mean()
+                "average_weekly_returns": periods.loc['week', 'mean'],
+                "average_monthly_returns": periods.loc['month', 'mean'],
+                "average_quarterly_return": periods.loc['quarter', 'mean']
             }
-        
-        return {
-            "train": calcular_metricas(self.train),
-            "test": calcular_metricas(self.test),
-            "after_test": calcular_metricas(self.after_test)
+
+        periods = self.evaluate_periods()
+        return {split: calcular_metricas(df, periods.loc[split])
+                for split, df in (('train', self.train), ('test', self.test), ('after_test', self.after_test))}
+
+    def evaluate_periods(self) -> pd.DataFrame:
+        """
+        Agrega o resultado diário de cada conjunto por dia, semana, mês, trimestre e ano.
+
+        Returns:
+            pd.DataFrame: Média, soma, taxa de períodos positivos, pior período e número de períodos,
+            indexados por conjunto ('train', 'test', 'after_test') e frequência.
+        """
+        frames = {
+            split: PeriodAggregator(df.index).aggregate(df['resultado_predicao'].to_numpy())
+            for split, df in (('train', self.train), ('test', self.test), ('after_test', self.after_test))
         }
+        return pd.concat(frames, names=['split', 'frequency'])
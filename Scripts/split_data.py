@@ -1,6 +1,7 @@
 from datetime import datetime, timedelta
 from pandas import DataFrame, DatetimeIndex, Timestamp
-from typing import Optional
+from typing import Iterator, Optional, Tuple, Union
+import numpy as np
 
 class SplitData:
     """
@@ -17,14 +18,23 @@ class SplitData:
                              O padrão é 0.50.
         step_size (int, opcional): Número de dias a ser adicionado às datas `start` e `end`.
                                     Se fornecido, move o intervalo de dados.
+        copy (bool, opcional): Se False, não copia os dados: o DataFrame é compartilhado e os conjuntos
+                               são fatias posicionais dele (ver `train` e `test`).
     """
     def __init__(self, df: DataFrame, start: Optional[str] = None, end: Optional[str] = None, 
-                 p: float = 0.50, step_size: Optional[int] = None):
+                 p: float = 0.50, step_size: Optional[int] = None, copy: bool = True):
         # Verifica se o índice é um DatetimeIndex
         if not isinstance(df.index, DatetimeIndex):
             raise ValueError("O índice do DataFrame deve ser do tipo `DatetimeIndex`.")
 
-        self.df = df.copy().tz_localize(None)
+        if copy:
+            self.df = df.copy().tz_localize(None)
+        else:
+            # Cópia rasa (sem copiar os dados); o fuso horário só é removido quando existe
+            self.df = df.copy(deep=False)
+            if self.df.index.tz is not None:
+                self.df.index = self.df.index.tz_localize(None)
+        self.copy = copy
 
         # Atribui as datas de início e fim com base nos parâmetros ou no índice do DataFrame
         self.start = self._parse_date(start, df.index.min())
@@ -34,6 +44,10 @@ class SplitData:
         if step_size is not None:
             self._apply_step_size(step_size)
 
+            # O deslocamento pode cair em um dia sem pregão: usa o pregão mais próximo
+            self.start = self.df.index[self._snap(self.start)]
+            self.end = self.df.index[self._snap(self.end)]
+
         # Verifica se as datas de 'start' e 'end' estão dentro do índice do DataFrame
         self._validate_dates()
 
@@ -88,7 +102,7 @@ class SplitData:
         Returns:
             pd.DataFrame: Dados de treino.
         """
-        return self.data_range.iloc[:self.split_index].dropna() # <-!
+        return self._dropna(self.data_range.iloc[:self.split_index]) # <-!
 
     def test(self) -> DataFrame:
         """
@@ -97,7 +111,7 @@ class SplitData:
         Returns:
             pd.DataFrame: Dados de teste.
         """
-        return self.data_range.iloc[self.split_index:].dropna() # <-!
+        return self._dropna(self.data_range.iloc[self.split_index:]) # <-!
 
     def after_test(self) -> DataFrame:
         """
@@ -107,3 +121,119 @@ class SplitData:
             pd.DataFrame: Dados pós-teste.
         """
         return self.df.loc[self.end:].iloc[1:] # .dropna() # <-!
+
+    def _dropna(self, df: DataFrame) -> DataFrame:
+        """
+        Remove as linhas com valores ausentes de um conjunto.
+
+        Com `copy=False`, quando as linhas ausentes estão apenas no início (aquecimento das features) e
+        no fim (alvos ainda desconhecidos), o resultado é uma fatia posicional que compartilha os dados,
+        em vez da cópia criada pelo `dropna`.
+
+        Args:
+            df (pd.DataFrame): Conjunto de dados.
+
+        Returns:
+            pd.DataFrame: Conjunto sem linhas com valores ausentes.
+        """
+        if self.copy:
+            return df.dropna()
+
+        valid = df.notna().to_numpy().all(axis=1)
+        if not valid.any():
+            return df.iloc[:0].copy(deep=False)
+        first = int(valid.argmax())
+        last = len(valid) - int(valid[::-1].argmax())
+        if not valid[first:last].all():
+            return df.dropna()
+        # Cópia rasa: novas colunas (ex.: 'predicao') são adicionadas só ao conjunto, sem alterar `self.df`
+        return df.iloc[first:last].copy(deep=False)
+
+    def _snap(self, date) -> int:
+        """
+        Retorna a posição, no índice do DataFrame, do pregão mais próximo da data informada.
+
+        Args:
+            date (datetime | str): Data a ser ajustada.
+
+        Returns:
+            int: Posição do pregão mais próximo (em caso de empate, o anterior).
+        """
+        index = self.df.index
+        pos = index.searchsorted(Timestamp(date))
+        if pos == 0:
+            return 0
+        if pos == len(index):
+            return len(index) - 1
+        before, after = index[pos - 1], index[pos]
+        return pos - 1 if Timestamp(date) - before <= after - Timestamp(date) else pos
+
+    def walk_forward(self, train_size: int, test_size: int, step: Optional[int] = None,
+                     after_size: Optional[int] = None, expanding: bool = False,
+                     start: Optional[str] = None, end: Optional[str] = None,
+                     positions: bool = False) -> Iterator[Tuple[Union[DataFrame, np.ndarray], ...]]:
+        """
+        Gera janelas sucessivas (walk-forward) de treino, teste e pós-teste.
+
+        As datas são convertidas em posições uma única vez com `searchsorted` (cada data é ajustada
+        para o pregão mais próximo) e cada janela é obtida por fatias posicionais, sem cópias.
+        As linhas iniciais com valores ausentes (período de aquecimento das features) são ignoradas, e o
+        treino e o teste terminam na última linha com alvo conhecido: as últimas linhas, cujo alvo ainda
+        depende de barras futuras ('alvo_*' ausente ou -1, 'variacao_absoluta' ausente), só aparecem no
+        pós-teste. Linhas com valores ausentes no meio dos dados (ex.: falhas de preço ou 'Volume' ausente)
+        são removidas do treino e do teste, como em `train()` e `test()`; nesse caso, o conjunto tem menos
+        linhas que `train_size` ou `test_size` e, sem `positions`, é uma cópia em vez de uma fatia.
+
+        Args:
+            train_size (int): Número de pregões do conjunto de treino.
+            test_size (int): Número de pregões do conjunto de teste.
+            step (int, opcional): Número de pregões entre o início de duas janelas. Padrão: `test_size`.
+            after_size (int, opcional): Número de pregões do pós-teste. Se None, vai até o fim dos dados.
+            expanding (bool): Se True, o treino sempre começa no início dos dados (janela expansiva).
+            start (str, opcional): Data inicial da primeira janela no formato 'YYYY-MM-DD'.
+            end (str, opcional): Data limite para o fim do teste no formato 'YYYY-MM-DD'.
+            positions (bool): Se True, retorna arrays de posições inteiras em vez de DataFrames.
+
+        Yields:
+            tuple: (train, test, after_test) como DataFrames (`iloc`) ou arrays de posições.
+        """
+        if train_size <= 0 or test_size <= 0:
+            raise ValueError("Os parâmetros `train_size` e `test_size` devem ser positivos.")
+
+        step = test_size if step is None else step
+        if step <= 0:
+            raise ValueError("O valor de `step` deve ser positivo.")
+
+        n = len(self.df)
+
+        # Primeira linha sem valores ausentes, calculada uma única vez
+        valid = self.df.notna().to_numpy().all(axis=1)
+        first_valid = int(valid.argmax()) if valid.any() else n
+
+        # Fim da última linha com alvo conhecido
+        targets = self.df.filter(regex='^alvo')
+        known = (targets.notna() & (targets >= 0)).to_numpy().all(axis=1)
+        if 'variacao_absoluta' in self.df.columns:
+            known &= self.df['variacao_absoluta'].notna().to_numpy()
+        last_known = n - int(known[::-1].argmax()) if known.any() else 0
+
+        first = max(self._snap(start) if start else 0, first_valid)
+        last = min(self._snap(end) + 1 if end else n, last_known)
+
+        # Linhas usadas no treino e no teste: sem valores ausentes e com alvo conhecido
+        usable = valid & known
+
+        def rows(begin: int, stop: int):
+            if usable[begin:stop].all():
+                return np.arange(begin, stop) if positions else self.df.iloc[begin:stop]
+            kept = np.flatnonzero(usable[begin:stop]) + begin
+            return kept if positions else self.df.iloc[kept]
+
+        for begin in range(first, last - train_size - test_size + 1, step):
+            train_start = first if expanding else begin
+            split = begin + train_size
+            stop = split + test_size
+            after_stop = n if after_size is None else min(stop + after_size, n)
+
+            after = np.arange(stop, after_stop) if positions else self.df.iloc[stop:after_stop]
+            yield rows(train_start, split), rows(split, stop), after
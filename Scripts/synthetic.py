@@ -1,20 +1,277 @@
+import numpy as np
+from pandas import DataFrame, to_datetime
+
+# Ordem das colunas do array de trajetórias (terceiro eixo)
+COLUMNS = ('Open', 'High', 'Low', 'Close')
+
+
+def bar_shapes(df: DataFrame) -> np.ndarray:
+    """
+    Decompõe cada barra histórica em log-retornos relativos ao fechamento anterior.
+
+    Colunas do resultado:
+    0. retorno do fechamento: log(Close / Close anterior);
+    1. gap da abertura: log(Open / Close anterior);
+    2. sombra superior: log(High / max(Open, Close)), >= 0;
+    3. sombra inferior: log(min(Open, Close) / Low), >= 0.
+
+    Reamostrar as quatro colunas juntas preserva o formato das barras (gaps e amplitude) do ativo.
+
+    Args:
+        df (DataFrame): Preços com as colunas 'Open', 'High', 'Low' e 'Close'. Linhas com preços
+            ausentes ou não positivos são ignoradas.
+
+    Returns:
+        np.ndarray: Array (barras - 1, 4) em float64.
+    """
+    prices = df[list(COLUMNS)].to_numpy(np.float64)
+    prices = prices[np.isfinite(prices).all(axis=1) & (prices > 0).all(axis=1)]
+    if len(prices) < 2:
+        raise ValueError("São necessárias ao menos duas barras válidas para gerar séries sintéticas.")
+
+    log = np.log(prices)
+    previous = log[:-1, 3]
+    open_, high, low, close = log[1:].T
+    return np.column_stack([
+        close - previous,
+        open_ - previous,
+        np.maximum(high - np.maximum(open_, close), 0),
+        np.maximum(np.minimum(open_, close) - low, 0),
+    ])
+
+
+def build_ohlc(shapes: np.ndarray, start_price: float, dtype=np.float64) -> np.ndarray:
+    """
+    Monta trajetórias OHLC a partir de barras no formato de `bar_shapes`.
+
+    Args:
+        shapes (np.ndarray): Array (trajetórias, passos, 4) com retorno, gap e sombras de cada barra.
+        start_price (float): Fechamento anterior à primeira barra.
+        dtype: Tipo do array retornado (float32 reduz a memória pela metade).
+
+    Returns:
+        np.ndarray: Array (trajetórias, passos, 4) com as colunas de `COLUMNS`.
+    """
+    close = np.log(start_price) + np.cumsum(shapes[..., 0], axis=1)
+    previous = np.empty_like(close)
+    previous[:, 0] = np.log(start_price)
+    previous[:, 1:] = close[:, :-1]
+    open_ = previous + shapes[..., 1]
+
+    ohlc = np.empty(shapes.shape, dtype=np.float64)
+    ohlc[..., 0] = open_
+    ohlc[..., 1] = np.maximum(open_, close) + shapes[..., 2]
+    ohlc[..., 2] = np.minimum(open_, close) - shapes[..., 3]
+    ohlc[..., 3] = close
+    np.exp(ohlc, out=ohlc)
+    return ohlc.astype(dtype, copy=False)
 
-import requests
-import pandas as pd
-from pandas import to_datetime
 
 class Synthetic:
+    """
+    Gerador local de séries de preços sintéticas (Monte Carlo), reprodutível por semente.
 
-    def monte_carlo(ticker):
-        url = 'https://raw.githubusercontent.com/rianlucascs/simulacao-de-monte-carlo/master/Scripts/monte_carlo.py'
-        response = requests.get(url)
-        exec(response.text, globals())
-        monaco = MonteCarlo(ticker, 'max')
-        df = monaco.simulacao(n_simulacao=1, custo_operacional=0)
-        df.index = to_datetime(df.index).normalize()
-        monaco = monaco.loc_sim(df, 0)
-        return monaco
+    Métodos de simulação:
+    - 'gbm': movimento browniano geométrico para o fechamento, com deriva e volatilidade estimadas
+      do histórico (ou informadas); gap e sombras das barras são reamostrados do histórico.
+    - 'bootstrap': reamostragem, com reposição, das barras históricas (ver `bar_shapes`).
+    - 'block_bootstrap': reamostragem de blocos circulares de `block_size` barras consecutivas, o que
+      preserva a autocorrelação e os agrupamentos de volatilidade de curto prazo.
 
+    Cada trajetória tem um gerador próprio, derivado da semente com `SeedSequence.spawn` (a trajetória i
+    usa o i-ésimo filho de `SeedSequence(seed)`). Assim, a trajetória i é sempre a mesma, independentemente
+    de quantas trajetórias são pedidas, do tamanho dos lotes ou de como a geração é dividida entre processos.
 
-# print(Synthetic.monte_carlo('VALE3.SA'))
+    O volume de cada barra sintética é o volume da barra histórica sorteada para ela (reamostrado junto
+    com o formato da barra). Se o histórico não tem a coluna 'Volume', as trajetórias têm apenas OHLC.
+
+    Atributos:
+        method (str): Método de simulação.
+        columns (tuple): Colunas do array de trajetórias: `COLUMNS` e, se houver no histórico, 'Volume'.
+        n_steps (int): Número de barras de cada trajetória.
+        index (Index): Datas das barras sintéticas (as últimas `n_steps` datas do histórico).
+        start_price (float): Fechamento real anterior à primeira barra sintética.
+        block_size (int): Tamanho dos blocos do 'block_bootstrap'.
+        seed (int): Semente da simulação.
+        mu (float): Deriva por barra do 'gbm'.
+        sigma (float): Volatilidade por barra do 'gbm'.
+        dtype: Tipo dos arrays de preços gerados.
+    """
+
+    METHODS = ('gbm', 'bootstrap', 'block_bootstrap')
+    COLUMNS = COLUMNS
+    # Tamanho padrão dos lotes de `iter_paths`
+    CHUNK = 256
+
+    def __init__(self, df: DataFrame, method: str = 'block_bootstrap', n_steps: int = None,
+                 block_size: int = 20, seed: int = 0, mu: float = None, sigma: float = None,
+                 dtype=np.float64):
+        """
+        Inicializa o gerador a partir dos preços históricos.
+
+        Args:
+            df (DataFrame): Preços históricos com as colunas 'Open', 'High', 'Low' e 'Close'.
+            method (str): 'gbm', 'bootstrap' ou 'block_bootstrap'.
+            n_steps (int): Número de barras de cada trajetória. Se None, usa todo o histórico.
+            block_size (int): Tamanho dos blocos do 'block_bootstrap'.
+            seed (int): Semente da simulação. Se None, usa uma semente aleatória (disponível em `seed`).
+            mu (float): Deriva por barra do 'gbm'. Se None, é estimada do histórico.
+            sigma (float): Volatilidade por barra do 'gbm'. Se None, é estimada do histórico.
+            dtype: Tipo dos arrays de preços gerados. Default: float64.
+
+        Raises:
+            ValueError: Se o método for inválido ou `n_steps` for maior que o histórico disponível.
+        """
+        if method not in self.METHODS:
+            raise ValueError(f"Método '{method}' inválido. Opções: {self.METHODS}")
+
+        valid = df[list(COLUMNS)].notna().all(axis=1) & (df[list(COLUMNS)] > 0).all(axis=1)
+        history = df.loc[valid.to_numpy()]
+        self.shapes = bar_shapes(history)
+
+        self.n_steps = len(self.shapes) if n_steps is None else int(n_steps)
+        if not 0 < self.n_steps <= len(self.shapes):
+            raise ValueError(f"n_steps deve estar entre 1 e {len(self.shapes)} (barras do histórico).")
+
+        self.method = method
+        self.columns = COLUMNS + ('Volume',) if 'Volume' in history.columns else COLUMNS
+        # Volume da barra histórica correspondente a cada linha de `shapes`
+        self.volume = history['Volume'].to_numpy(np.float64)[1:] if 'Volume' in history.columns else None
+        self.index = history.index[-self.n_steps:]
+        self.start_price = float(history['Close'].iloc[-self.n_steps - 1])
+        self.block_size = max(1, int(block_size))
+        self.seed = int(np.random.SeedSequence().entropy) if seed is None else int(seed)
+        self.dtype = dtype
+
+        returns = self.shapes[:, 0]
+        self.sigma = float(returns.std()) if sigma is None else float(sigma)
+        self.mu = float(returns.mean()) + self.sigma ** 2 / 2 if mu is None else float(mu)
 
+    def _indices(self, rng: np.random.Generator, n_paths: int) -> np.ndarray:
+        """
+        Sorteia as barras históricas usadas em cada passo de cada trajetória.
+        """
+        m = len(self.shapes)
+        if self.method != 'block_bootstrap':
+            return rng.integers(0, m, (n_paths, self.n_steps))
+
+        n_blocks = -(-self.n_steps // self.block_size)
+        starts = rng.integers(0, m, (n_paths, n_blocks, 1))
+        indices = (starts + np.arange(self.block_size)) % m
+        return indices.reshape(n_paths, -1)[:, :self.n_steps]
+
+    def _rng(self, path: int) -> np.random.Generator:
+        """
+        Retorna o gerador da trajetória `path` (igual ao de `SeedSequence(seed).spawn(path + 1)[path]`).
+        """
+        return np.random.default_rng(np.random.SeedSequence(self.seed, spawn_key=(path,)))
+
+    def paths(self, n_paths: int, first: int = 0) -> np.ndarray:
+        """
+        Gera as trajetórias `first` até `first + n_paths - 1`.
+
+        Args:
+            n_paths (int): Número de trajetórias.
+            first (int): Número da primeira trajetória.
+
+        Returns:
+            np.ndarray: Array (n_paths, n_steps, colunas) com as colunas de `columns`.
+        """
+        n_paths = max(int(n_paths), 0)
+        indices = np.empty((n_paths, self.n_steps), dtype=np.int64)
+        returns = np.empty((n_paths, self.n_steps)) if self.method == 'gbm' else None
+        for i in range(n_paths):
+            rng = self._rng(first + i)
+            indices[i] = self._indices(rng, 1)[0]
+            if returns is not None:
+                returns[i] = rng.normal(self.mu - self.sigma ** 2 / 2, self.sigma, self.n_steps)
+
+        shapes = self.shapes[indices]
+        if returns is not None:
+            shapes[..., 0] = returns
+        ohlc = build_ohlc(shapes, self.start_price, self.dtype)
+        if self.volume is None:
+            return ohlc
+        return np.concatenate([ohlc, self.volume[indices][..., None].astype(self.dtype)], axis=2)
+
+    def iter_paths(self, n_paths: int, first: int = 0, batch_size: int = None):
+        """
+        Gera as trajetórias em lotes, sem manter todas em memória.
+
+        Args:
+            n_paths (int): Número total de trajetórias.
+            first (int): Número da primeira trajetória.
+            batch_size (int): Trajetórias por lote. Default: `CHUNK`.
+
+        Yields:
+            tuple: (número da primeira trajetória do lote, array (lote, n_steps, colunas)).
+        """
+        batch_size = batch_size or self.CHUNK
+        for start in range(first, first + n_paths, batch_size):
+            count = min(batch_size, first + n_paths - start)
+            yield start, self.paths(count, start)
+
+    def frame(self, ohlc: np.ndarray) -> DataFrame:
+        """
+        Converte uma trajetória (n_steps, colunas) em um DataFrame de preços no formato de `Prices.get`.
+
+        'Adj Close' é igual a 'Close' (a série sintética não tem proventos).
+        """
+        df = DataFrame(ohlc, index=self.index, columns=list(self.columns))
+        df['Adj Close'] = df['Close']
+        return df
+
+    def frames(self, paths: np.ndarray) -> list:
+        """
+        Converte um array (trajetórias, n_steps, colunas) em uma lista de DataFrames (ver `frame`).
+        """
+        return [self.frame(ohlc) for ohlc in paths]
+
+    def panel(self, paths: np.ndarray, first: int = 0) -> dict:
+        """
+        Converte um array (trajetórias, n_steps, colunas) em um DataFrame (datas x trajetórias) por coluna
+        de `columns`, no formato de `Features.panel`. As colunas são os números das trajetórias.
+
+        Args:
+            paths (np.ndarray): Trajetórias geradas por `paths`.
+            first (int): Número da primeira trajetória do array.
+
+        Returns:
+            dict: {coluna: DataFrame}, incluindo 'Adj Close' (igual a 'Close').
+        """
+        columns = range(first, first + len(paths))
+        panel = {name: DataFrame(paths[..., i].T, index=self.index, columns=columns)
+                 for i, name in enumerate(self.columns)}
+        panel['Adj Close'] = panel['Close']
+        return panel
+
+    @staticmethod
+    def monte_carlo(ticker: str, n_simulacao: int = 1, method: str = 'gbm', seed: int = None,
+                    prices: DataFrame = None):
+        """
+        Simula séries de preços de um ativo a partir de todo o seu histórico.
+
+        Args:
+            ticker (str): Ticker do ativo (exemplo: 'VALE3.SA').
+            n_simulacao (int): Número de séries simuladas.
+            method (str): Método de simulação (ver `Synthetic.METHODS`).
+            seed (int): Semente da simulação. Se None, usa uma semente aleatória.
+            prices (DataFrame): Preços históricos. Se None, são baixados pelo Yahoo Finance.
+
+        Returns:
+            DataFrame | list: A série simulada (n_simulacao = 1) ou a lista de séries.
+        """
+        if prices is None:
+            from yfinance import download
+            prices = download(ticker, period='max', progress=False)
+            if prices.columns.nlevels > 1:
+                prices.columns = prices.columns.droplevel(1)
+        prices = prices.copy(deep=False)
+        prices.index = to_datetime(prices.index).normalize()
+
+        synthetic = Synthetic(prices, method, seed=seed)
+        frames = synthetic.frames(synthetic.paths(n_simulacao))
+        return frames[0] if n_simulacao == 1 else frames
+
+
+# print(Synthetic.monte_carlo('VALE3.SA'))
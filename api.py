@@ -1,8 +1,23 @@
 
 import requests
-from typing import Union, List
-from pandas import concat, DataFrame
+import numpy as np
+from typing import Callable, Union, List, Tuple
+from pandas import concat, DataFrame, Timedelta, to_timedelta
+from pandas.util import hash_pandas_object
+from pandas.api.types import is_float_dtype
 import os
+import sys
+import json
+import time
+import marshal
+import hashlib
+import threading
+import types
+import io
+import cProfile
+import pstats
+from contextlib import contextmanager
+from collections import OrderedDict
 from requests.exceptions import RequestException
 
 class GitHubScriptLoader:
@@ -15,14 +30,25 @@ class GitHubScriptLoader:
     Attributes:
         BASE_URL (str): URL base do repositório GitHub onde os scripts estão hospedados.
         FILES (list): Lista de scripts a serem baixados e carregados.
+        CACHE_DIR (str): Diretório do cache em disco (código-fonte, bytecode e metadados de cada script).
+        CACHE_TTL (float): Tempo, em segundos, durante o qual um script em cache é usado sem revalidação.
+        OFFLINE (bool): Se True, usa apenas o cache (memória ou disco) e nunca acessa a rede.
         script_name (str): Nome do script a ser carregado.
         enable_debug (bool): Habilita ou desabilita mensagens de depuração.
         object (object): Instância da classe carregada a partir do script Python.
 
+    O cache é compartilhado por todo o processo: cada script é baixado no máximo uma vez por
+    `CACHE_TTL` e compilado uma única vez por conteúdo (chave: nome do script + hash SHA-256 do
+    código). Após o TTL, o script é revalidado com o ETag salvo (`If-None-Match`), e uma resposta
+    304 reaproveita o código e a classe já carregados.
+
     Methods:
         ``_response(script_name: str) -> requests.Response``:
             Realiza uma requisição HTTP para obter o conteúdo de um script Python.
 
+        ``_source(script_name: str) -> Tuple[str, str]``:
+            Retorna o código-fonte de um script e seu hash, usando o cache sempre que possível.
+
         ``_download_and_save_class()``:
             Baixa os scripts Python listados em `FILES` e os salva localmente.
 
@@ -33,8 +59,22 @@ class GitHubScriptLoader:
 
     FILES = ['alvos', 'features', 'graphs', 'machines', 'prices', 'result_predict', 'split_data', 'synthetic'] 
 
+    CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'predicao-dados-binarios', 'scripts')
+
+    CACHE_TTL = 3600
+
+    OFFLINE = False
+
+    # Cache do processo: {script_name: {'sha', 'source', 'etag', 'checked_at'}}
+    _sources = {}
+
+    # Cache do processo: {(script_name, sha): classe carregada}
+    _classes = {}
+
+    _lock = threading.RLock()
+
     def __init__(self, script_name: Union[str, None] = None, enable_debug: bool = False,
-                 import_local: bool = False, path: str = ''):
+                 import_local: bool = False, path: str = '', offline: Union[bool, None] = None):
         """
         Inicializa a classe GitHubScriptLoader.
 
@@ -46,21 +86,24 @@ class GitHubScriptLoader:
         :param enable_debug: Se True, habilita a depuração com prints detalhados.
         :param import_local: Se True, tenta carregar scripts locais em vez de baixar do GitHub.
         :param path: Caminho onde os scripts locais devem ser salvos. Necessário se `import_local` for True.
+        :param offline: Se True, nunca acessa a rede. Se None, usa o valor de `OFFLINE`.
         """
         self.script_name = script_name
         self.enable_debug = enable_debug
         self.path = path
+        self.offline = self.OFFLINE if offline is None else offline
         self.object = self._download_and_load_class() if not import_local else self._download_and_save_class()
     
-    def _response(self, script_name: str) -> requests.Response:
+    def _response(self, script_name: str, etag: Union[str, None] = None) -> requests.Response:
         """
         Realiza uma requisição HTTP para obter o conteúdo de um script Python a partir de um repositório GitHub.
 
         Este método constrói a URL do script a ser baixado e faz uma requisição HTTP GET. Caso a resposta tenha
-        um status diferente de 200 (OK), uma exceção será levantada. O método também trata exceções de rede e
-        fornece mensagens de erro mais detalhadas.
+        um status diferente de 200 (OK) ou 304 (não modificado), uma exceção será levantada. O método também
+        trata exceções de rede e fornece mensagens de erro mais detalhadas.
 
         :param script_name: Nome do script Python a ser baixado, sem a extensão '.py'.
+        :param etag: ETag da versão em cache. Se informado, a requisição é condicional (`If-None-Match`).
         :return: Resposta HTTP com o conteúdo do script.
         :raises FileNotFoundError: Se o script não for encontrado no repositório (status 404).
         :raises RequestException: Para qualquer outro erro relacionado à requisição HTTP (e.g., erros de rede).
@@ -70,19 +113,147 @@ class GitHubScriptLoader:
             raise ValueError("O nome do script deve ser uma string não vazia.")
 
         url = f"{self.BASE_URL}{script_name}.py"
+        headers = {'If-None-Match': etag} if etag else {}
         
         try:
-            response = requests.get(url)
+            response = requests.get(url, headers=headers)
             response.raise_for_status()  # Levanta exceção para status 4xx/5xx
         except RequestException as e:
             # Captura erros relacionados à requisição HTTP (e.g., problemas de rede, timeout)
             raise RequestException(f"Erro ao acessar o arquivo '{script_name}.py' no repositório: {str(e)}")
         
-        if response.status_code != 200:
+        if response.status_code not in (200, 304):
             raise FileNotFoundError(f"O script '{script_name}.py' não foi encontrado no repositório: {url}")
         
         return response
 
+    def _cache_file(self, script_name: str, extension: str) -> str:
+        """
+        Retorna o caminho de um arquivo do cache em disco.
+        """
+        return os.path.join(self.CACHE_DIR, f'{script_name}.{extension}')
+
+    def _read_disk_cache(self, script_name: str) -> Union[dict, None]:
+        """
+        Lê o código-fonte e os metadados de um script salvos no cache em disco.
+
+        :return: Entrada do cache ou None se o script não estiver em disco.
+        """
+        try:
+            with open(self._cache_file(script_name, 'json'), encoding='utf-8') as f:
+                entry = json.load(f)
+            with open(self._cache_file(script_name, 'py'), encoding='utf-8') as f:
+                entry['source'] = f.read()
+        except (OSError, ValueError):
+            return None
+
+        if hashlib.sha256(entry['source'].encode('utf-8')).hexdigest() != entry.get('sha'):
+            return None
+        return entry
+
+    def _write_file(self, file: str, data: bytes):
+        """
+        Grava um arquivo do cache de forma atômica (arquivo temporário + `os.replace`), para que
+        processos que compartilham `CACHE_DIR` nunca leiam um arquivo pela metade.
+        """
+        os.makedirs(self.CACHE_DIR, exist_ok=True)
+        tmp = f'{file}.{os.getpid()}.{threading.get_ident()}.tmp'
+        try:
+            with open(tmp, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, file)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    def _write_disk_cache(self, script_name: str, entry: dict):
+        """
+        Salva o código-fonte e os metadados de um script no cache em disco.
+        """
+        try:
+            self._write_file(self._cache_file(script_name, 'py'), entry['source'].encode('utf-8'))
+            self._write_file(self._cache_file(script_name, 'json'),
+                             json.dumps({k: v for k, v in entry.items() if k != 'source'}).encode('utf-8'))
+        except OSError as e:
+            if self.enable_debug:
+                print(f"Não foi possível salvar o script '{script_name}' no cache: {e}")
+
+    def _source(self, script_name: str) -> Tuple[str, str]:
+        """
+        Retorna o código-fonte de um script e o hash SHA-256 do seu conteúdo.
+
+        A busca segue a ordem: memória do processo, cache em disco e, por fim, a rede. Entradas
+        com menos de `CACHE_TTL` segundos são usadas sem nenhum acesso à rede; as mais antigas são
+        revalidadas com o ETag salvo. No modo offline, qualquer entrada em cache é aceita.
+
+        :param script_name: Nome do script Python, sem a extensão '.py'.
+        :return: Tupla (código-fonte, sha256).
+        :raises FileNotFoundError: Se o modo offline estiver ativo e o script não estiver em cache.
+        """
+        with self._lock:
+            entry = self._sources.get(script_name) or self._read_disk_cache(script_name)
+
+            if entry and (self.offline or time.time() - entry.get('checked_at', 0) < self.CACHE_TTL):
+                self._sources[script_name] = entry
+                return entry['source'], entry['sha']
+
+            if self.offline:
+                raise FileNotFoundError(f"O script '{script_name}' não está no cache e o modo offline está ativo.")
+
+            response = self._response(script_name, etag=entry.get('etag') if entry else None)
+
+            if response.status_code == 304 and entry:
+                entry['checked_at'] = time.time()
+            else:
+                entry = {
+                    'sha': hashlib.sha256(response.text.encode('utf-8')).hexdigest(),
+                    'etag': response.headers.get('ETag'),
+                    'checked_at': time.time(),
+                    'source': response.text,
+                }
+
+            self._sources[script_name] = entry
+            self._write_disk_cache(script_name, entry)
+            return entry['source'], entry['sha']
+
+    def _compile(self, script_name: str, source: str, sha: str):
+        """
+        Compila o código-fonte de um script, reaproveitando o bytecode salvo em disco para o mesmo hash.
+
+        O formato do `marshal` depende da versão do interpretador, por isso o nome do arquivo inclui
+        `sys.implementation.cache_tag` (ex.: 'cpython-311'): interpretadores diferentes que compartilham
+        `CACHE_DIR` usam arquivos diferentes.
+
+        :return: Objeto de código pronto para `exec`.
+        """
+        file = self._cache_file(script_name, f'{sha[:16]}.{sys.implementation.cache_tag}.bytecode')
+        try:
+            with open(file, 'rb') as f:
+                return marshal.load(f)
+        except (OSError, EOFError, ValueError, TypeError):
+            pass
+
+        code = compile(source, f'{self.BASE_URL}{script_name}.py', 'exec')
+        try:
+            self._write_file(file, marshal.dumps(code))
+        except OSError:
+            pass
+        return code
+
+    @classmethod
+    def clear_cache(cls, disk: bool = False):
+        """
+        Limpa o cache do processo e, opcionalmente, o cache em disco.
+
+        :param disk: Se True, remove também os arquivos de `CACHE_DIR`.
+        """
+        with cls._lock:
+            cls._sources.clear()
+            cls._classes.clear()
+            if disk and os.path.isdir(cls.CACHE_DIR):
+                for file in os.listdir(cls.CACHE_DIR):
+                    os.remove(os.path.join(cls.CACHE_DIR, file))
+
     def _download_and_save_class(self):
         """
         Baixa os scripts Python listados em `FILES` a partir do repositório GitHub e os salva no diretório local
@@ -106,15 +277,15 @@ class GitHubScriptLoader:
             except OSError as e:
                 raise OSError(f"Erro ao tentar cirar o diretório '{self.path}': {e}")
 
-        # Cria o diretório se ele não existir
+        # Salva os scripts que ainda não existem no diretório local
         for file in self.FILES:
             try:
-                response = self._response(file)
                 path_file = os.path.join(self.path, f'{file}.py')
 
                 if not os.path.exists(path_file):
+                    source, _ = self._source(file)
                     with open(path_file, 'x', encoding='utf-8') as f:
-                        f.write(response.text)
+                        f.write(source)
             except FileNotFoundError as e:
                 raise FileNotFoundError(f"Erro ao tentar baixar o script '{file}' do GitHub: {e}")
             except OSError as e:
@@ -133,22 +304,30 @@ class GitHubScriptLoader:
         :raises ValueError: Se a classe esperada não for encontrada no script.
         :raises RuntimeError: Se ocorrer um erro ao executar o script ou ao instanciar a classe.
         """
+        # Construir o nome da classe com base no nome do script
+        class_name = str(self.script_name).title().replace('_', '')
+
         try:
-            # Obter o conteúdo do script
-            response = self._response(self.script_name)
-            
-            # Construir o nome da classe com base no nome do script
-            class_name = self.script_name.title().replace('_', '')
-            
-            # Executa o código do script no escopo local
-            exec(response.text, globals())
-            
-            # Tenta obter a classe carregada
-            loaded_class = globals().get(class_name)
-            
-            if not loaded_class:
-                raise ValueError(f"Classe '{class_name}' não encontrada no script '{self.script_name}'.")
-            
+            # Obter o conteúdo do script (memória, disco ou rede)
+            source, sha = self._source(self.script_name)
+
+            with self._lock:
+                # Reaproveita a classe já carregada para o mesmo conteúdo
+                loaded_class = self._classes.get((self.script_name, sha))
+                if loaded_class:
+                    return loaded_class
+
+                # Executa o código compilado do script no escopo global
+                exec(self._compile(self.script_name, source, sha), globals())
+
+                # Tenta obter a classe carregada
+                loaded_class = globals().get(class_name)
+
+                if not loaded_class:
+                    raise ValueError(f"Classe '{class_name}' não encontrada no script '{self.script_name}'.")
+
+                self._classes[(self.script_name, sha)] = loaded_class
+
             if self.enable_debug:
                 print(f"Classe '{class_name}' carregada com sucesso.")
             
@@ -163,6 +342,426 @@ class GitHubScriptLoader:
         except Exception as e:
             raise RuntimeError(f"Erro inesperado ao carregar a classe '{class_name}' do script '{self.script_name}': {e}")
 
+class StageCache:
+    """
+    Cache endereçado por conteúdo para as etapas do pipeline (alvos, features, divisão, modelo e resultados).
+
+    A chave de cada etapa combina a chave da etapa anterior (a primeira parte do hash dos preços), os
+    campos da configuração usados pela etapa e uma impressão digital do código da classe que a executa.
+    Assim, alterar apenas `ml_model` ou `contracts` reaproveita preços, alvos, features e a divisão dos
+    dados, e só as etapas seguintes são recalculadas. As entradas ficam em um LRU em memória, limitado
+    a `max_items`, e são salvas em disco com joblib para reaproveitamento entre processos e sessões.
+
+    Attributes:
+        DEFAULT_PATH (str): Diretório padrão do cache em disco.
+        path (str): Diretório do cache em disco.
+        max_items (int): Número máximo de entradas em memória.
+        disk (bool): Se False, usa apenas a memória.
+        stats (dict): Contagem de acertos e falhas por etapa.
+    """
+    DEFAULT_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'predicao-dados-binarios', 'stages')
+
+    def __init__(self, path: Union[str, None] = None, max_items: int = 64, disk: bool = True):
+        self.path = path or self.DEFAULT_PATH
+        self.max_items = max_items
+        self.disk = disk
+        self.stats = {'hits': {}, 'misses': {}}
+        self._memory = OrderedDict()
+        self._fingerprints = {}
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def frame_key(df: DataFrame) -> str:
+        """
+        Calcula o hash do conteúdo de um DataFrame (valores, índice, colunas e tipos).
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(repr([(str(c), str(t)) for c, t in df.dtypes.items()]).encode())
+        digest.update(hash_pandas_object(df, index=True).to_numpy().tobytes())
+        return digest.hexdigest()
+
+    @staticmethod
+    def key(*parts) -> str:
+        """
+        Calcula a chave de uma etapa a partir da chave anterior e dos parâmetros da etapa.
+        """
+        return hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+
+    def fingerprint(self, cls) -> str:
+        """
+        Retorna uma impressão digital do código de uma classe (métodos e funções do módulo que eles usam).
+
+        Funciona também para classes carregadas com `exec` (sem arquivo de origem) e faz com que uma
+        alteração nos scripts invalide as entradas das etapas afetadas.
+        """
+        if cls in self._fingerprints:
+            return self._fingerprints[cls]
+
+        digest, seen = hashlib.blake2b(digest_size=8), set()
+
+        def visit_code(code):
+            digest.update(code.co_code)
+            for const in code.co_consts:
+                if isinstance(const, types.CodeType):
+                    visit_code(const)
+                elif isinstance(const, frozenset):
+                    # A ordem de um frozenset depende da semente de hash do processo
+                    digest.update(repr(sorted(map(repr, const))).encode())
+                else:
+                    digest.update(repr(const).encode())
+
+        def visit(obj):
+            if id(obj) in seen:
+                return
+            seen.add(id(obj))
+            func = obj.fget if isinstance(obj, property) else getattr(obj, '__func__', obj)
+            code = getattr(func, '__code__', None)
+            if code is None:
+                return
+            visit_code(code)
+            # Funções e classes globais do mesmo módulo usadas pelo método
+            for name in code.co_names:
+                target = func.__globals__.get(name)
+                if isinstance(target, types.FunctionType) and target.__globals__ is func.__globals__:
+                    visit(target)
+                elif isinstance(target, type) and target.__module__ == cls.__module__ and target is not cls:
+                    for attr in vars(target).values():
+                        visit(attr)
+
+        for name, attr in sorted(vars(cls).items()):
+            digest.update(name.encode())
+            # Dicionários de funções (ex.: `Machines.MODELS`, `Features.OPERATIONS`) também fazem parte do código
+            for value in (attr.values() if isinstance(attr, dict) else [attr]):
+                visit(value)
+
+        self._fingerprints[cls] = digest.hexdigest()
+        return self._fingerprints[cls]
+
+    def _file(self, stage: str, key: str) -> str:
+        """
+        Retorna o caminho do arquivo de uma entrada no cache em disco.
+        """
+        return os.path.join(self.path, stage, f'{key}.joblib')
+
+    def get(self, stage: str, key: str):
+        """
+        Retorna o valor de uma etapa (memória e, depois, disco) ou None se a chave não estiver em cache.
+        """
+        with self._lock:
+            value = self._memory.get((stage, key))
+            if value is not None:
+                self._memory.move_to_end((stage, key))
+        if value is None and self.disk:
+            import joblib
+            try:
+                value = joblib.load(self._file(stage, key))
+            except (OSError, EOFError, ValueError):
+                value = None
+            if value is not None:
+                self._remember(stage, key, value)
+
+        counter = self.stats['hits' if value is not None else 'misses']
+        counter[stage] = counter.get(stage, 0) + 1
+        return value
+
+    def put(self, stage: str, key: str, value):
+        """
+        Salva o valor de uma etapa na memória e, se habilitado, em disco (escrita atômica).
+        """
+        self._remember(stage, key, value)
+        if self.disk:
+            import joblib
+            path = self._file(stage, key)
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                temp = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+                joblib.dump(value, temp)
+                os.replace(temp, path)
+            except OSError:
+                pass
+
+    def _remember(self, stage: str, key: str, value):
+        """
+        Adiciona uma entrada ao LRU em memória, descartando a menos usada quando o limite é atingido.
+        """
+        with self._lock:
+            self._memory[(stage, key)] = value
+            self._memory.move_to_end((stage, key))
+            while len(self._memory) > self.max_items:
+                self._memory.popitem(last=False)
+
+    def clear(self, disk: bool = False):
+        """
+        Limpa o cache em memória e, opcionalmente, o cache em disco.
+        """
+        with self._lock:
+            self._memory.clear()
+            self._fingerprints.clear()
+            self.stats = {'hits': {}, 'misses': {}}
+        if disk and os.path.isdir(self.path):
+            import shutil
+            shutil.rmtree(self.path, ignore_errors=True)
+
+
+class ModelRegistry:
+    """
+    Registro em disco dos modelos treinados, para carregá-los em vez de retreiná-los a cada execução.
+
+    Cada modelo é salvo com joblib (sem compressão, para que os arrays possam ser mapeados em memória com
+    `mmap=True`) ao lado de um arquivo JSON de metadados: configuração, hash dos dados de treino, data do
+    ajuste, tempo de ajuste e o perfil das features de treino (ver `Machines.feature_profile`).
+
+    A chave identifica o modelo (ticker, features, alvo, início e passo da janela, modelo e código de
+    `Machines`, onde ficam os hiperparâmetros). A decisão de reaproveitar um modelo salvo é tomada em
+    `retrain_reason`:
+    - dados de treino iguais (mesmo hash): o modelo é carregado, pois um novo ajuste seria idêntico;
+    - dados de treino diferentes (ex.: o fim da janela avançou ou o histórico foi revisto): o modelo é
+      retreinado quando tem `max_age_days` dias ou mais (agenda) ou quando o PSI de alguma feature dos
+      dados mais recentes passa de `drift_threshold` (drift); caso contrário, o modelo salvo é mantido.
+
+    Com `max_age_days=0` (padrão), qualquer mudança nos dados de treino causa um novo ajuste, e os
+    resultados são sempre iguais aos de um ajuste sem registro.
+
+    Attributes:
+        DEFAULT_PATH (str): Diretório padrão do registro.
+        path (str): Diretório do registro.
+        mmap (bool): Se True, carrega os arrays dos modelos mapeados em memória (somente leitura).
+        max_age_days (Union[float, None]): Idade, em dias, a partir da qual um modelo é retreinado quando os
+            dados mudam. None desativa a agenda.
+        drift_threshold (Union[float, None]): PSI a partir do qual há drift. None desativa a detecção.
+        stats (dict): Contagem de modelos carregados e ajustados.
+    """
+    DEFAULT_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'predicao-dados-binarios', 'models')
+
+    def __init__(self, path: Union[str, None] = None, mmap: bool = False, max_age_days: Union[float, None] = 0,
+                 drift_threshold: Union[float, None] = 0.2):
+        self.path = path or self.DEFAULT_PATH
+        self.mmap = mmap
+        self.max_age_days = max_age_days
+        self.drift_threshold = drift_threshold
+        self.stats = {'loaded': 0, 'fitted': 0}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(*parts) -> str:
+        """
+        Calcula a chave de um modelo a partir dos parâmetros que o identificam.
+        """
+        return hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+
+    def _files(self, key: str) -> Tuple[str, str]:
+        """
+        Retorna os caminhos do modelo e dos metadados de uma chave.
+        """
+        return os.path.join(self.path, f'{key}.joblib'), os.path.join(self.path, f'{key}.json')
+
+    def metadata(self, key: str) -> Union[dict, None]:
+        """
+        Retorna os metadados de um modelo, sem carregá-lo, ou None se a chave não estiver no registro.
+        """
+        try:
+            with open(self._files(key)[1], encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def load(self, key: str) -> Union[Tuple[object, dict], None]:
+        """
+        Carrega um modelo e seus metadados, ou retorna None se a chave não estiver no registro.
+        """
+        import joblib
+        metadata = self.metadata(key)
+        if metadata is None:
+            return None
+        try:
+            model = joblib.load(self._files(key)[0], mmap_mode='r' if self.mmap else None)
+        except (OSError, EOFError, ValueError):
+            return None
+        return model, metadata
+
+    def save(self, key: str, model, metadata: dict):
+        """
+        Salva um modelo e seus metadados (escrita atômica; os metadados são gravados por último).
+        """
+        import joblib
+        os.makedirs(self.path, exist_ok=True)
+        suffix = f'{os.getpid()}.{threading.get_ident()}.tmp'
+        model_file, metadata_file = self._files(key)
+
+        joblib.dump(model, f'{model_file}.{suffix}')
+        os.replace(f'{model_file}.{suffix}', model_file)
+        with open(f'{metadata_file}.{suffix}', 'w', encoding='utf-8') as f:
+            json.dump({**metadata, 'key': key}, f, default=str)
+        os.replace(f'{metadata_file}.{suffix}', metadata_file)
+
+    def retrain_reason(self, metadata: dict, data_hash: str, drift: Union[dict, None] = None) -> Union[str, None]:
+        """
+        Decide se um modelo salvo deve ser retreinado.
+
+        :param metadata: Metadados do modelo salvo.
+        :param data_hash: Hash dos dados de treino atuais (ver `Machines.train_hash`).
+        :param drift: PSI de cada feature nos dados recentes (ver `Machines.drift`).
+        :return: None se o modelo salvo pode ser usado; caso contrário, o motivo ('schedule' ou 'drift').
+        """
+        if metadata.get('data_hash') == data_hash:
+            return None
+        age_days = (time.time() - metadata.get('fitted_at', 0)) / 86400
+        if self.max_age_days is not None and age_days >= self.max_age_days:
+            return 'schedule'
+        if self.drift_threshold is not None and drift and max(drift.values()) > self.drift_threshold:
+            return 'drift'
+        return None
+
+    def count(self, status: str):
+        with self._lock:
+            self.stats[status] += 1
+
+    def entries(self) -> DataFrame:
+        """
+        Lista os modelos do registro (uma linha por modelo, sem o perfil das features).
+        """
+        rows = []
+        if os.path.isdir(self.path):
+            for name in sorted(os.listdir(self.path)):
+                if name.endswith('.json'):
+                    metadata = self.metadata(name[:-5])
+                    if metadata is not None:
+                        rows.append({k: v for k, v in metadata.items() if k != 'feature_profile'})
+        return DataFrame(rows)
+
+    def remove(self, key: str):
+        """
+        Remove um modelo do registro.
+        """
+        for file in self._files(key):
+            if os.path.exists(file):
+                os.remove(file)
+
+    def clear(self):
+        """
+        Remove todos os modelos do registro.
+        """
+        if os.path.isdir(self.path):
+            import shutil
+            shutil.rmtree(self.path, ignore_errors=True)
+        self.stats = {'loaded': 0, 'fitted': 0}
+
+
+class StageTimer:
+    """
+    Instrumentação das etapas do pipeline: tempo de relógio, tempo de CPU, linhas processadas e variação
+    de memória (RSS do processo, via psutil) de cada etapa, com captura opcional do cProfile.
+
+    O relatório (`finish`) é um dicionário serializável, incluído no resultado do pipeline na chave
+    "timings", e pode ser exportado no formato Chrome Trace (`chrome_trace`) para visualização em
+    chrome://tracing ou no Perfetto.
+
+    Attributes:
+        records (list): Medidas de cada etapa, na ordem de execução.
+        profiler (cProfile.Profile): Profiler ativo durante a execução, se `profile=True`.
+    """
+
+    def __init__(self, profile: bool = False):
+        self.records = []
+        self.origin = time.perf_counter()
+        self.cpu_origin = time.process_time()
+        self.profiler = None
+        try:
+            import psutil
+            self._process = psutil.Process()
+        except ImportError:
+            self._process = None
+        if profile:
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+
+    def _rss(self) -> Union[int, None]:
+        """
+        Retorna a memória residente do processo, em bytes, ou None se o psutil não estiver disponível.
+        """
+        return self._process.memory_info().rss if self._process is not None else None
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        Mede uma etapa. O dicionário retornado pode receber campos adicionais (ex.: 'rows').
+
+        :param name: Nome da etapa.
+        """
+        record = {'stage': name, 'start_ms': (time.perf_counter() - self.origin) * 1e3, 'rows': None}
+        rss, wall, cpu = self._rss(), time.perf_counter(), time.process_time()
+        try:
+            yield record
+        finally:
+            record['wall_ms'] = (time.perf_counter() - wall) * 1e3
+            record['cpu_ms'] = (time.process_time() - cpu) * 1e3
+            record['memory_delta_bytes'] = self._rss() - rss if rss is not None else None
+            self.records.append(record)
+
+    def finish(self, top: int = 30) -> dict:
+        """
+        Encerra a medição e retorna o relatório.
+
+        :param top: Número de funções listadas no resumo do cProfile (ordenado pelo tempo acumulado).
+        :return: Dicionário com "stages" (medidas de cada etapa), "wall_ms", "cpu_ms", "pid" e "profile"
+                 (resumo do cProfile em texto, ou None).
+        """
+        profile = None
+        if self.profiler is not None:
+            self.profiler.disable()
+            stream = io.StringIO()
+            pstats.Stats(self.profiler, stream=stream).sort_stats('cumulative').print_stats(top)
+            profile = stream.getvalue()
+            self.profiler = None
+        return {
+            "stages": list(self.records),
+            "wall_ms": (time.perf_counter() - self.origin) * 1e3,
+            "cpu_ms": (time.process_time() - self.cpu_origin) * 1e3,
+            "pid": os.getpid(),
+            "profile": profile,
+        }
+
+    @staticmethod
+    def chrome_trace(timings: Union[dict, List[dict]], path: Union[str, None] = None) -> dict:
+        """
+        Converte um ou mais relatórios de `finish` para o formato Chrome Trace (eventos completos 'X').
+
+        Cada relatório vira uma linha (tid) do trace, o que permite comparar várias execuções lado a lado.
+
+        :param timings: Relatório (ou lista de relatórios) retornado em result["timings"].
+        :param path: Se informado, salva o trace em JSON nesse caminho.
+        :return: Dicionário {"traceEvents": [...]} do trace.
+        """
+        events = []
+        for tid, report in enumerate([timings] if isinstance(timings, dict) else timings):
+            for record in report['stages']:
+                events.append({
+                    "name": record['stage'], "cat": "pipeline", "ph": "X",
+                    "ts": record['start_ms'] * 1e3, "dur": record['wall_ms'] * 1e3,
+                    "pid": report.get('pid', 0), "tid": tid,
+                    "args": {k: v for k, v in record.items() if k not in ('stage', 'start_ms', 'wall_ms')},
+                })
+        trace = {"traceEvents": events, "displayTimeUnit": "ms"}
+        if path:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(trace, f)
+        return trace
+
+
+def _shallow(value):
+    """
+    Retorna cópias rasas dos DataFrames de um valor em cache (em dicionários, listas e tuplas), para que
+    as etapas seguintes possam adicionar colunas sem alterar o valor guardado.
+    """
+    if isinstance(value, DataFrame):
+        return value.copy(deep=False)
+    if isinstance(value, dict):
+        return {k: _shallow(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return type(value)(_shallow(v) for v in value)
+    return value
+
+
 class MarketForecastConfig:
     """
     Configurações para a previsão de comportamento de mercado.
@@ -181,19 +780,44 @@ class MarketForecastConfig:
         start (str): Data de início da análise no formato 'YYYY-MM-DD'. Define o início da janela de dados.
         end (str): Data de término da análise no formato 'YYYY-MM-DD'. Define o final da janela de dados.
         step_size (Union[int, None]): Tamanho do passo para janelas deslizantes. Se None, usa o tamanho padrão.
-        ml_model (str): Nome do modelo de aprendizado de máquina a ser utilizado. Exemplos incluem 
-            'train_decision_tree', 'train_random_forest', etc. Default: 'train_decision_tree'.
+        ml_model (str): Nome do método de treino de `Machines` a ser utilizado: 'train_decision_tree',
+            'train_random_forest', 'train_gradient_boosting', 'train_logistic_regression' ou
+            'train_linear_svm'. Default: 'train_decision_tree'.
         enable_debug (bool): Indica se mensagens de depuração devem ser exibidas. Default: False.
         contracts (int): Quantidade de contratos financeiros utilizados para cálculos de resultados. Default: 100.
         import_local (bool): Se True, importa scripts de um diretório local definido em `path`. Default: False.
         path (str): Caminho para os scripts locais, usado apenas se `import_local` for True.
+        synthetic_serie (Union[None, str]): Se informado ('gbm', 'bootstrap' ou 'block_bootstrap'), o pipeline é
+            executado sobre uma série sintética gerada a partir dos preços do ativo (ver `Synthetic`), com semente 0.
+            Para muitas trajetórias, use `MarketSyntheticForecaster`. Default: None.
+        compact (bool): Se True, os DataFrames do resultado usam tipos compactos: preços e features em float32,
+            alvos e predições em int8 e `date_target` como deslocamento em dias (Int16). Os resultados financeiros
+            continuam em float64 e as métricas são calculadas antes da conversão. Default: False.
+        cache (bool): Se True, reaproveita os resultados de cada etapa do pipeline guardados em `stage_cache`
+            (ver `StageCache`). Não é usado com `external_variable`. Default: False.
+        profile (bool): Se True, captura um cProfile da execução, incluído em result["timings"]["profile"], e
+            mede o pico de memória do ajuste e das predições (`Machines(trace_memory=True)`). As medidas de
+            tempo e memória de cada etapa são sempre registradas. Default: False.
+        registry (bool): Se True, o modelo é carregado de `model_registry` quando os dados de treino não mudaram
+            (ou quando a agenda e o drift não pedem um novo ajuste) e salvo nele após cada ajuste (ver
+            `ModelRegistry`). O resultado da decisão fica em result["registry"]. Default: False.
     """
+    # Colunas mantidas em float64 no modo compacto (resultados financeiros acumulados)
+    COMPACT_KEEP = ('resultado_predicao', 'resultado_predicao_acumulado')
+
+    # Cache das etapas do pipeline, compartilhado pelas configurações com `cache=True`
+    stage_cache = StageCache()
+
+    # Registro de modelos treinados, compartilhado pelas configurações com `registry=True`
+    model_registry = ModelRegistry()
+
     def __init__(self, ticker: str, p: int = 1, target_type: str = 'A_BINARIO',
                  features: Union[int, List[int], None] = [], start: str = 'YYYY-MM-DD',
                  end: str = 'YYYY-MM-DD', step_size: Union[int, None] = None,
                  ml_model: str = 'train_decision_tree', enable_debug: bool = False,
                  contracts: int = 100, import_local: bool = False, path : str = '',
-                 synthetic_serie: Union[None, str] = None):
+                 synthetic_serie: Union[None, str] = None, compact: bool = False, cache: bool = False,
+                 profile: bool = False, registry: bool = False):
         
         self.ticker = ticker
         self.p = p
@@ -208,6 +832,357 @@ class MarketForecastConfig:
         self.import_local = import_local
         self.path = path
         self.synthetic_serie = synthetic_serie
+        self.compact = compact
+        self.cache = cache
+        self.profile = profile
+        self.registry = registry
+
+    def update_frame(self, previous: DataFrame, new_bars: DataFrame, modules: Union[dict, None] = None) -> DataFrame:
+        """
+        Atualiza incrementalmente um DataFrame de alvos e features com novas barras de preço.
+
+        Apenas a cauda afetada é recalculada: os alvos das últimas `p` linhas e as features das
+        linhas novas (usando o lookback declarado por cada feature). O custo diário é proporcional
+        ao lookback, e não ao tamanho do histórico.
+
+        :param previous: DataFrame com alvos e features calculados anteriormente.
+        :param new_bars: Novas barras de preço (as datas já presentes em `previous` são ignoradas).
+        :param modules: Classes do pipeline já carregadas. Se None, são carregadas com `_load_modules`.
+        :return: DataFrame atualizado.
+        """
+        modules = modules or self._load_modules()
+        start = len(previous)
+        df = modules['Alvos'].update(previous, new_bars, p=self.p, target_type=self.target_type)
+        return modules['Features'].update(df, self.features, start)
+
+    @classmethod
+    def _compact_frame(cls, df: DataFrame) -> Tuple[DataFrame, List[dict]]:
+        """
+        Converte as colunas de um DataFrame do resultado para tipos compactos.
+
+        - Alvos ('alvo_*') e 'predicao': int8 (Int8, que aceita valores ausentes, quando há NaN).
+        - 'date_target': deslocamento em dias em relação à data da linha (Int16); a data original é
+          `df.index + pd.to_timedelta(df['date_target'], unit='D')`. Mantida como está se o
+          deslocamento não for um número inteiro de dias (dados intradiários).
+        - Demais colunas float (preços, volume, variação e features): float32, exceto `COMPACT_KEEP`.
+
+        :param df: DataFrame a ser convertido.
+        :return: Tupla (DataFrame convertido, lista com o relatório de cada coluna).
+        """
+        columns, report = {}, []
+        for column in df.columns:
+            values = df[column]
+            new = values
+            if column.startswith('alvo') or column == 'predicao':
+                valid = values.dropna()
+                if len(valid) and ((valid % 1) == 0).all() and valid.min() >= -128 and valid.max() <= 127:
+                    new = values.astype('int8' if len(valid) == len(values) else 'Int8')
+            elif column == 'date_target':
+                dates = values.dt.tz_localize(None) if values.dt.tz is not None else values
+                index = df.index.tz_localize(None) if df.index.tz is not None else df.index
+                days = (dates - index.to_series(index=df.index)) / Timedelta(days=1)
+                valid = days.dropna()
+                if ((valid % 1) == 0).all() and (valid.abs() < 2 ** 15).all():
+                    new = days.astype('Int16')
+            elif is_float_dtype(values) and column not in cls.COMPACT_KEEP:
+                new = values.astype('float32')
+            columns[column] = new
+
+            # Conferência: rótulos e datas devem ser exatos; floats têm o erro relativo registrado
+            mismatches, error = 0, 0.0
+            if new is not values and column == 'date_target':
+                restored = index + to_timedelta(new.astype('float64').to_numpy(), unit='D')
+                mismatches = int(((restored != dates.to_numpy()) & dates.notna().to_numpy()).sum())
+            elif new is not values:
+                before, after = values.to_numpy(np.float64), new.astype('float64').to_numpy()
+                if column.startswith('alvo') or column == 'predicao':
+                    mismatches = int((~((before == after) | (np.isnan(before) & np.isnan(after)))).sum())
+                else:
+                    with np.errstate(invalid='ignore', divide='ignore'):
+                        error = float(np.nanmax(np.abs(after - before) / np.abs(before), initial=0.0,
+                                                where=before != 0))
+            report.append({
+                'column': column, 'dtype_before': str(values.dtype), 'dtype_after': str(new.dtype),
+                'bytes_before': int(values.memory_usage(index=False, deep=True)),
+                'bytes_after': int(new.memory_usage(index=False, deep=True)),
+                'mismatches': mismatches, 'max_rel_error': error,
+            })
+        return DataFrame(columns, index=df.index), report
+
+    def _compact(self, frames: dict, modules: dict, metrics: dict) -> dict:
+        """
+        Converte os DataFrames do resultado para tipos compactos e valida que as métricas não mudam.
+
+        As métricas de retorno são recalculadas a partir dos conjuntos convertidos e comparadas às originais;
+        as métricas do modelo dependem apenas dos alvos e das predições, cuja conversão precisa ser exata.
+
+        :param frames: Dicionário {"train", "test", "after_test", "df"} com os DataFrames do resultado.
+        :param modules: Dicionário com as classes do pipeline.
+        :param metrics: Métricas calculadas com os DataFrames originais.
+        :return: Dicionário com os DataFrames convertidos ("df") e o relatório de validação ("report"):
+                 tabela por coluna do DataFrame consolidado, memória antes e depois e `metrics_unchanged`.
+        """
+        compacted, reports = {}, {}
+        for name, frame in frames.items():
+            compacted[name], reports[name] = self._compact_frame(frame)
+
+        columns = DataFrame(reports['df'])
+        labels = columns[columns['column'].str.startswith('alvo') | (columns['column'] == 'predicao')]
+        returns = modules['ResultPredict'](compacted['train'], compacted['test'], compacted['after_test'],
+                                           lotes=self.contracts).evaluate()
+        return {
+            "df": compacted,
+            "report": {
+                "columns": columns,
+                "memory_before": int(frames['df'].memory_usage(deep=True).sum()),
+                "memory_after": int(compacted['df'].memory_usage(deep=True).sum()),
+                "metrics_unchanged": bool((labels['mismatches'] == 0).all()) and returns == metrics['returns'],
+            }
+        }
+
+    @staticmethod
+    def _consolidate(base: DataFrame, parts: List[DataFrame]) -> DataFrame:
+        """
+        Junta os conjuntos de treino, teste e pós-teste em um único DataFrame.
+
+        Quando os conjuntos são fatias contíguas de `base`, o resultado é uma fatia de `base` à qual são
+        adicionadas apenas as colunas criadas nos conjuntos (ex.: 'predicao'), sem copiar as demais
+        colunas. Caso contrário, os conjuntos são concatenados.
+
+        :param base: DataFrame do qual os conjuntos foram extraídos.
+        :param parts: Lista de conjuntos, na ordem cronológica.
+        :return: DataFrame consolidado.
+        """
+        parts = [part for part in parts if len(part)]
+        if not parts:
+            return base.iloc[:0].copy()
+
+        start = base.index.get_indexer(parts[0].index[:1])[0]
+        stop = start + sum(len(part) for part in parts)
+        columns = list(parts[0].columns)
+        new = [column for column in columns if column not in base.columns]
+        contiguous = start >= 0 and all(list(part.columns) == columns for part in parts) and \
+            list(base.columns) == columns[:len(base.columns)] and \
+            base.index[start:stop].equals(parts[0].index.append([part.index for part in parts[1:]]))
+        if not contiguous:
+            return concat(parts, axis=0)
+
+        df = base.iloc[start:stop].copy(deep=False)
+        for column in new:
+            df[column] = concat([part[column] for part in parts]).to_numpy()
+        return df
+
+    def _prices(self, modules: dict, prices: Union[DataFrame, None] = None,
+                timer: Union[StageTimer, None] = None) -> DataFrame:
+        """
+        Obtém os preços usados pelo pipeline: carrega-os com `Prices.get` (se não informados) e, com
+        `synthetic_serie`, os substitui pela trajetória sintética. Usado por todas as formas de execução
+        (individual, local e em lote), para que produzam o mesmo resultado.
+
+        :param modules: Dicionário com as classes do pipeline.
+        :param prices: Preços já carregados. Se None, os preços são obtidos com `Prices.get`.
+        :param timer: Instrumentação em que as etapas 'prices' e 'synthetic' são registradas.
+        :return: DataFrame de preços.
+        """
+        timer = timer or StageTimer()
+        with timer.stage('prices') as record:
+            df = modules['Prices'].get(self.ticker) if prices is None else prices
+            record['rows'] = len(df)
+
+        if self.synthetic_serie:
+            with timer.stage('synthetic') as record:
+                df = self._synthetic_prices(df, modules)
+                record['rows'] = len(df)
+        return df
+
+    def _synthetic_prices(self, df: DataFrame, modules: dict) -> DataFrame:
+        """
+        Substitui os preços do ativo pela primeira trajetória sintética do método `synthetic_serie`.
+
+        :param df: DataFrame com os preços históricos do ativo.
+        :param modules: Dicionário com as classes do pipeline (usa 'Synthetic').
+        :return: DataFrame de preços sintéticos com as mesmas datas do histórico.
+        """
+        synthetic = modules['Synthetic'](df, self.synthetic_serie, seed=0)
+        return synthetic.frame(synthetic.paths(1)[0])
+
+    def _fit_model(self, ml, modules: dict) -> Tuple[object, dict]:
+        """
+        Carrega o modelo do `model_registry` ou o treina e salva, conforme `ModelRegistry.retrain_reason`.
+
+        :param ml: Instância de `Machines` com os conjuntos de dados.
+        :param modules: Dicionário com as classes do pipeline.
+        :return: Tupla (modelo, {"status": 'loaded' ou 'fitted', "reason", "key", "drift", "fitted_at"}).
+        """
+        registry = self.model_registry
+        key = registry.key(self.ticker, self.features, self.p, self.target_type, self.start, self.step_size,
+                           self.ml_model, self.stage_cache.fingerprint(modules['Machines']))
+        data_hash = ml.train_hash()
+
+        start = time.perf_counter()
+        entry = registry.load(key)
+        drift, reason = None, 'new'
+        if entry is not None:
+            model, metadata = entry
+            if metadata.get('data_hash') != data_hash:
+                drift = ml.drift(metadata['feature_profile'])
+            reason = registry.retrain_reason(metadata, data_hash, drift)
+            if reason is None:
+                ml.profile['train'].update({'model': self.ml_model.removeprefix('train_'),
+                                            'load_time_ms': (time.perf_counter() - start) * 1e3})
+                registry.count('loaded')
+                return model, {'status': 'loaded', 'reason': None, 'key': key, 'drift': drift,
+                               'fitted_at': metadata['fitted_at']}
+
+        model = getattr(ml, self.ml_model)()
+        fitted_at = time.time()
+        try:
+            registry.save(key, model, {
+                'ticker': self.ticker, 'features': self.features, 'p': self.p, 'target_type': self.target_type,
+                'start': self.start, 'end': self.end, 'step_size': self.step_size, 'ml_model': self.ml_model,
+                'data_hash': data_hash, 'rows': len(ml.x_train), 'fitted_at': fitted_at,
+                'fit_time_ms': ml.profile['train'].get('fit_time_ms'), 'feature_profile': ml.feature_profile(),
+            })
+        except OSError:
+            pass
+        registry.count('fitted')
+        return model, {'status': 'fitted', 'reason': reason, 'key': key, 'drift': drift, 'fitted_at': fitted_at}
+
+    def _pipeline(self, df: DataFrame, modules: dict, external_variable=None,
+                  timer: Union[StageTimer, None] = None) -> dict:
+        """
+        Executa as etapas do pipeline a partir dos preços já carregados.
+
+        :param df: DataFrame com os preços históricos do ativo.
+        :param modules: Dicionário com as classes do pipeline ('Alvos', 'Features', 'SplitData',
+                        'Machines', 'ResultPredict' e 'Graphs').
+        :param external_variable: Função opcional que recebe o DataFrame e retorna a feature `__0__`.
+        :param timer: Instrumentação já iniciada (ex.: com o carregamento dos scripts e dos preços).
+        :return: Dicionário com métricas, DataFrames, a classe de gráficos, o modelo treinado ("model"), o
+                 DataFrame de alvos e features de todo o histórico, antes da divisão ("frame"), e as medidas
+                 de cada etapa ("timings").
+        """
+        timer = timer or StageTimer(self.profile)
+
+        # Cache das etapas: cada chave depende da etapa anterior e dos campos da configuração usados na etapa
+        cache = self.stage_cache if self.cache and not external_variable else None
+        keys, status = {}, {}
+        if cache is not None:
+            key = cache.frame_key(df)
+            for stage, module, fields in [('targets', 'Alvos', (self.p, self.target_type)),
+                                          ('features', 'Features', (self.features,)),
+                                          ('splits', 'SplitData', (self.start, self.end, self.step_size)),
+                                          ('model', 'Machines', (self.ml_model,)),
+                                          ('returns', 'ResultPredict', (self.contracts,))]:
+                key = keys[stage] = cache.key(key, stage, cache.fingerprint(modules[module]), *fields)
+
+        def cached(stage, compute, rows=None):
+            with timer.stage(stage) as record:
+                if cache is None:
+                    value = compute()
+                else:
+                    value = cache.get(stage, keys[stage])
+                    status[stage] = record['cache'] = 'hit' if value is not None else 'miss'
+                    if value is None:
+                        value = compute()
+                        cache.put(stage, keys[stage], value)
+                    value = _shallow(value)
+                if rows is None:
+                    # Linhas da saída da etapa (nos conjuntos divididos, a soma de treino, teste e pós-teste)
+                    frames = [v for v in (value if isinstance(value, tuple) else [value]) if isinstance(v, DataFrame)]
+                    rows = sum(len(frame) for frame in frames[-3:])
+                record['rows'] = rows
+            return value
+
+        # Criação dos alvos: as etapas adicionam colunas a um único DataFrame próprio (cópia rasa dos
+        # preços, sem copiar os dados), em vez de cada uma copiar o DataFrame inteiro
+        df = cached('targets', lambda: getattr(modules['Alvos'](df.copy(deep=False), p=self.p, copy=False),
+                                               self.target_type))
+
+        # Adicionando features
+        if external_variable:
+            
+            # Adiciona features criadas
+            with timer.stage('features') as record:
+                self.features = [0]
+                df['__0__'] = external_variable(df)
+                record['rows'] = len(df)
+        else:
+            df = cached('features', lambda: modules['Features'](df, copy=False).get(self.features))
+        processed = df
+
+        # Divisão dos dados: os conjuntos são fatias posicionais do mesmo DataFrame
+        def split():
+            sd = modules['SplitData'](df, self.start, self.end, step_size=self.step_size, copy=False)
+            return sd.df, sd.train(), sd.test(), sd.after_test()
+
+        base, train, test, after_test = cached('splits', split)
+        splits = [train, test, after_test]
+
+        # Treinamento do modelo (ou carregamento do registro de modelos)
+        def fit():
+            n_classes = modules['Alvos'].CLASSES[modules['Alvos'].TARGET_TYPES[self.target_type]]
+            ml = modules['Machines'](train, test, after_test, self.features, trace_memory=self.profile,
+                                     n_classes=n_classes)
+            model, registry = self._fit_model(ml, modules) if self.registry else (getattr(ml, self.ml_model)(), None)
+            predictions = [ml.predict_train(model)['predicao'].to_numpy(),
+                           ml.predict_test(model)['predicao'].to_numpy(),
+                           ml.predict_after_test(model)['predicao'].to_numpy()]
+            return {"model": model, "predictions": predictions, "metrics": ml.evaluate(), "registry": registry}
+
+        trained = cached('model', fit, rows=sum(map(len, splits)))
+        for frame, predictions in zip(splits, trained['predictions']):
+            frame['predicao'] = predictions
+
+        # Resultados
+        def returns():
+            rp = modules['ResultPredict'](train, test, after_test, lotes=self.contracts)
+            frames = [rp.calcula_train_day(), rp.calcula_test_day(), rp.calcula_after_test_day()]
+            columns = ['resultado_predicao', 'resultado_predicao_acumulado']
+            return {"columns": [{c: frame[c].to_numpy() for c in columns} for frame in frames],
+                    "metrics": rp.evaluate()}
+
+        results = cached('returns', returns, rows=sum(map(len, splits)))
+        for frame, columns in zip(splits, results['columns']):
+            for column, values in columns.items():
+                frame[column] = values
+
+        # Consolidação dos resultados
+        with timer.stage('consolidate') as record:
+            df = self._consolidate(base, splits)
+            df['resultado_predicao_acumulado'] = df['resultado_predicao'].cumsum()
+            record['rows'] = len(df)
+        
+        result = {
+            "metrics": {
+                "model": trained['metrics'],
+                "returns": results['metrics']
+            },
+            "df": {
+                "train": train,
+                "test": test,
+                "after_test": after_test,
+                "df": df
+            },
+            "graphs": modules['Graphs'],
+            "model": trained['model'],
+            "frame": processed
+        }
+        if cache is not None:
+            result['cache'] = status
+        if trained.get('registry') is not None:
+            result['registry'] = trained['registry']
+
+        # Tipos compactos: aplicados ao final, depois do cálculo das métricas
+        if self.compact:
+            with timer.stage('compact') as record:
+                compacted = self._compact(result['df'], modules, result['metrics'])
+                result['df'] = compacted['df']
+                result['compact_report'] = compacted['report']
+                record['rows'] = len(result['df']['df'])
+
+        result['timings'] = timer.finish()
+        return result
 
 class MarketBehaviorForecaster(MarketForecastConfig):
     """
@@ -221,7 +1196,24 @@ class MarketBehaviorForecaster(MarketForecastConfig):
         ``run_forecast()``:
             Executa o pipeline completo de previsão, desde o carregamento de dados até a consolidação dos resultados.
     """
-    def run_forecast(self, external_variable=None):
+    def _load_modules(self) -> dict:
+        """
+        Carrega as classes do pipeline a partir dos scripts hospedados no GitHub.
+
+        :return: Dicionário {nome da classe: classe}.
+        """
+        return {
+            'Prices': GitHubScriptLoader('prices').object,
+            'Alvos': GitHubScriptLoader('alvos').object,
+            'Features': GitHubScriptLoader('features').object,
+            'SplitData': GitHubScriptLoader('split_data').object,
+            'Machines': GitHubScriptLoader('machines').object,
+            'ResultPredict': GitHubScriptLoader('result_predict').object,
+            'Graphs': GitHubScriptLoader('graphs').object,
+            'Synthetic': GitHubScriptLoader('synthetic').object,
+        }
+
+    def run_forecast(self, external_variable=None, prices: Union[DataFrame, None] = None):
         """
         Executa o pipeline completo de previsão de mercado.
 
@@ -233,60 +1225,19 @@ class MarketBehaviorForecaster(MarketForecastConfig):
         5. Treina o modelo de aprendizado de máquina especificado.
         6. Gera previsões e consolida os resultados em um único DataFrame.
 
+        :param external_variable: Função opcional que recebe o DataFrame e retorna a feature `__0__`.
+        :param prices: Preços já carregados. Se None, os preços são obtidos com `Prices.get`.
         :raises Exception: Caso ocorra algum erro durante o processo.
         """
         try:
-            # Carregamento dos dados de preços
-            df = GitHubScriptLoader('prices').object.get(self.ticker)
+            timer = StageTimer(self.profile)
+            with timer.stage('load_modules'):
+                modules = self._load_modules()
 
-            # Criação dos alvos
-            df = getattr(GitHubScriptLoader('alvos').object(df, p=self.p), self.target_type)
+            # Carregamento dos dados de preços
+            df = self._prices(modules, prices, timer)
 
-            # Adicionando features
-            if external_variable:
-                
-                # Adiciona features criadas
-                self.features = [0]
-                df['__0__'] = external_variable(df)
-            else:
-                df = GitHubScriptLoader('features').object(df).get(self.features)
-
-            # Divisão dos dados
-            sd = GitHubScriptLoader('split_data').object(df, self.start, self.end, step_size=self.step_size)
-            train = sd.train()
-            test = sd.test()
-            after_test = sd.after_test()
-
-            # Treinamento do modelo
-            ml = GitHubScriptLoader('machines').object(train, test, after_test, self.features)
-            model = getattr(ml, self.ml_model)()
-            train = ml.predict_train(model)
-            test = ml.predict_test(model)
-            after_test = ml.predict_after_test(model)
-
-            # Resultados
-            rp = GitHubScriptLoader('result_predict').object(train, test, after_test, lotes=self.contracts)
-            train = rp.calcula_train_day()
-            test = rp.calcula_test_day()
-            after_test = rp.calcula_after_test_day()
-
-            # Consolidação dos resultados
-            df = concat([train, test, after_test], axis=0)
-            df['resultado_predicao_acumulado'] = df['resultado_predicao'].cumsum()
-            
-            return {
-                "metrics": {
-                    "model": ml.evaluate(),
-                    "returns": rp.evaluate()
-                },
-                "df": {
-                    "train": train,
-                    "test": test,
-                    "after_test": after_test,
-                    "df": df
-                },
-                "graphs": GitHubScriptLoader('graphs').object
-            }
+            return self._pipeline(df, modules, external_variable, timer=timer)
 
         except Exception as e:
             print(f"Erro na execução: {e}")
@@ -310,21 +1261,12 @@ class MarketBehaviorForecasterLocal(MarketForecastConfig):
         ``run_forecast_local()``:
             Executa o pipeline completo de previsão utilizando scripts locais.
     """
-    def run_forecast_local(self, correct_error_monday=False):
+    def _load_modules(self) -> dict:
         """
-        Executa o pipeline de previsão de mercado utilizando scripts locais.
-
-        Este método realiza as seguintes etapas:
-        1. Carrega os scripts locais (se ainda não estiverem carregados).
-        2. Realiza o carregamento dos dados históricos de preços.
-        3. Cria variáveis-alvo para modelagem.
-        4. Adiciona atributos (features) ao conjunto de dados.
-        5. Divide os dados em conjuntos de treino, teste e pós-teste.
-        6. Treina o modelo especificado e gera previsões.
-        7. Consolida os resultados e calcula o patrimônio acumulado.
+        Baixa (se necessário) e importa os scripts locais, retornando as classes do pipeline.
 
+        :return: Dicionário {nome da classe: classe}.
         :raises ImportError: Se houver falha ao importar os módulos locais.
-        :raises Exception: Para outros erros durante o pipeline de previsão.
         """
         try:
             # Baixar e salvar scripts locais, se necessário
@@ -344,59 +1286,49 @@ class MarketBehaviorForecasterLocal(MarketForecastConfig):
             )
         except ImportError as e:
             raise ImportError(f"Erro ao importar os módulos locais após o download: {e}")
+
+        return {
+            'Prices': prices.Prices,
+            'Alvos': alvos.Alvos,
+            'Features': features.Features,
+            'SplitData': split_data.SplitData,
+            'Machines': machines.Machines,
+            'ResultPredict': result_predict.ResultPredict,
+            'Graphs': graphs.Graphs,
+            'Synthetic': synthetic.Synthetic,
+        }
+
+    def run_forecast_local(self, correct_error_monday=False, prices: Union[DataFrame, None] = None):
+        """
+        Executa o pipeline de previsão de mercado utilizando scripts locais.
+
+        Este método realiza as seguintes etapas:
+        1. Carrega os scripts locais (se ainda não estiverem carregados).
+        2. Realiza o carregamento dos dados históricos de preços.
+        3. Cria variáveis-alvo para modelagem.
+        4. Adiciona atributos (features) ao conjunto de dados.
+        5. Divide os dados em conjuntos de treino, teste e pós-teste.
+        6. Treina o modelo especificado e gera previsões.
+        7. Consolida os resultados e calcula o patrimônio acumulado.
+
+        :param prices: Preços já carregados. Se None, os preços são obtidos com `Prices.get`.
+        :raises ImportError: Se houver falha ao importar os módulos locais.
+        :raises Exception: Para outros erros durante o pipeline de previsão.
+        """
+        timer = StageTimer(self.profile)
+        with timer.stage('load_modules'):
+            modules = self._load_modules()
         
         try:
             # Carregamento dos dados de preços
-            df = prices.Prices.get(self.ticker)
+            df = self._prices(modules, prices, timer)
 
             # Se segunda feira e meu ultimo preco do yf for de quinta então adicionar o preco se sexta do mt5
             # Isso afeata a previsão da segunda. Em modelos mais sensíveis pode haver inconsistências.
             if correct_error_monday:
                 pass
             
-            # Criação dos alvos
-            df = getattr(alvos.Alvos(df, p=self.p), self.target_type)
-
-            # Adicionando features
-            df = features.Features(df).get(self.features)
-
-            # Divisão dos dados
-            sd = split_data.SplitData(df, self.start, self.end, step_size=self.step_size)
-            train = sd.train()
-            test = sd.test()
-            after_test = sd.after_test()
-
-            # Treinamento do modelo
-            ml = machines.Machines(train, test, after_test, self.features)
-            model = getattr(ml, self.ml_model)()
-            train = ml.predict_train(model)
-            test = ml.predict_test(model)
-            after_test = ml.predict_after_test(model)
-
-            # Resultados
-            rp = result_predict.ResultPredict(train, test, after_test, lotes=self.contracts)
-            train = rp.calcula_train_day()
-            test = rp.calcula_test_day()
-            after_test = rp.calcula_after_test_day()
-
-            # Consolidação dos resultados
-            df = concat([train, test, after_test], axis=0)
-            df['resultado_predicao_acumulado'] = df['resultado_predicao'].cumsum()
-            
-            return {
-                "metrics": {
-                    "model": ml.evaluate(),
-                    "returns": rp.evaluate()
-                },
-                "df": {
-                    "train": train,
-                    "test": test,
-                    "after_test": after_test,
-                    "df": df
-                },
-                "graphs": graphs.Graphs
-                
-            }
+            return self._pipeline(df, modules, timer=timer)
         
         except Exception as e:
             print(f"Erro na execução: {e}")
@@ -404,4 +1336,394 @@ class MarketBehaviorForecasterLocal(MarketForecastConfig):
 
 # mb = MarketBehaviorForecasterLocal('BBDC4.SA', features=[1, 2], start='2012-05-11', end='2022-05-11', step_size=None,
 #                                    ).run_forecast_local()
-# print(mb)
\ No newline at end of file
+# print(mb)
+
+
+def _run_batch_group(configs: List[MarketForecastConfig], df: DataFrame, local: bool, keep_frames: bool,
+                     modules: Union[dict, None] = None) -> List[Tuple[int, Union[dict, None], Union[str, None]]]:
+    """
+    Executa, em um processo do pool, um grupo de configurações que compartilham o mesmo ticker.
+
+    :param configs: Lista de tuplas (índice da execução, configuração).
+    :param df: Preços do ticker, carregados uma única vez no processo principal.
+    :param local: Se True, usa os scripts locais; caso contrário, os scripts do GitHub.
+    :param keep_frames: Se False, descarta os DataFrames de cada execução.
+    :param modules: Classes do pipeline já carregadas. Se None, são carregadas pelo `_load_modules` do executor.
+    :return: Lista de tuplas (índice da execução, resultado, mensagem de erro).
+    """
+    runner = MarketBehaviorForecasterLocal if local else MarketBehaviorForecaster
+    output = []
+    for run_id, config in configs:
+        forecaster = runner(**vars(config))
+        try:
+            timer = StageTimer(forecaster.profile)
+            with timer.stage('load_modules'):
+                loaded = modules or forecaster._load_modules()
+            result = forecaster._pipeline(forecaster._prices(loaded, df, timer), loaded, timer=timer)
+        except Exception as e:
+            output.append((run_id, None, f'{type(e).__name__}: {e}'))
+            continue
+
+        # A classe de gráficos é carregada dinamicamente e não é serializável entre processos
+        result.pop('graphs', None)
+        if not keep_frames:
+            result.pop('df', None)
+            result.pop('model', None)
+            result.pop('frame', None)
+        output.append((run_id, result, None))
+    return output
+
+
+class MarketBatchForecaster:
+    """
+    Executa várias configurações de previsão em paralelo, em um pool de processos.
+
+    As configurações são agrupadas por ticker: os preços de cada ticker são carregados uma única vez
+    no processo principal e compartilhados por todas as execuções desse ticker. O pipeline executado
+    em cada processo é o mesmo de `run_forecast`/`run_forecast_local`, portanto os resultados são
+    idênticos aos de uma execução individual.
+
+    Attributes:
+        configs (List[MarketForecastConfig]): Configurações a serem executadas (tickers x features x janelas x modelos).
+        max_workers (int): Número de processos do pool. Se 1, executa tudo no processo atual.
+        local (bool): Se True, usa os scripts locais (`MarketBehaviorForecasterLocal`).
+        keep_frames (bool): Se True, mantém os DataFrames e o modelo de cada execução no resultado.
+        prices (Callable): Fonte de preços `prices(ticker) -> DataFrame`, chamada uma vez por ticker. Se None,
+            usa `Prices.get`.
+        modules (dict): Classes do pipeline já carregadas, enviadas a cada processo. Se None, cada processo
+            carrega os scripts (locais ou do GitHub, conforme `local`).
+
+    Methods:
+        ``run() -> dict``:
+            Executa todas as configurações e retorna a tabela de métricas.
+    """
+    def __init__(self, configs: List[MarketForecastConfig], max_workers: Union[int, None] = None,
+                 local: bool = False, keep_frames: bool = False, prices: Union[Callable, None] = None,
+                 modules: Union[dict, None] = None):
+        if not configs:
+            raise ValueError("A lista de configurações não pode ser vazia.")
+
+        self.configs = list(configs)
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.local = local
+        self.keep_frames = keep_frames
+        self.prices = prices
+        self.modules = modules
+
+    def _load_prices(self) -> dict:
+        """
+        Carrega os preços de cada ticker uma única vez.
+
+        :return: Dicionário {ticker: DataFrame}.
+        """
+        prices = self.prices
+        if prices is None:
+            runner = MarketBehaviorForecasterLocal if self.local else MarketBehaviorForecaster
+            prices = (self.modules or runner(self.configs[0].ticker)._load_modules())['Prices'].get
+        return {ticker: prices(ticker) for ticker in dict.fromkeys(c.ticker for c in self.configs)}
+
+    def _tasks(self, prices: dict) -> List[tuple]:
+        """
+        Divide as configurações de cada ticker em grupos, um por tarefa do pool.
+        """
+        by_ticker = {}
+        for run_id, config in enumerate(self.configs):
+            by_ticker.setdefault(config.ticker, []).append((run_id, config))
+
+        tasks = []
+        for ticker, group in by_ticker.items():
+            chunk = -(-len(group) // self.max_workers)
+            for i in range(0, len(group), chunk):
+                tasks.append((group[i:i + chunk], prices[ticker], self.local, self.keep_frames, self.modules))
+        return tasks
+
+    @staticmethod
+    def _metrics_rows(run_id: int, config: MarketForecastConfig, result: dict) -> List[dict]:
+        """
+        Converte as métricas de uma execução em linhas da tabela (uma linha por conjunto de dados).
+        """
+        rows = []
+        for split, model_metrics in result['metrics']['model'].items():
+            row = {
+                'run_id': run_id, 'ticker': config.ticker, 'p': config.p, 'target_type': config.target_type,
+                'features': str(config.features), 'start': config.start, 'end': config.end,
+                'step_size': config.step_size, 'ml_model': config.ml_model, 'contracts': config.contracts,
+                'split': split,
+            }
+            row.update({k: v for k, v in model_metrics.items() if not isinstance(v, (list, dict))})
+            row.update(model_metrics.get('timing', {}))
+            row.update(result['metrics']['returns'].get(split, {}))
+            rows.append(row)
+        return rows
+
+    def run(self) -> dict:
+        """
+        Executa todas as configurações.
+
+        :return: Dicionário com:
+            - "metrics": DataFrame com uma linha por execução e conjunto de dados (train, test, after_test);
+            - "runs": lista com o resultado completo de cada execução (None quando houve erro);
+            - "errors": dicionário {índice da execução: mensagem de erro}.
+        """
+        from concurrent.futures import ProcessPoolExecutor
+
+        tasks = self._tasks(self._load_prices())
+
+        if self.max_workers == 1:
+            outputs = [_run_batch_group(*task) for task in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                outputs = list(executor.map(_run_batch_group, *zip(*tasks)))
+
+        runs, errors, rows = [None] * len(self.configs), {}, []
+        for run_id, result, error in (item for output in outputs for item in output):
+            if error:
+                errors[run_id] = error
+                continue
+            runs[run_id] = result
+            rows.extend(self._metrics_rows(run_id, self.configs[run_id], result))
+
+        return {
+            "metrics": DataFrame(rows),
+            "runs": runs,
+            "errors": errors
+        }
+
+
+def _run_synthetic_group(config: MarketForecastConfig, df: DataFrame, local: bool, options: dict,
+                         first: int, n_paths: int, modules: Union[dict, None] = None) -> Tuple[List[dict], dict]:
+    """
+    Executa, em um processo do pool, o pipeline sobre as trajetórias `first` até `first + n_paths - 1`.
+
+    As trajetórias são geradas no próprio processo a partir da semente (ver `Synthetic`), portanto
+    apenas os preços históricos são enviados ao pool.
+
+    :param config: Configuração da previsão.
+    :param df: Preços históricos do ativo.
+    :param local: Se True, usa os scripts locais; caso contrário, os scripts do GitHub.
+    :param options: Parâmetros de `Synthetic` (method, n_steps, block_size, seed).
+    :param first: Número da primeira trajetória.
+    :param n_paths: Número de trajetórias.
+    :param modules: Classes do pipeline já carregadas. Se None, são carregadas pelo `_load_modules` do executor.
+    :return: Tupla (linhas de métricas, {trajetória: mensagem de erro}).
+    """
+    runner = MarketBehaviorForecasterLocal if local else MarketBehaviorForecaster
+    forecaster = runner(**{**vars(config), 'synthetic_serie': None})
+    modules = modules or forecaster._load_modules()
+    synthetic = modules['Synthetic'](df, **options)
+
+    rows, errors = [], {}
+    for start, paths in synthetic.iter_paths(n_paths, first):
+        for path, ohlc in enumerate(paths, start):
+            try:
+                result = forecaster._pipeline(synthetic.frame(ohlc), modules)
+            except Exception as e:
+                errors[path] = f'{type(e).__name__}: {e}'
+                continue
+            rows.extend(MarketBatchForecaster._metrics_rows(path, config, result))
+    return rows, errors
+
+
+class MarketSyntheticForecaster:
+    """
+    Executa o pipeline de uma configuração sobre muitas trajetórias de preços sintéticas.
+
+    Os preços do ativo são carregados uma única vez e usados pela classe `Synthetic` para gerar as
+    trajetórias (GBM, bootstrap ou block bootstrap). As trajetórias são divididas em faixas contíguas
+    entre os processos do pool; cada processo gera as suas a partir da semente, em lotes, e executa o
+    mesmo pipeline de `run_forecast`/`run_forecast_local`. O resultado é reprodutível e não depende do
+    número de processos.
+
+    Attributes:
+        config (MarketForecastConfig): Configuração da previsão.
+        n_paths (int): Número de trajetórias sintéticas.
+        method (str): Método de simulação ('gbm', 'bootstrap' ou 'block_bootstrap').
+        n_steps (Union[int, None]): Barras de cada trajetória (as últimas datas do histórico). Se None, todo o histórico.
+        block_size (int): Tamanho dos blocos do 'block_bootstrap'.
+        seed (int): Semente da simulação.
+        max_workers (int): Número de processos do pool. Se 1, executa tudo no processo atual.
+        local (bool): Se True, usa os scripts locais (`MarketBehaviorForecasterLocal`).
+        modules (dict): Classes do pipeline já carregadas, enviadas a cada processo. Se None, os scripts são
+            carregados (locais ou do GitHub, conforme `local`).
+
+    Methods:
+        ``run(prices: Union[DataFrame, None] = None) -> dict``:
+            Executa o pipeline na série real e em todas as trajetórias e retorna as métricas.
+
+        ``sweep(model=None, prices: Union[DataFrame, None] = None, split: str = 'after_test') -> dict``:
+            Avalia um modelo treinado em todas as trajetórias, com alvos, features e predições em lote.
+    """
+    # Métricas de `sweep` comparadas com a série real (maiores valores são melhores)
+    SWEEP_METRICS = ('accuracy', 'total', 'mean', 'sharpe', 'max_drawdown', 'win_rate')
+
+    def __init__(self, config: MarketForecastConfig, n_paths: int, method: str = 'block_bootstrap',
+                 n_steps: Union[int, None] = None, block_size: int = 20, seed: int = 0,
+                 max_workers: Union[int, None] = None, local: bool = False, modules: Union[dict, None] = None):
+        if n_paths <= 0:
+            raise ValueError("O número de trajetórias deve ser positivo.")
+
+        self.config = config
+        self.n_paths = n_paths
+        self.method = method
+        self.n_steps = n_steps
+        self.block_size = block_size
+        self.seed = seed
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.local = local
+        self.modules = modules
+
+    def _tasks(self, df: DataFrame) -> List[tuple]:
+        """
+        Divide as trajetórias em faixas contíguas, uma por processo do pool.
+        """
+        options = {'method': self.method, 'n_steps': self.n_steps, 'block_size': self.block_size,
+                   'seed': self.seed}
+        chunk = -(-self.n_paths // self.max_workers)
+        return [(self.config, df, self.local, options, first, min(chunk, self.n_paths - first), self.modules)
+                for first in range(0, self.n_paths, chunk)]
+
+    def _setup(self, prices: Union[DataFrame, None] = None) -> tuple:
+        """
+        Carrega os módulos e os preços do ativo e cria o gerador de trajetórias.
+
+        :return: Tupla (forecaster, módulos, preços, gerador `Synthetic`).
+        """
+        runner = MarketBehaviorForecasterLocal if self.local else MarketBehaviorForecaster
+        forecaster = runner(**{**vars(self.config), 'synthetic_serie': None})
+        modules = self.modules or forecaster._load_modules()
+        df = modules['Prices'].get(self.config.ticker) if prices is None else prices
+        synthetic = modules['Synthetic'](df, self.method, n_steps=self.n_steps, block_size=self.block_size,
+                                         seed=self.seed)
+        return forecaster, modules, df, synthetic
+
+    def run(self, prices: Union[DataFrame, None] = None) -> dict:
+        """
+        Executa o pipeline na série real e nas trajetórias sintéticas.
+
+        :param prices: Preços do ativo. Se None, são obtidos com `Prices.get`.
+        :return: Dicionário com:
+            - "metrics": DataFrame com uma linha por trajetória e conjunto de dados (coluna 'path');
+            - "real": DataFrame com as métricas da série real, restrita às mesmas datas das trajetórias;
+            - "errors": dicionário {trajetória: mensagem de erro}.
+        """
+        from concurrent.futures import ProcessPoolExecutor
+
+        forecaster, modules, df, synthetic = self._setup(prices)
+
+        # Série real nas mesmas datas das trajetórias, para comparação
+        real = forecaster._pipeline(df.loc[synthetic.index], modules)
+
+        tasks = self._tasks(df)
+        if self.max_workers == 1:
+            outputs = [_run_synthetic_group(*task) for task in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                outputs = list(executor.map(_run_synthetic_group, *zip(*tasks)))
+
+        rows, errors = [], {}
+        for output_rows, output_errors in outputs:
+            rows.extend(output_rows)
+            errors.update(output_errors)
+
+        return {
+            "metrics": DataFrame(rows).rename(columns={'run_id': 'path'}),
+            "real": DataFrame(MarketBatchForecaster._metrics_rows(-1, self.config, real)).drop(columns='run_id'),
+            "errors": errors
+        }
+
+    def _score_panel(self, model, panel: dict, rows: np.ndarray, modules: dict) -> DataFrame:
+        """
+        Calcula alvos, features e predições de um painel de trajetórias e avalia cada trajetória.
+
+        :param model: Modelo treinado.
+        :param panel: {coluna de preço: DataFrame datas x trajetórias} (ver `Synthetic.panel`).
+        :param rows: Posições, no painel, das linhas avaliadas.
+        :param modules: Dicionário com as classes do pipeline.
+        :return: DataFrame com uma linha por trajetória (ver `ResultPredict.score_paths`).
+        """
+        config = self.config
+        features = modules['Features'].panel(panel, config.features)
+        variation, target = modules['Alvos'].paths(panel['Open'].to_numpy(), panel['Close'].to_numpy(),
+                                                   config.p, config.target_type)
+        predictions = modules['Machines'].predict_paths(
+            model, {f'__{f}__': features[f].to_numpy()[rows] for f in config.features})
+        scores = modules['ResultPredict'].score_paths(predictions.T, target[rows].T, variation[rows].T,
+                                                      lotes=config.contracts)
+        scores.index = panel['Close'].columns
+        return scores
+
+    def sweep(self, model=None, prices: Union[DataFrame, None] = None, split: str = 'after_test',
+              confidence: float = 0.95, batch_size: Union[int, None] = None) -> dict:
+        """
+        Avalia um modelo treinado em todas as trajetórias sintéticas, para medir se o desempenho obtido na
+        série real pode ser explicado pelo acaso.
+
+        O pipeline é executado uma vez na série real (nas mesmas datas das trajetórias) para definir os
+        conjuntos de dados e, se `model` não for informado, treinar o modelo. Em seguida, para cada lote
+        de trajetórias, os alvos são calculados em NumPy, as features em DataFrames datas x trajetórias
+        (cada nó do grafo de features é calculado uma vez para o lote) e todas as linhas do conjunto
+        `split` são preditas em uma única chamada de `predict`. Apenas as datas necessárias são
+        processadas: o conjunto avaliado e o lookback declarado das features.
+
+        :param model: Modelo treinado (ex.: result["model"] de uma execução). Se None, usa o modelo treinado
+                      na série real.
+        :param prices: Preços do ativo. Se None, são obtidos com `Prices.get`.
+        :param split: Conjunto avaliado ('train', 'test' ou 'after_test').
+        :param confidence: Nível do intervalo de confiança das métricas.
+        :param batch_size: Trajetórias por lote. Se None, todas as trajetórias formam um único lote (uma única
+                           predição); lotes menores limitam a memória.
+        :return: Dicionário com:
+            - "paths": DataFrame com as métricas de cada trajetória (acurácia, dias avaliados e resultado de
+              `resultado_predicao`: total, média, desvio, Sharpe, drawdown máximo, taxa de acerto e turnover);
+            - "real": métricas da série real, calculadas da mesma forma;
+            - "summary": DataFrame com, para cada métrica de `SWEEP_METRICS`, o valor real, a média e o desvio
+              das trajetórias, o intervalo de confiança (percentis) e o p-valor unilateral (fração das
+              trajetórias com valor maior ou igual ao real);
+            - "split": conjunto avaliado.
+        """
+        forecaster, modules, df, synthetic = self._setup(prices)
+        real_prices = df.loc[synthetic.index]
+        real = forecaster._pipeline(real_prices, modules)
+        model = real['model'] if model is None else model
+
+        # Posições do conjunto avaliado (as trajetórias têm as mesmas datas da série real)
+        index = synthetic.index.tz_localize(None) if synthetic.index.tz is not None else synthetic.index
+        rows = index.get_indexer(real['df'][split].index)
+        if len(rows) == 0 or (rows < 0).any():
+            raise ValueError(f"As datas do conjunto '{split}' não estão nas datas das trajetórias.")
+
+        # Janela de datas processada: lookback das features antes do conjunto e `p` dias depois (alvos)
+        lookback = modules['Features'].lookback(self.config.features)
+        begin = 0 if lookback is None else max(rows.min() - lookback, 0)
+        window = slice(begin, rows.max() + self.config.p + 1)
+        rows = rows - begin
+
+        columns = [c for c in ('Open', 'High', 'Low', 'Close', 'Adj Close') if c in real_prices.columns]
+        real_panel = {c: real_prices[[c]].iloc[window].set_axis(['real'], axis=1) for c in columns}
+        real_scores = self._score_panel(model, real_panel, rows, modules).iloc[0]
+
+        scores = []
+        for first, paths in synthetic.iter_paths(self.n_paths, batch_size=batch_size or self.n_paths):
+            panel = {c: frame.iloc[window] for c, frame in synthetic.panel(paths, first).items()}
+            scores.append(self._score_panel(model, panel, rows, modules))
+        scores = concat(scores)
+        scores.index.name = 'path'
+
+        alpha = (1 - confidence) / 2
+        metrics = scores[list(self.SWEEP_METRICS)]
+        reference = real_scores[list(self.SWEEP_METRICS)].astype(float)
+        summary = DataFrame({
+            'real': reference,
+            'mean': metrics.mean(),
+            'std': metrics.std(),
+            'ci_low': metrics.quantile(alpha),
+            'ci_high': metrics.quantile(1 - alpha),
+            'p_value': (1 + metrics.ge(reference).sum()) / (1 + metrics.notna().sum()),
+        })
+
+        return {
+            "paths": scores,
+            "real": real_scores,
+            "summary": summary,
+            "split": split
+        }
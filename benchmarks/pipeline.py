@@ -0,0 +1,195 @@
+"""
+Benchmark do pipeline completo (alvos, features, divisão, modelo, resultados e gráficos) com dados sintéticos.
+
+Executa o mesmo pipeline de `MarketBehaviorForecasterLocal.run_forecast_local` com os scripts locais e preços
+OHLCV sintéticos determinísticos (sem acesso à rede), medindo tempo de relógio, tempo de CPU, linhas e
+variação de memória de cada etapa, além do pico de memória (tracemalloc) da execução completa. Os
+resultados são salvos em JSON e duas execuções podem ser comparadas automaticamente.
+
+Uso:
+    python benchmarks/pipeline.py run --rows 1000 10000 100000 1000000 --output base.json
+    python benchmarks/pipeline.py run --output new.json
+    python benchmarks/pipeline.py compare base.json new.json --threshold 0.10
+"""
+import argparse
+import datetime
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import tracemalloc
+
+import matplotlib
+matplotlib.use('Agg')
+logging.getLogger('matplotlib.font_manager').setLevel(logging.ERROR)
+
+import pandas as pd  # noqa: E402
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.join(HERE, '..')
+sys.path[:0] = [HERE, os.path.join(ROOT, 'Scripts'), ROOT]
+
+from alvos import Alvos  # noqa: E402
+from api import MarketBehaviorForecasterLocal, StageTimer  # noqa: E402
+from features import Features  # noqa: E402
+from graphs import Graphs  # noqa: E402
+from machines import Machines  # noqa: E402
+from result_predict import ResultPredict  # noqa: E402
+from split_data import SplitData  # noqa: E402
+from synthetic_data import SIZES, synthetic_ohlcv  # noqa: E402
+
+MODULES = {'Alvos': Alvos, 'Features': Features, 'SplitData': SplitData, 'Machines': Machines,
+           'ResultPredict': ResultPredict, 'Graphs': Graphs}
+
+
+def metadata() -> dict:
+    """
+    Retorna as informações do ambiente da execução (versões, plataforma e commit).
+    """
+    import numpy
+    import sklearn
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                                text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        'date': datetime.datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'numpy': numpy.__version__,
+        'pandas': pd.__version__,
+        'sklearn': sklearn.__version__,
+        'matplotlib': matplotlib.__version__,
+    }
+
+
+def run_once(df: pd.DataFrame, config: MarketBehaviorForecasterLocal, directory: str) -> dict:
+    """
+    Executa o pipeline e os gráficos uma vez e retorna o relatório de tempos (ver `StageTimer.finish`).
+    """
+    timer = StageTimer()
+    result = config._pipeline(df, MODULES, timer=timer)
+
+    # Gráficos: mesmos gráficos do relatório, salvos em arquivo com o backend Agg
+    graphs = StageTimer()
+    frame = result['df']['df']
+    with graphs.stage('graphs') as record:
+        Graphs(frame, 'resultado_predicao_acumulado', preview=True).save('linha', os.path.join(directory, 'linha.png'))
+        Graphs(frame, None, preview=True).save('comparar_retornos', os.path.join(directory, 'retornos.png'),
+                                               result['metrics']['returns'])
+        record['rows'] = len(frame)
+
+    timings = result['timings']
+    timings['stages'] += graphs.finish()['stages']
+    timings['wall_ms'] += timings['stages'][-1]['wall_ms']
+    return timings
+
+
+def bench(rows: int, repeat: int = 3, features=(1, 2, 3), ml_model: str = 'train_decision_tree',
+          seed: int = 0) -> list:
+    """
+    Mede cada etapa e o pipeline completo para um tamanho de dados.
+
+    O tempo de cada etapa é o menor entre `repeat` execuções; o pico de memória vem de uma execução
+    adicional com tracemalloc (que deixa o código mais lento e por isso não entra nos tempos).
+
+    Returns:
+        list: Uma linha por etapa e uma linha 'pipeline' com o total e o pico de memória.
+    """
+    df = synthetic_ohlcv(rows, seed)
+    config = MarketBehaviorForecasterLocal('SYNTH', features=list(features), ml_model=ml_model,
+                                           start=str(df.index[min(100, rows // 10)].date()),
+                                           end=str(df.index[int(rows * 0.8)].date()))
+
+    best, total = {}, None
+    with tempfile.TemporaryDirectory() as directory:
+        for _ in range(repeat):
+            timings = run_once(df, config, directory)
+            total = timings['wall_ms'] if total is None else min(total, timings['wall_ms'])
+            for record in timings['stages']:
+                if record['stage'] not in best or record['wall_ms'] < best[record['stage']]['wall_ms']:
+                    best[record['stage']] = record
+
+        tracemalloc.start()
+        run_once(df, config, directory)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    results = [{'rows': rows, 'stage': stage, 'wall_ms': record['wall_ms'], 'cpu_ms': record['cpu_ms'],
+                'rows_processed': record['rows'], 'memory_delta_bytes': record['memory_delta_bytes']}
+               for stage, record in best.items()]
+    results.append({'rows': rows, 'stage': 'pipeline', 'wall_ms': total, 'cpu_ms': None,
+                    'rows_processed': rows, 'memory_delta_bytes': None, 'peak_bytes': peak})
+    return results
+
+
+def run(sizes, repeat: int, features, ml_model: str, output: str) -> dict:
+    """
+    Executa o benchmark para todos os tamanhos e salva o resultado em JSON.
+    """
+    results = []
+    for rows in sizes:
+        results += bench(rows, repeat, features, ml_model)
+        print(f'{rows} linhas: {results[-1]["wall_ms"]:.1f} ms', file=sys.stderr)
+
+    report = {'meta': {**metadata(), 'repeat': repeat, 'features': list(features), 'ml_model': ml_model},
+              'results': results}
+    if output:
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    return report
+
+
+def compare(base: dict, new: dict, threshold: float = 0.10, min_ms: float = 1.0) -> pd.DataFrame:
+    """
+    Compara duas execuções do benchmark etapa a etapa.
+
+    Uma etapa é marcada como regressão quando fica mais de `threshold` (fração) mais lenta e seu tempo
+    na execução base é de pelo menos `min_ms` (etapas mais rápidas são dominadas por ruído).
+
+    Returns:
+        pd.DataFrame: Tempos base e novo, razão novo/base e a coluna 'regression'.
+    """
+    columns = ['rows', 'stage', 'wall_ms']
+    table = pd.DataFrame(base['results'])[columns].merge(pd.DataFrame(new['results'])[columns],
+                                                         on=['rows', 'stage'], suffixes=('_base', '_new'))
+    table['ratio'] = table['wall_ms_new'] / table['wall_ms_base']
+    table['regression'] = (table['ratio'] > 1 + threshold) & (table['wall_ms_base'] >= min_ms)
+    return table
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help='Executa o benchmark e salva o resultado em JSON.')
+    run_parser.add_argument('--rows', type=int, nargs='+', default=list(SIZES))
+    run_parser.add_argument('--repeat', type=int, default=3)
+    run_parser.add_argument('--features', type=int, nargs='+', default=[1, 2, 3])
+    run_parser.add_argument('--ml-model', default='train_decision_tree')
+    run_parser.add_argument('--output', default='benchmark.json')
+
+    compare_parser = commands.add_parser('compare', help='Compara duas execuções e indica regressões.')
+    compare_parser.add_argument('base')
+    compare_parser.add_argument('new')
+    compare_parser.add_argument('--threshold', type=float, default=0.10)
+    compare_parser.add_argument('--min-ms', type=float, default=1.0)
+
+    args = parser.parse_args()
+    if args.command == 'run':
+        report = run(args.rows, args.repeat, args.features, args.ml_model, args.output)
+        print(pd.DataFrame(report['results']).to_string(index=False, float_format='{:.2f}'.format))
+    else:
+        with open(args.base, encoding='utf-8') as f:
+            base = json.load(f)
+        with open(args.new, encoding='utf-8') as f:
+            new = json.load(f)
+        table = compare(base, new, args.threshold, args.min_ms)
+        print(table.to_string(index=False, float_format='{:.2f}'.format))
+        sys.exit(1 if table['regression'].any() else 0)
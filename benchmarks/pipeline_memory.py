@@ -0,0 +1,65 @@
+"""
+Perfil de memória do pipeline (`MarketForecastConfig._pipeline`) com os scripts locais.
+
+Mede o pico de memória alocada (tracemalloc) durante uma execução completa e o compara ao tamanho
+do DataFrame final. Com as etapas adicionando colunas a um único DataFrame (sem cópias), o pico
+fica próximo do tamanho do resultado.
+
+Uso:
+    python benchmarks/pipeline_memory.py --rows 10000 100000 400000
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import pandas as pd
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.join(HERE, '..')
+sys.path[:0] = [HERE, os.path.join(ROOT, 'Scripts'), ROOT]
+
+from alvos import Alvos  # noqa: E402
+from api import MarketForecastConfig  # noqa: E402
+from features import Features  # noqa: E402
+from machines import Machines  # noqa: E402
+from result_predict import ResultPredict  # noqa: E402
+from split_data import SplitData  # noqa: E402
+from synthetic_data import synthetic_ohlcv  # noqa: E402
+
+MODULES = {'Alvos': Alvos, 'Features': Features, 'SplitData': SplitData, 'Machines': Machines,
+           'ResultPredict': ResultPredict, 'Graphs': None}
+
+
+def profile(rows: int, features: list) -> dict:
+    """
+    Executa o pipeline uma vez e retorna tempo, pico de memória e tamanho do DataFrame final.
+    """
+    df = synthetic_ohlcv(rows)
+    prices = df.memory_usage(deep=True).sum()
+    config = MarketForecastConfig('SYNTH', features=features, start=str(df.index[100].date()),
+                                  end=str(df.index[int(rows * 0.8)].date()))
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = config._pipeline(df, MODULES)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    final = result['df']['df'].memory_usage(deep=True).sum()
+    return {
+        'rows': rows, 'seconds': elapsed, 'prices_mb': prices / 1e6,
+        'final_mb': final / 1e6, 'peak_mb': peak / 1e6, 'peak_over_final': peak / final,
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000, 400_000])
+    parser.add_argument('--features', type=int, nargs='+', default=[1, 2, 3])
+    args = parser.parse_args()
+
+    results = [profile(rows, args.features) for rows in args.rows]
+    print(pd.DataFrame(results).to_string(index=False, float_format='{:.2f}'.format))
@@ -0,0 +1,70 @@
+"""
+Benchmark dos kernels de estatísticas móveis de `Scripts/features.py` contra o `rolling` do pandas.
+
+Uso:
+    python benchmarks/rolling_kernels.py --rows 100000 1000000 --window 6
+"""
+import argparse
+import os
+import sys
+from timeit import repeat
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Scripts'))
+
+from features import rolling_moments, rolling_quantiles  # noqa: E402
+
+
+def best_of(func, number: int = 5) -> float:
+    """
+    Retorna o menor tempo, em segundos, de `number` execuções de `func`.
+    """
+    return min(repeat(func, number=1, repeat=number))
+
+
+def bench(rows: int, window: int, dtype: str = 'float64') -> dict:
+    """
+    Mede pandas e kernels NumPy para soma, média, desvio padrão e dois quantis da mesma janela.
+    """
+    rng = np.random.default_rng(0)
+    values = rng.normal(0, 0.01, rows).astype(dtype)
+    series = pd.Series(values)
+
+    def with_pandas():
+        rolling = series.rolling(window)
+        return (rolling.sum(), rolling.mean(), rolling.std(), rolling.quantile(0.10), rolling.quantile(0.75))
+
+    def with_kernels():
+        return rolling_moments(values, window), rolling_quantiles(values, window, [0.10, 0.75])
+
+    # Confere se os resultados coincidem com o pandas. Em float64 os quantis são idênticos; soma, média e desvio
+    # padrão diferem apenas no arredondamento (o pandas usa um algoritmo online e calcula sempre em float64)
+    expected = with_pandas()
+    moments, quantiles = with_kernels()
+    rtol = 1e-9 if dtype == 'float64' else 1e-4
+    atol = rtol * np.abs(values).max()
+    for got, reference in zip([moments['sum'], moments['mean'], moments['std'], quantiles[0.10], quantiles[0.75]],
+                              expected):
+        np.testing.assert_allclose(got, reference.to_numpy(), rtol=rtol, atol=atol, equal_nan=True)
+    if dtype == 'float64':
+        np.testing.assert_array_equal(quantiles[0.10], expected[3].to_numpy())
+
+    pandas_time = best_of(with_pandas)
+    kernel_time = best_of(with_kernels)
+    return {
+        'rows': rows, 'window': window, 'dtype': dtype,
+        'pandas_ms': pandas_time * 1e3, 'numpy_ms': kernel_time * 1e3,
+        'speedup': pandas_time / kernel_time,
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[100_000, 1_000_000])
+    parser.add_argument('--window', type=int, default=6)
+    args = parser.parse_args()
+
+    results = [bench(rows, args.window, dtype) for rows in args.rows for dtype in ('float64', 'float32')]
+    print(pd.DataFrame(results).to_string(index=False, float_format='{:.2f}'.format))
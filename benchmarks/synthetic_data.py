@@ -0,0 +1,33 @@
+"""
+Gerador determinístico de preços OHLCV sintéticos para os benchmarks (sem acesso à rede).
+"""
+import numpy as np
+import pandas as pd
+
+SIZES = (1_000, 10_000, 100_000, 1_000_000)
+
+
+def synthetic_ohlcv(rows: int, seed: int = 0, freq: str = 'h', start: str = '1990-01-01') -> pd.DataFrame:
+    """
+    Gera preços OHLCV sintéticos (passeio aleatório geométrico) com as colunas do Yahoo Finance.
+
+    A mesma combinação de `rows` e `seed` produz sempre os mesmos dados. A frequência padrão é horária
+    para que 1 milhão de linhas caiba no intervalo de datas do pandas.
+
+    Args:
+        rows (int): Número de linhas.
+        seed (int): Semente do gerador aleatório.
+        freq (str): Frequência do índice de datas.
+        start (str): Data inicial.
+
+    Returns:
+        pd.DataFrame: Colunas 'Adj Close', 'Close', 'High', 'Low', 'Open' e 'Volume', indexadas por 'Date'.
+    """
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, rows)))
+    open_ = close * np.exp(rng.normal(0, 0.005, rows))
+    high = np.maximum(open_, close) * np.exp(np.abs(rng.normal(0, 0.005, rows)))
+    low = np.minimum(open_, close) * np.exp(-np.abs(rng.normal(0, 0.005, rows)))
+    index = pd.date_range(start, periods=rows, freq=freq, name='Date')
+    return pd.DataFrame({'Adj Close': close, 'Close': close, 'High': high, 'Low': low, 'Open': open_,
+                         'Volume': rng.integers(100_000, 1_000_000, rows).astype(float)}, index=index)
@@ -0,0 +1,412 @@
+"""
+Serviço residente de previsão, com estado em memória e uma API HTTP/JSON local.
+
+Uso:
+    python service.py ^BVSP BBDC4.SA --features 1 2 --start 2012-05-11 --end 2022-05-11 --port 8765
+
+Endpoints:
+    GET  /forecast?name=^BVSP&name=BBDC4.SA   Sinal do próximo dia (todas as configurações se `name` for omitido).
+    POST /forecast  {"names": [...]}          Idem, várias configurações em uma requisição.
+    POST /refresh   {"names": [...], "refit": false}
+                                              Busca novas barras, atualiza alvos, features e sinais.
+    GET  /metrics                             Latências, contadores e estado de cada configuração.
+"""
+import argparse
+import json
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Union
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+from pandas import DataFrame, Timestamp
+
+from api import MarketBehaviorForecasterLocal, MarketForecastConfig
+
+
+def _json_default(value):
+    """
+    Converte para JSON os tipos do NumPy e do pandas.
+    """
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, Timestamp):
+        return value.isoformat()
+    raise TypeError(f'Objeto do tipo {type(value).__name__} não é serializável em JSON.')
+
+
+class ForecastService:
+    """
+    Mantém em memória tudo o que uma previsão precisa: as classes do pipeline, os preços, o DataFrame
+    de alvos e features e o modelo treinado de cada configuração.
+
+    O modelo de cada configuração é treinado uma única vez (`warm`) com o mesmo pipeline de
+    `run_forecast_local`. O sinal do próximo dia (predição da última barra) é calculado sempre que os
+    dados mudam, portanto `forecast` apenas lê o estado. `refresh` busca as novas barras e atualiza os
+    alvos e as features de forma incremental (`update_frame`), sem retreinar o modelo, a menos que
+    `refit=True`. O estado de cada configuração é substituído por inteiro ao final da atualização, de
+    modo que requisições concorrentes nunca leem um estado parcial.
+
+    Atualizações concorrentes da mesma configuração são agrupadas: enquanto uma está em andamento, as
+    demais requisições com o mesmo nome (e o mesmo `refit`) aguardam e recebem o seu resultado, em vez de
+    buscar os preços e recalcular o estado novamente. Isso vale também para o primeiro treino disparado
+    por várias requisições de `forecast` simultâneas.
+
+    Attributes:
+        configs (Dict[str, MarketForecastConfig]): Configurações atendidas, por nome.
+        modules (dict): Classes do pipeline, carregadas uma única vez.
+        prices (Callable): Fonte de preços `prices(ticker) -> DataFrame` (por padrão `Prices.get` com
+            `refresh=True`, que sempre busca as barras novas).
+        state (dict): Estado de cada configuração (frame, modelo, sinal, métricas e datas).
+        max_workers (int): Número de threads usadas para atualizar várias configurações.
+    """
+    # Colunas de preço comparadas para detectar revisões do histórico (ex.: última barra incompleta)
+    PRICE_COLUMNS = ('Open', 'High', 'Low', 'Close')
+
+    def __init__(self, configs: Union[List[MarketForecastConfig], Dict[str, MarketForecastConfig]],
+                 prices: Union[Callable, None] = None, modules: Union[dict, None] = None,
+                 max_workers: int = 4, history: int = 1000):
+        """
+        :param configs: Configurações atendidas. Em uma lista, o nome de cada configuração é o seu ticker.
+        :param prices: Fonte de preços `prices(ticker) -> DataFrame`. Se None, usa `Prices.get(ticker, refresh=True)`,
+                       que ignora o `max_age` do armazenamento local e sempre busca as barras novas.
+        :param modules: Classes do pipeline já carregadas. Se None, usa os scripts locais
+                        (`MarketBehaviorForecasterLocal._load_modules`).
+        :param max_workers: Número de threads usadas para atualizar várias configurações.
+        :param history: Número de latências guardadas por endpoint para as métricas.
+        """
+        if not isinstance(configs, dict):
+            names = [config.ticker for config in configs]
+            if len(set(names)) != len(names):
+                raise ValueError("Tickers repetidos: informe as configurações em um dicionário {nome: configuração}.")
+            configs = dict(zip(names, configs))
+        if not configs:
+            raise ValueError("A lista de configurações não pode ser vazia.")
+
+        self.configs = dict(configs)
+        self.modules = modules or MarketBehaviorForecasterLocal(next(iter(self.configs.values())).ticker)._load_modules()
+        self.prices = prices or partial(self.modules['Prices'].get, refresh=True)
+        self.max_workers = max_workers
+        self.state = {}
+
+        self._locks = {name: threading.Lock() for name in self.configs}
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._latency = {}
+        self._history = history
+        self._counts = {'requests': 0, 'errors': 0, 'fits': 0, 'refreshes': 0, 'coalesced': 0, 'new_bars': 0}
+        self._started = time.time()
+
+    # -----------------------------------------------------------------------------------------
+
+    def _names(self, names: Union[List[str], None]) -> List[str]:
+        """
+        Valida os nomes pedidos (todas as configurações se None).
+        """
+        if names is None:
+            return list(self.configs)
+        unknown = [name for name in names if name not in self.configs]
+        if unknown:
+            raise KeyError(f"Configurações desconhecidas: {unknown}")
+        return list(names)
+
+    def _count(self, **increments):
+        with self._stats_lock:
+            for key, value in increments.items():
+                self._counts[key] += value
+
+    def _frame(self, config: MarketForecastConfig, prices: DataFrame) -> DataFrame:
+        """
+        Calcula os alvos e as features de todo o histórico de preços.
+        """
+        df = getattr(self.modules['Alvos'](prices, p=config.p), config.target_type)
+        return self.modules['Features'](df, copy=False).get(config.features)
+
+    def _signal(self, config: MarketForecastConfig, model, frame: DataFrame) -> dict:
+        """
+        Prediz o próximo dia a partir das features da última barra.
+        """
+        columns = [f'__{f}__' for f in config.features]
+        row = frame[columns].iloc[[-1]]
+        signal = {'date': frame.index[-1], 'signal': None, 'probabilities': None}
+        if row.isna().any(axis=None):
+            return signal
+
+        signal['signal'] = int(model.predict(row)[0])
+        if hasattr(model, 'predict_proba'):
+            signal['probabilities'] = {int(c): float(p) for c, p in zip(model.classes_, model.predict_proba(row)[0])}
+        return signal
+
+    def _fit(self, name: str, prices: DataFrame) -> dict:
+        """
+        Executa o pipeline completo de uma configuração e monta o seu estado.
+        """
+        config = self.configs[name]
+        result = config._pipeline(prices, self.modules)
+        frame = result['frame']
+        self._count(fits=1)
+        return {
+            'frame': frame,
+            'model': result['model'],
+            'signal': self._signal(config, result['model'], frame),
+            'metrics': {split: {k: v for k, v in values.items() if not isinstance(v, (list, dict))}
+                        for split, values in result['metrics']['model'].items()},
+            'fitted_at': time.time(),
+            'updated_at': time.time(),
+        }
+
+    def _refresh_one(self, name: str, refit: bool) -> dict:
+        """
+        Atualiza uma configuração, agrupando as requisições concorrentes com o mesmo nome e o mesmo `refit`.
+        """
+        key = (name, bool(refit))
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+
+        if not owner:
+            self._count(coalesced=1)
+            return future.result()
+
+        try:
+            summary = self._update(name, refit)
+            future.set_result(summary)
+            return summary
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                del self._inflight[key]
+
+    def _update(self, name: str, refit: bool) -> dict:
+        """
+        Atualiza uma configuração com as novas barras de preço.
+        """
+        config = self.configs[name]
+        with self._locks[name]:
+            prices = self.prices(config.ticker)
+            entry = self.state.get(name)
+            if entry is None or refit:
+                entry = self._fit(name, prices)
+                self.state[name] = entry
+                return {'new_bars': len(entry['frame']), 'refit': True}
+
+            frame = entry['frame']
+            last = frame.index[-1]
+            columns = [c for c in self.PRICE_COLUMNS if c in prices.columns]
+
+            # Se a última barra já conhecida foi revista, recalcula o histórico (as colunas são vetorizadas)
+            revised = last not in prices.index or not np.allclose(
+                prices.loc[last, columns].to_numpy(np.float64), frame.loc[last, columns].to_numpy(np.float64),
+                equal_nan=True)
+            new_bars = prices[prices.index > last]
+
+            if revised:
+                frame = self._frame(config, prices)
+            elif len(new_bars):
+                frame = config.update_frame(frame, new_bars, self.modules)
+            else:
+                entry['updated_at'] = time.time()
+                return {'new_bars': 0, 'refit': False}
+
+            self.state[name] = {**entry, 'frame': frame, 'signal': self._signal(config, entry['model'], frame),
+                                'updated_at': time.time()}
+            self._count(new_bars=len(new_bars))
+            return {'new_bars': len(new_bars), 'revised': bool(revised), 'refit': False}
+
+    # -----------------------------------------------------------------------------------------
+
+    def warm(self, names: Union[List[str], None] = None) -> dict:
+        """
+        Treina as configurações que ainda não estão em memória.
+
+        :param names: Nomes das configurações. Se None, todas.
+        :return: Dicionário {nome: resumo da atualização}.
+        """
+        return self.refresh([name for name in self._names(names) if name not in self.state])
+
+    def refresh(self, names: Union[List[str], None] = None, refit: bool = False) -> dict:
+        """
+        Busca novas barras de preço e atualiza alvos, features e sinais, em paralelo entre as configurações.
+
+        :param names: Nomes das configurações. Se None, todas.
+        :param refit: Se True, executa novamente o pipeline completo e retreina os modelos.
+        :return: Dicionário {nome: resumo da atualização} (com "error" quando a atualização falhou).
+        """
+        names = self._names(names)
+        self._count(refreshes=len(names))
+
+        def run(name):
+            try:
+                return name, self._refresh_one(name, refit)
+            except Exception as e:
+                self._count(errors=1)
+                return name, {'error': f'{type(e).__name__}: {e}'}
+
+        if len(names) <= 1:
+            return dict(map(run, names))
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(names))) as executor:
+            return dict(executor.map(run, names))
+
+    def forecast(self, names: Union[List[str], None] = None) -> dict:
+        """
+        Retorna o sinal do próximo dia de cada configuração, a partir do estado em memória.
+
+        As configurações que ainda não estão em memória são treinadas antes (uma única vez).
+
+        :param names: Nomes das configurações. Se None, todas.
+        :return: Dicionário {nome: {"date", "signal", "probabilities", "updated_at"}}.
+        """
+        names = self._names(names)
+        missing = [name for name in names if name not in self.state]
+        if missing:
+            self.warm(missing)
+
+        signals = {}
+        for name in names:
+            entry = self.state.get(name)
+            signals[name] = {'error': 'Configuração não carregada.'} if entry is None else {
+                **entry['signal'], 'updated_at': entry['updated_at']}
+        return signals
+
+    def metrics(self) -> dict:
+        """
+        Retorna contadores, latências por endpoint (ms) e o estado de cada configuração.
+        """
+        with self._stats_lock:
+            latency = {}
+            for endpoint, values in self._latency.items():
+                values = np.asarray(values)
+                latency[endpoint] = {'count': len(values), 'p50_ms': float(np.percentile(values, 50)),
+                                     'p95_ms': float(np.percentile(values, 95)), 'max_ms': float(values.max())}
+            counts = dict(self._counts)
+
+        configs = {}
+        for name, config in self.configs.items():
+            entry = self.state.get(name)
+            configs[name] = {'ticker': config.ticker, 'features': config.features, 'ml_model': config.ml_model,
+                             'loaded': entry is not None}
+            if entry is not None:
+                configs[name].update({'rows': len(entry['frame']), 'last_date': entry['frame'].index[-1],
+                                      'fitted_at': entry['fitted_at'], 'updated_at': entry['updated_at'],
+                                      'model': entry['metrics']})
+
+        return {'uptime_s': time.time() - self._started, 'counts': counts, 'latency': latency, 'configs': configs}
+
+    def record(self, endpoint: str, elapsed_ms: float, error: bool = False):
+        """
+        Registra a latência de uma requisição atendida.
+        """
+        with self._stats_lock:
+            self._latency.setdefault(endpoint, deque(maxlen=self._history)).append(elapsed_ms)
+            self._counts['requests'] += 1
+            self._counts['errors'] += int(error)
+
+    # -----------------------------------------------------------------------------------------
+
+    def handler(self) -> type:
+        """
+        Cria a classe de tratamento das requisições HTTP ligada a este serviço.
+        """
+        service = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status: int, payload: dict):
+                body = json.dumps(payload, default=_json_default).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _body(self) -> dict:
+                length = int(self.headers.get('Content-Length') or 0)
+                return json.loads(self.rfile.read(length) or b'{}') if length else {}
+
+            def _dispatch(self, method: str):
+                start = time.perf_counter()
+                url = urlparse(self.path)
+                endpoint = url.path.rstrip('/') or '/'
+                status = 200
+                try:
+                    query = parse_qs(url.query)
+                    body = self._body() if method == 'POST' else {}
+                    names = body.get('names', query.get('name'))
+
+                    if endpoint == '/forecast':
+                        payload = {'signals': service.forecast(names)}
+                    elif endpoint == '/refresh' and method == 'POST':
+                        payload = {'refreshed': service.refresh(names, refit=bool(body.get('refit', False)))}
+                    elif endpoint == '/metrics' and method == 'GET':
+                        payload = service.metrics()
+                    else:
+                        status, payload = 404, {'error': f'Endpoint desconhecido: {method} {url.path}'}
+                        endpoint = 'other'
+                except KeyError as e:
+                    status, payload = 404, {'error': str(e.args[0] if e.args else e)}
+                except (ValueError, TypeError) as e:
+                    status, payload = 400, {'error': str(e)}
+                except Exception as e:
+                    status, payload = 500, {'error': f'{type(e).__name__}: {e}'}
+
+                self._send(status, payload)
+                service.record(endpoint, (time.perf_counter() - start) * 1e3, error=status >= 400)
+
+            def do_GET(self):
+                self._dispatch('GET')
+
+            def do_POST(self):
+                self._dispatch('POST')
+
+        return Handler
+
+    def serve(self, host: str = '127.0.0.1', port: int = 8765, background: bool = False) -> ThreadingHTTPServer:
+        """
+        Inicia o servidor HTTP (uma thread por requisição).
+
+        :param host: Endereço do servidor. Por padrão, apenas a máquina local.
+        :param port: Porta do servidor (0 escolhe uma porta livre, disponível em `server.server_port`).
+        :param background: Se True, atende em uma thread separada e retorna imediatamente; caso contrário,
+                           bloqueia até `server.shutdown()`.
+        :return: O servidor.
+        """
+        server = ThreadingHTTPServer((host, port), self.handler())
+        server.daemon_threads = True
+        if background:
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+        else:
+            server.serve_forever()
+        return server
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('tickers', nargs='+')
+    parser.add_argument('--features', type=int, nargs='+', default=[1, 2])
+    parser.add_argument('--start', required=True)
+    parser.add_argument('--end', required=True)
+    parser.add_argument('--ml-model', default='train_decision_tree')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+
+    service = ForecastService([MarketForecastConfig(ticker, features=args.features, start=args.start, end=args.end,
+                                                    ml_model=args.ml_model) for ticker in args.tickers])
+    service.warm()
+    print(f'Servindo em http://{args.host}:{args.port}')
+    service.serve(args.host, args.port)
@@ -0,0 +1,934 @@
+"""
+Testes dos scripts do pipeline, sem acesso à rede.
+
+Uso:
+    python -m unittest test -v
+"""
+import os
+import sys
+import json
+import tempfile
+import threading
+import time
+import tracemalloc
+import unittest
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Scripts'))
+
+from alvos import Alvos  # noqa: E402
+from features import Features, rolling_moments, rolling_quantiles  # noqa: E402
+from graphs import Graphs  # noqa: E402
+from machines import Machines, confusion_metrics  # noqa: E402
+from result_predict import PeriodAggregator, ResultPredict  # noqa: E402
+from split_data import SplitData  # noqa: E402
+from synthetic import Synthetic  # noqa: E402
+
+import api  # noqa: E402
+from api import (GitHubScriptLoader, MarketBatchForecaster, MarketBehaviorForecasterLocal,  # noqa: E402
+                 MarketForecastConfig, MarketSyntheticForecaster, ModelRegistry, StageCache)
+from service import ForecastService  # noqa: E402
+
+try:
+    from prices import PriceStore, Prices  # noqa: E402
+except ImportError:  # yfinance e MetaTrader5 não instalados
+    PriceStore = Prices = None
+
+
+def prices_frame(rows: int = 300, seed: int = 0, start: str = '2020-01-01') -> pd.DataFrame:
+    """
+    Gera preços OHLCV sintéticos em dias úteis.
+    """
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, rows)))
+    open_ = close * np.exp(rng.normal(0, 0.005, rows))
+    high = np.maximum(open_, close) * np.exp(np.abs(rng.normal(0, 0.005, rows)))
+    low = np.minimum(open_, close) * np.exp(-np.abs(rng.normal(0, 0.005, rows)))
+    return pd.DataFrame({'Open': open_, 'High': high, 'Low': low, 'Close': close, 'Adj Close': close,
+                         'Volume': rng.integers(1_000, 10_000, rows).astype(float)},
+                        index=pd.bdate_range(start, periods=rows))
+
+
+class TestAlvos(unittest.TestCase):
+
+    def test_update_equals_full_recompute(self):
+        prices = prices_frame(310)
+        old, new = prices.iloc[:300], prices.iloc[300:]
+        for p in (1, 3):
+            for target_type in Alvos.TARGET_TYPES:
+                with self.subTest(p=p, target_type=target_type):
+                    previous = getattr(Alvos(old, p), target_type)
+                    updated = Alvos.update(previous, new, p, target_type)
+                    full = getattr(Alvos(prices, p, limits=previous.attrs.get('limites')), target_type)
+                    pd.testing.assert_frame_equal(updated, full, check_dtype=False)
+
+    def test_update_keeps_history_limits(self):
+        prices = prices_frame(310)
+        previous = Alvos(prices.iloc[:300], 1).D_QUINARIO
+        updated = Alvos.update(previous, prices.iloc[300:], 1, 'D_QUINARIO')
+        self.assertEqual(updated.attrs['limites'], previous.attrs['limites'])
+
+        # Sem os limites registrados, eles são recalculados sobre o histórico anterior
+        previous.attrs.clear()
+        fallback = Alvos.update(previous, prices.iloc[300:], 1, 'D_QUINARIO')
+        pd.testing.assert_series_equal(fallback['alvo_quinario'], updated['alvo_quinario'])
+
+
+def machines_splits(rows: int = 600, seed: int = 0):
+    """
+    Divide um DataFrame com duas features e um alvo binário em treino, teste e pós-teste.
+    """
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({'__1__': rng.normal(size=rows), '__2__': rng.normal(size=rows)},
+                      index=pd.bdate_range('2020-01-01', periods=rows))
+    df['alvo_binario'] = (df['__1__'] + rng.normal(0, 0.5, rows) > 0).astype(int)
+    third = rows // 3
+    return df.iloc[:third], df.iloc[third:2 * third], df.iloc[2 * third:]
+
+
+class TestMachines(unittest.TestCase):
+
+    def test_confusion_metrics_match_sklearn(self):
+        from sklearn import metrics
+
+        rng = np.random.default_rng(0)
+        for n_classes in (2, 3, 5):
+            y_true = rng.integers(0, n_classes, 500)
+            # Predições que nunca usam a última classe (precisão indefinida) e acertam parte dos alvos
+            y_pred = np.where(rng.random(500) < 0.4, y_true, rng.integers(0, n_classes - 1, 500))
+            average = 'binary' if n_classes == 2 else 'macro'
+            with self.subTest(n_classes=n_classes):
+                result = confusion_metrics(y_true, y_pred, n_classes)
+                self.assertAlmostEqual(result['accuracy'], metrics.accuracy_score(y_true, y_pred))
+                self.assertAlmostEqual(result['precision'], metrics.precision_score(
+                    y_true, y_pred, average=average, zero_division=0))
+                self.assertAlmostEqual(result['recall'], metrics.recall_score(y_true, y_pred, average=average))
+                self.assertAlmostEqual(result['f1_score'], metrics.f1_score(
+                    y_true, y_pred, average=average, zero_division=0))
+                self.assertAlmostEqual(result['balanced_accuracy'], metrics.balanced_accuracy_score(y_true, y_pred))
+                self.assertAlmostEqual(result['mcc'], metrics.matthews_corrcoef(y_true, y_pred))
+
+                many = confusion_metrics(y_true, np.stack([y_pred, y_true]), n_classes)
+                self.assertEqual(many[0], result)
+                self.assertEqual(many[1]['precision'], 1.0)
+
+    def test_class_count_comes_from_the_target_scheme(self):
+        df = Features(Alvos(prices_frame(600), 1).D_QUINARIO).get([1, 2]).iloc[5:-1]
+        # Treino sem a maior classe, que aparece no teste e no pós-teste
+        train = df.iloc[:200][df['alvo_quinario'].iloc[:200] < 4].copy()
+        test, after_test = df.iloc[200:400].copy(), df.iloc[400:].copy()
+        self.assertEqual(train.attrs['limites'], df.attrs['limites'])
+
+        without_limits = [frame.copy() for frame in (train, test, after_test)]
+        for frame in without_limits:
+            frame.attrs.clear()
+        for splits, n_classes in [((train, test, after_test), None), (without_limits, None),
+                                  (without_limits, Alvos.CLASSES['quinario'])]:
+            with self.subTest(limits=bool(splits[0].attrs), n_classes=n_classes):
+                ml = Machines(*splits, [1, 2], n_classes=n_classes)
+                self.assertEqual(ml.n_classes, 5)
+                model = ml.train_decision_tree()
+                for predict in (ml.predict_train, ml.predict_test, ml.predict_after_test):
+                    predict(model)
+                metrics = ml.evaluate()
+                self.assertEqual(np.shape(metrics['test']['confusion_matrix']), (5, 5))
+                self.assertEqual(np.sum(metrics['test']['confusion_matrix'], axis=1)[4],
+                                 (test['alvo_quinario'] == 4).sum())
+
+    def test_memory_tracing_is_opt_in(self):
+        ml = Machines(*machines_splits(), [1, 2])
+        ml.predict_test(ml.train_decision_tree())
+        self.assertIn('fit_time_ms', ml.profile['train'])
+        self.assertNotIn('fit_peak_memory_bytes', ml.profile['train'])
+        self.assertNotIn('predict_peak_memory_bytes', ml.profile['test'])
+        self.assertFalse(tracemalloc.is_tracing())
+
+    def test_memory_tracing_across_threads(self):
+        def fit(seed):
+            ml = Machines(*machines_splits(seed=seed), [1, 2], trace_memory=True)
+            ml.predict_test(ml.train_random_forest(n_estimators=10))
+            return ml.profile
+
+        with ThreadPoolExecutor(4) as pool:
+            profiles = list(pool.map(fit, range(8)))
+        for profile in profiles:
+            self.assertGreater(profile['train']['fit_peak_memory_bytes'], 0)
+            self.assertGreaterEqual(profile['test']['predict_peak_memory_bytes'], 0)
+        self.assertFalse(tracemalloc.is_tracing())
+
+
+class StubFetcher:
+    """
+    Fonte de preços em memória, no formato `fetcher(ticker, start=None)`, que registra as chamadas.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        self.calls = []
+
+    def __call__(self, ticker: str, start=None) -> pd.DataFrame:
+        self.calls.append((ticker, start))
+        return self.df if start is None else self.df[self.df.index >= start]
+
+
+@unittest.skipIf(PriceStore is None, 'requer yfinance e MetaTrader5')
+class TestPriceStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.prices = prices_frame(120)
+        self.fetcher = StubFetcher(self.prices.iloc[:100])
+        self.store = PriceStore(self.tmp.name, fetcher=self.fetcher)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_refresh_modes(self):
+        pd.testing.assert_frame_equal(self.store.get('X'), self.prices.iloc[:100], check_freq=False)
+        self.assertEqual(self.fetcher.calls, [('X', None)])
+
+        # Novas barras: None respeita o max_age, False nunca busca, True sempre busca o trecho final
+        self.fetcher.df = self.prices
+        self.assertEqual(len(self.store.get('X')), 100)
+        self.assertEqual(len(self.store.get('X', refresh=False)), 100)
+        self.assertEqual(len(self.fetcher.calls), 1)
+
+        df = self.store.get('X', refresh=True)
+        self.assertEqual(self.fetcher.calls[-1], ('X', self.prices.index[99]))
+        pd.testing.assert_frame_equal(df, self.prices, check_freq=False)
+        pd.testing.assert_frame_equal(self.store.read('X'), self.prices, check_freq=False)
+
+    def test_expired_file_fetches_tail(self):
+        self.store.get('X')
+        self.store.max_age = 0
+        self.fetcher.df = self.prices
+        pd.testing.assert_frame_equal(self.store.get('X'), self.prices, check_freq=False)
+        self.assertEqual(self.fetcher.calls[-1], ('X', self.prices.index[99]))
+
+    def test_adjusted_history_is_downloaded_again(self):
+        self.store.get('X')
+        adjusted = self.prices.copy()
+        adjusted['Adj Close'] *= 0.98
+        self.fetcher.df = adjusted
+
+        pd.testing.assert_frame_equal(self.store.get('X', refresh=True), adjusted, check_freq=False)
+        self.assertEqual(self.fetcher.calls[-2:], [('X', self.prices.index[99]), ('X', None)])
+
+
+class TestResultPredict(unittest.TestCase):
+
+    def test_evaluate_matches_resample_on_intraday_data(self):
+        rng = np.random.default_rng(0)
+        index = pd.date_range('2021-01-04 10:00', periods=24 * 400, freq='h')
+        frames = [pd.DataFrame({'alvo_binario': 1, 'resultado_predicao': rng.normal(0, 10, len(part))}, index=part)
+                  for part in (index[:5000], index[5000:8000], index[8000:])]
+        frames[1].iloc[::7, 0] = np.nan
+
+        metrics = ResultPredict(*frames).evaluate()
+        for split, df in zip(('train', 'test', 'after_test'), frames):
+            with self.subTest(split=split):
+                values = df['resultado_predicao']
+                self.assertAlmostEqual(metrics[split]['average_daily_returns'], values.mean(), places=9)
+                self.assertAlmostEqual(metrics[split]['average_weekly_returns'],
+                                       values.resample('W').mean().mean(), places=9)
+                self.assertAlmostEqual(metrics[split]['average_monthly_returns'],
+                                       values.resample('ME').mean().mean(), places=9)
+                self.assertAlmostEqual(metrics[split]['average_quarterly_return'],
+                                       values.resample('QE').mean().mean(), places=9)
+                self.assertEqual(list(metrics[split]), ['average_daily_returns', 'average_weekly_returns',
+                                                        'average_monthly_returns', 'average_quarterly_return'])
+                self.assertAlmostEqual(ResultPredict(*frames).evaluate_periods().loc[(split, 'day'), 'mean'],
+                                       values.resample('D').mean().mean(), places=9)
+
+    @staticmethod
+    def legacy_result(df: pd.DataFrame, lotes: int) -> pd.DataFrame:
+        """
+        Resultado de uma estratégia calculado como no `ResultPredict` original (uma coluna por vez, no pandas).
+        """
+        df = df.copy()
+        df['resultado_predicao'] = df['variacao_absoluta'].abs() * (
+            2 * (df['predicao'] == df.filter(like='alvo').squeeze()) - 1
+        )
+        if lotes != 0:
+            df['resultado_predicao'] *= lotes
+        df['resultado_predicao_acumulado'] = df['resultado_predicao'].cumsum()
+        return df
+
+    def test_pnl_matrix_matches_single_strategy_results(self):
+        rng = np.random.default_rng(1)
+        index = pd.bdate_range('2020-01-01', periods=300)
+        variation = rng.normal(0, 1, 300)
+        variation[[5, 120, -1]] = np.nan
+        df = pd.DataFrame({'variacao_absoluta': variation, 'alvo_binario': (variation > 0).astype(int)}, index=index)
+        predictions = rng.integers(0, 2, (6, 300))
+        splits = (df.iloc[:100], df.iloc[100:200], df.iloc[200:])
+
+        for lotes in (1, 100, 0):
+            with self.subTest(lotes=lotes):
+                matrix = ResultPredict(*splits, lotes=lotes).score_strategies(predictions[:, 100:200], 'test')
+                for i, strategy in enumerate(predictions[:, 100:200]):
+                    legacy = self.legacy_result(splits[1].assign(predicao=strategy), lotes)
+                    valid = legacy['resultado_predicao'].notna().to_numpy()
+                    cumulative = legacy['resultado_predicao_acumulado'].ffill().fillna(0).to_numpy()
+                    drawdown = cumulative - np.maximum(np.maximum.accumulate(cumulative), 0)
+
+                    np.testing.assert_allclose(matrix['daily'][i], legacy['resultado_predicao'], equal_nan=True)
+                    np.testing.assert_allclose(matrix['equity'][i][valid], cumulative[valid])
+                    np.testing.assert_allclose(matrix['drawdown'][i], drawdown)
+                    self.assertAlmostEqual(matrix['summary']['total'][i], legacy['resultado_predicao'].sum())
+                    self.assertAlmostEqual(matrix['summary']['max_drawdown'][i], drawdown.min())
+
+                # O caminho de uma estratégia do `ResultPredict` também coincide com o original
+                current = ResultPredict(*[split.assign(predicao=predictions[0, :len(split)]) for split in splits],
+                                        lotes=lotes).calcula_test_day()
+                legacy = self.legacy_result(splits[1].assign(predicao=predictions[0, :100]), lotes)
+                pd.testing.assert_frame_equal(current, legacy)
+
+    def test_period_cache_across_threads(self):
+        indexes = [pd.bdate_range('2020-01-01', periods=50 + i) for i in range(40)]
+        expected = [PeriodAggregator(index).aggregate(np.arange(len(index), dtype=float)) for index in indexes]
+
+        def aggregate(i):
+            index = indexes[i % len(indexes)]
+            return PeriodAggregator(index).aggregate(np.arange(len(index), dtype=float))
+
+        PeriodAggregator._cache.clear()
+        with mock.patch.object(PeriodAggregator, 'CACHE_SIZE', 4):
+            with ThreadPoolExecutor(8) as pool:
+                results = list(pool.map(aggregate, range(800)))
+            self.assertLessEqual(len(PeriodAggregator._cache), 4)
+        for i, result in enumerate(results):
+            pd.testing.assert_frame_equal(result, expected[i % len(indexes)])
+
+
+class TestRollingKernels(unittest.TestCase):
+
+    def series(self):
+        prices = prices_frame(5000, seed=3)
+        returns = prices['Close'].pct_change().to_numpy()
+        returns[[100, 2000, 2001]] = np.nan
+        return {'returns': returns, 'prices': prices['Close'].to_numpy(),
+                'level': 1e5 + prices['Close'].to_numpy(), 'panel': prices[['Open', 'Close']].to_numpy()}
+
+    def test_moments_within_stated_tolerance(self):
+        for name, values in self.series().items():
+            for window in (2, 5, 6, 20):
+                with self.subTest(series=name, window=window):
+                    moments = rolling_moments(values, window)
+                    rolling = pd.DataFrame(values).rolling(window)
+                    scale = pd.DataFrame(np.abs(values)).rolling(window)
+
+                    for stat in ('sum', 'mean'):
+                        expected = getattr(rolling, stat)().to_numpy().reshape(values.shape)
+                        tolerance = 1e-12 * scale.sum().to_numpy().reshape(values.shape)
+                        np.testing.assert_array_equal(np.isnan(moments[stat]), np.isnan(expected))
+                        self.assertTrue((np.abs(moments[stat] - expected) <= tolerance).all(where=~np.isnan(expected)))
+
+                    # Desvio padrão de cada janela isoladamente e diferença em relação ao pandas
+                    exact = np.full(values.shape, np.nan)
+                    exact[window - 1:] = np.lib.stride_tricks.sliding_window_view(values, window, axis=0).std(
+                        axis=-1, ddof=1)
+                    np.testing.assert_allclose(moments['std'], exact, rtol=1e-12, atol=1e-300, equal_nan=True)
+                    expected = rolling.std().to_numpy().reshape(values.shape)
+                    tolerance = 1e-6 * scale.max().to_numpy().reshape(values.shape)
+                    self.assertTrue((np.abs(moments['std'] - expected) <= tolerance).all(where=~np.isnan(expected)))
+
+    def test_quantiles_match_pandas(self):
+        for name, values in self.series().items():
+            for window in (5, 6):
+                with self.subTest(series=name, window=window):
+                    quantiles = rolling_quantiles(values, window, [0.1, 0.5, 0.75])
+                    for q, result in quantiles.items():
+                        expected = pd.DataFrame(values).rolling(window).quantile(q).to_numpy().reshape(values.shape)
+                        np.testing.assert_array_equal(result, expected)
+
+
+class TestFeatures(unittest.TestCase):
+
+    @staticmethod
+    def pandas_feature_3(df: pd.DataFrame) -> pd.Series:
+        """
+        `__3__` calculada apenas com o `rolling` do pandas, como antes do grafo de nós e dos kernels.
+        """
+        W = lambda x, window_size=5: x.rolling(window_size).sum()
+        S = lambda x, window_size=5: x.rolling(window_size).std() / x.rolling(window_size).mean()
+        J = lambda x, window_size=5, quantile=0.5: x.rolling(window_size).quantile(quantile)
+        U = lambda x: x.diff().diff()
+        adj_close, low, high = (df[c].pct_change(1) for c in ('Adj Close', 'Low', 'High'))
+        q = W(S(J(low, 6, 0.10) - J(high, 6, 0.10), 6), 6)
+        return (W(q, 4) / J(U(adj_close), 5, 0.75)) ** 2
+
+    def test_moments_match_pandas_by_default(self):
+        prices = prices_frame(3000, seed=4)
+        expected = self.pandas_feature_3(prices)
+        np.testing.assert_array_equal(Features(prices).get([3])['__3__'].to_numpy(), expected.to_numpy())
+
+        panel = {c: pd.concat({'a': prices[c], 'b': prices[c]}, axis=1) for c in ('Adj Close', 'Low', 'High')}
+        np.testing.assert_array_equal(Features.panel(panel, [3])[3]['a'].to_numpy(), expected.to_numpy())
+
+        # Kernels NumPy: apenas sob demanda, com diferenças de arredondamento
+        with mock.patch.object(Features, 'NUMPY_MOMENTS', True):
+            fast = Features(prices).get([3])['__3__']
+        np.testing.assert_allclose(fast, expected, rtol=1e-6, equal_nan=True)
+
+    def test_update_equals_full_recompute(self):
+        prices = prices_frame(320)
+        F = sorted(Features.registry())
+        full = Features(prices).get(F)
+        for start in (1, 19, 300, 319):
+            with self.subTest(start=start):
+                df = full.iloc[:start].reindex(prices.index)
+                df[prices.columns] = prices
+                updated = Features.update(df, F, start)
+                pd.testing.assert_frame_equal(updated, full)
+
+    def test_update_frame_equals_full_recompute(self):
+        prices = prices_frame(320)
+        old, new = prices.iloc[:300], prices.iloc[300:]
+        for target_type in Alvos.TARGET_TYPES:
+            with self.subTest(target_type=target_type):
+                config = MarketForecastConfig('AAA', p=2, target_type=target_type, features=[1, 2, 3])
+                previous = Features(getattr(Alvos(old, config.p), target_type)).get(config.features)
+                updated = config.update_frame(previous, new, modules=MODULES)
+                targets = getattr(Alvos(prices, config.p, limits=previous.attrs.get('limites')), target_type)
+                expected = Features(targets).get(config.features)
+                pd.testing.assert_frame_equal(updated, expected, check_dtype=False)
+
+
+class TestSplitData(unittest.TestCase):
+
+    def frame(self, p: int = 3) -> pd.DataFrame:
+        return Features(Alvos(prices_frame(300), p).A_BINARIO, copy=False).get([1, 3])
+
+    def test_walk_forward_fold_boundaries(self):
+        df = self.frame()
+        sd = SplitData(df, copy=False)
+        folds = list(sd.walk_forward(100, 20, positions=True))
+
+        first_valid = int(df.notna().all(axis=1).to_numpy().argmax())
+        self.assertEqual(folds[0][0][0], first_valid)
+        for (train, test, after), following in zip(folds, folds[1:] + [None]):
+            self.assertEqual((len(train), len(test)), (100, 20))
+            self.assertEqual(train[-1] + 1, test[0])
+            self.assertEqual(after[0], test[-1] + 1)
+            self.assertEqual(after[-1], len(df) - 1)
+            if following is not None:
+                self.assertEqual(following[0][0], train[0] + 20)
+
+    def test_walk_forward_excludes_unknown_targets(self):
+        for p in (1, 3):
+            df = self.frame(p)
+            sd = SplitData(df, copy=False)
+            # 300 linhas - 19 de aquecimento - p sem alvo: com step=1 a última janela termina no último alvo
+            folds = list(sd.walk_forward(100, 20, step=1))
+            train, test, _ = folds[-1]
+            self.assertEqual(test.index[-1], df.index[-p - 1])
+            for train, test, _ in folds:
+                self.assertTrue(test['variacao_absoluta'].notna().all())
+                self.assertTrue(train['variacao_absoluta'].notna().all())
+
+        # Alvos de `Alvos.build`: -1 onde o alvo ainda não é conhecido
+        prices = prices_frame(300)
+        built = prices.join(Alvos.build(prices, [2], schemes=('binario',)))
+        _, test, _ = list(SplitData(built, copy=False).walk_forward(100, 20, step=1))[-1]
+        self.assertEqual(test.index[-1], built.index[-3])
+
+    def test_walk_forward_drops_interior_gaps(self):
+        df = self.frame()
+        gaps = [60, 130, 131]
+        df.iloc[gaps[:1], df.columns.get_loc('Volume')] = np.nan
+        df.iloc[gaps[1:], df.columns.get_loc('__1__')] = np.nan
+        sd = SplitData(df, copy=False)
+
+        folds = list(sd.walk_forward(100, 20))
+        positions = list(sd.walk_forward(100, 20, positions=True))
+        for (train, test, after), (train_rows, test_rows, after_rows) in zip(folds, positions):
+            for fold, rows in ((train, train_rows), (test, test_rows)):
+                self.assertTrue(fold.notna().all(axis=None))
+                self.assertFalse(set(rows) & set(gaps))
+                pd.testing.assert_frame_equal(fold, df.iloc[rows])
+            pd.testing.assert_frame_equal(after, df.iloc[after_rows])
+
+        # Janela com lacunas: treino com menos linhas, e o Machines ajusta o modelo normalmente
+        train, test, after = folds[0]
+        self.assertEqual(len(train), 100 - 1)
+        ml = Machines(train.copy(), test.copy(), after.iloc[:-3].dropna(), [1, 3])
+        ml.predict_test(ml.train_decision_tree())
+
+
+class TestGraphs(unittest.TestCase):
+
+    def test_serial_render_batch(self):
+        import matplotlib
+        import matplotlib.pyplot as plt
+
+        df = prices_frame(200)
+        df['resultado_predicao'] = df['Close'].diff()
+        backend = matplotlib.get_backend()
+        plt.switch_backend('svg')
+        try:
+            with tempfile.TemporaryDirectory() as path:
+                jobs = [dict(kind='linha', df=df, column='Close', path=os.path.join(path, 'linha.png')),
+                        dict(kind='hisplot', df=df, column='resultado_predicao', path=os.path.join(path, 'h.png'),
+                             options={'bins': 20}),
+                        dict(kind='nope', df=df, column=None, path=os.path.join(path, 'x.png'))]
+                result = Graphs.render_batch(jobs, max_workers=1, preview=True)
+                self.assertEqual(result['paths'][:2], [job['path'] for job in jobs[:2]])
+                self.assertTrue(all(os.path.getsize(p) > 0 for p in result['paths'][:2]))
+                self.assertEqual(list(result['errors']), [2])
+            self.assertEqual(plt.get_fignums(), [])
+            self.assertEqual(matplotlib.get_backend(), 'svg')
+        finally:
+            plt.switch_backend(backend)
+
+
+class TestSynthetic(unittest.TestCase):
+
+    def test_paths_do_not_depend_on_layout(self):
+        prices = prices_frame(300)
+        for method in Synthetic.METHODS:
+            with self.subTest(method=method):
+                synthetic = Synthetic(prices, method, n_steps=100, seed=7)
+                paths = synthetic.paths(10)
+                self.assertEqual(paths.shape, (10, 100, 5))
+                np.testing.assert_array_equal(np.concatenate([synthetic.paths(3), synthetic.paths(7, 3)]), paths)
+                batches = [batch for _, batch in synthetic.iter_paths(10, batch_size=4)]
+                np.testing.assert_array_equal(np.concatenate(batches), paths)
+                np.testing.assert_array_equal(synthetic.paths(1, 9)[0], paths[9])
+
+                # A trajetória i usa o i-ésimo filho de SeedSequence(seed)
+                child = np.random.SeedSequence(7).spawn(10)[9]
+                indices = synthetic._indices(np.random.default_rng(child), 1)[0]
+                np.testing.assert_array_equal(paths[9, :, 4], synthetic.volume[indices])
+
+    def test_frame_has_consistent_bars_and_volume(self):
+        prices = prices_frame(300)
+        synthetic = Synthetic(prices, 'bootstrap', seed=1)
+        df = synthetic.frame(synthetic.paths(1)[0])
+        self.assertEqual(list(df.columns), ['Open', 'High', 'Low', 'Close', 'Volume', 'Adj Close'])
+        self.assertTrue((df['High'] >= df[['Open', 'Close']].max(axis=1) - 1e-9).all())
+        self.assertTrue((df['Low'] <= df[['Open', 'Close']].min(axis=1) + 1e-9).all())
+        self.assertTrue(df['Volume'].isin(prices['Volume']).all())
+
+        without_volume = Synthetic(prices.drop(columns='Volume'), 'bootstrap', seed=1)
+        self.assertEqual(without_volume.paths(2).shape, (2, 299, 4))
+        np.testing.assert_array_equal(without_volume.paths(2), synthetic.paths(2)[..., :4])
+
+
+@unittest.skipIf(Prices is None, 'requer yfinance e MetaTrader5')
+class TestGetMany(unittest.TestCase):
+
+    def setUp(self):
+        self.prices = {ticker: prices_frame(50, seed=i) for i, ticker in enumerate(['A', 'B', 'C', 'D'])}
+        self.attempts = {}
+        self.lock = threading.Lock()
+
+    def flaky(self, ticker: str, start=None) -> pd.DataFrame:
+        """
+        Falha sempre em 'D' e na primeira tentativa de 'B'.
+        """
+        with self.lock:
+            self.attempts[ticker] = self.attempts.get(ticker, 0) + 1
+            attempt = self.attempts[ticker]
+        if ticker == 'D' or (ticker == 'B' and attempt == 1):
+            raise ConnectionError(f'{ticker}: falha {attempt}')
+        return self.prices[ticker]
+
+    def test_retries_and_errors(self):
+        results, errors = Prices.get_many(['A', 'B', 'C', 'D', 'A'], retries=2, backoff=0, fetcher=self.flaky,
+                                          progress=False, return_errors=True)
+        self.assertEqual(list(results), ['A', 'B', 'C'])
+        self.assertEqual(list(errors), ['D'])
+        self.assertIsInstance(errors['D'], ConnectionError)
+        self.assertEqual(self.attempts, {'A': 1, 'B': 2, 'C': 1, 'D': 3})
+
+        wide = Prices.get_many(['A', 'C'], fetcher=self.flaky, wide='Close', progress=False)
+        self.assertEqual(list(wide.columns), ['A', 'C'])
+        pd.testing.assert_series_equal(wide['C'], self.prices['C']['Close'], check_names=False, check_freq=False)
+
+        # Todos os tickers falham: DataFrame largo vazio, com os erros de cada ticker
+        wide, errors = Prices.get_many(['D', 'D'], retries=0, fetcher=self.flaky, wide=True, progress=False,
+                                       return_errors=True)
+        self.assertTrue(wide.empty)
+        self.assertEqual(list(errors), ['D'])
+
+    def test_concurrent_calls_keep_their_errors(self):
+        def run(tickers):
+            return Prices.get_many(tickers, retries=0, fetcher=self.flaky, progress=False, return_errors=True)[1]
+
+        with ThreadPoolExecutor(2) as pool:
+            first, second = pool.map(run, [['A', 'D'], ['C']])
+        self.assertEqual((list(first), second), (['D'], {}))
+
+    def test_store_fetcher_signature(self):
+        # O mesmo fetcher serve ao PriceStore e ao get_many
+        fetcher = StubFetcher(self.prices['A'])
+        with tempfile.TemporaryDirectory() as path:
+            stored = PriceStore(path, fetcher=fetcher).get('A')
+        pd.testing.assert_frame_equal(Prices.get_many(['A'], fetcher=fetcher, progress=False)['A'], stored,
+                                      check_freq=False)
+        self.assertEqual(fetcher.calls, [('A', None), ('A', None)])
+
+
+# Classes do pipeline sem `Prices`: os testes informam a fonte de preços
+MODULES = {'Alvos': Alvos, 'Features': Features, 'SplitData': SplitData, 'Machines': Machines,
+           'ResultPredict': ResultPredict, 'Graphs': Graphs, 'Synthetic': Synthetic}
+
+
+class StubSource:
+    """
+    Fonte de preços `prices(ticker)` que expõe as primeiras `rows` barras e conta as chamadas.
+    """
+
+    def __init__(self, df: pd.DataFrame, rows: int, delay: float = 0.0):
+        self.df = df
+        self.rows = rows
+        self.delay = delay
+        self.calls = 0
+
+    def __call__(self, ticker: str) -> pd.DataFrame:
+        self.calls += 1
+        time.sleep(self.delay)
+        return self.df.iloc[:self.rows].copy()
+
+
+class TestForecastService(unittest.TestCase):
+
+    def setUp(self):
+        self.source = StubSource(prices_frame(700), 690)
+        self.config = MarketForecastConfig('AAA', features=[1, 2], start='2020-01-01', end='2021-06-01')
+        self.service = ForecastService([self.config], prices=self.source, modules=MODULES)
+
+    def request(self, path: str, body: dict = None):
+        data = None if body is None else json.dumps(body).encode()
+        try:
+            with urllib.request.urlopen(urllib.request.Request(self.base + path, data=data)) as response:
+                return response.status, json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            return e.code, json.loads(e.read())
+
+    def assert_state_matches_full_recompute(self):
+        entry = self.service.state['AAA']
+        expected = self.service._frame(self.config, self.source.df.iloc[:self.source.rows])
+        pd.testing.assert_frame_equal(entry['frame'], expected, check_freq=False)
+
+        row = expected[['__1__', '__2__']].iloc[[-1]]
+        self.assertEqual(entry['signal']['signal'], int(entry['model'].predict(row)[0]))
+        return entry
+
+    def test_http_endpoints(self):
+        server = self.service.serve(port=0, background=True)
+        self.base = f'http://127.0.0.1:{server.server_port}'
+        try:
+            status, payload = self.request('/forecast?name=AAA')
+            self.assertEqual(status, 200)
+            entry = self.assert_state_matches_full_recompute()
+            self.assertEqual(payload['signals']['AAA']['signal'], entry['signal']['signal'])
+            self.assertEqual(self.service.metrics()['counts']['fits'], 1)
+
+            self.source.rows = 695
+            status, payload = self.request('/refresh', {'names': ['AAA']})
+            self.assertEqual((status, payload['refreshed']['AAA']['new_bars']), (200, 5))
+            self.assert_state_matches_full_recompute()
+
+            status, payload = self.request('/forecast', {'names': ['AAA']})
+            self.assertEqual(payload['signals']['AAA']['date'], self.source.df.index[694].isoformat())
+
+            self.assertEqual(self.request('/forecast?name=ZZZ')[0], 404)
+            self.assertEqual(self.request('/nothing')[0], 404)
+
+            status, payload = self.request('/metrics')
+            self.assertEqual(status, 200)
+            self.assertEqual(payload['configs']['AAA']['rows'], 695)
+            self.assertEqual(payload['counts']['errors'], 2)
+            self.assertEqual(set(payload['latency']), {'/forecast', '/refresh', 'other'})
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_concurrent_refreshes_are_coalesced(self):
+        self.service.warm()
+        self.source.rows, self.source.delay, self.source.calls = 695, 0.3, 0
+        barrier = threading.Barrier(4)
+
+        def refresh(_):
+            barrier.wait()
+            return self.service.refresh(['AAA'])['AAA']
+
+        with ThreadPoolExecutor(4) as pool:
+            summaries = list(pool.map(refresh, range(4)))
+
+        self.assertEqual(self.source.calls, 1)
+        self.assertEqual(self.service.metrics()['counts']['coalesced'], 3)
+        self.assertTrue(all(summary == summaries[0] for summary in summaries))
+        self.assert_state_matches_full_recompute()
+
+
+class LocalForecaster(MarketBehaviorForecasterLocal):
+    """
+    Execução individual com as classes de `MODULES`, sem baixar os scripts.
+    """
+
+    def _load_modules(self) -> dict:
+        return MODULES
+
+
+def without_timing(metrics: dict) -> dict:
+    """
+    Remove as medidas de tempo e memória das métricas de uma execução.
+    """
+    model = {split: {k: v for k, v in values.items() if k != 'timing'} for split, values in metrics['model'].items()}
+    return {'model': model, 'returns': metrics['returns']}
+
+
+class TestBatchForecaster(unittest.TestCase):
+
+    def setUp(self):
+        self.source = StubSource(prices_frame(700), 700)
+        kw = dict(start='2020-01-01', end='2021-06-01')
+        self.configs = [MarketForecastConfig('AAA', features=[1], **kw),
+                        MarketForecastConfig('AAA', features=[1, 2], ml_model='train_logistic_regression', **kw),
+                        MarketForecastConfig('AAA', features=[99], **kw),
+                        MarketForecastConfig('BBB', features=[1, 2, 3], p=2, **kw)]
+
+    def test_batch_equals_single_runs(self):
+        for max_workers in (1, 2):
+            with self.subTest(max_workers=max_workers):
+                self.source.calls = 0
+                batch = MarketBatchForecaster(self.configs, max_workers=max_workers, local=True, keep_frames=True,
+                                              prices=self.source, modules=MODULES).run()
+
+                # Os preços de cada ticker são carregados uma única vez
+                self.assertEqual(self.source.calls, 2)
+                self.assertEqual(list(batch['errors']), [2])
+                self.assertIn('__99__', batch['errors'][2])
+                self.assertIsNone(batch['runs'][2])
+                self.assertEqual(sorted(batch['metrics']['run_id'].unique()), [0, 1, 3])
+
+                for run_id in (0, 1, 3):
+                    single = LocalForecaster(**vars(self.configs[run_id])).run_forecast_local(
+                        prices=self.source.df)
+                    self.assertEqual(without_timing(batch['runs'][run_id]['metrics']),
+                                     without_timing(single['metrics']))
+                    pd.testing.assert_frame_equal(batch['runs'][run_id]['df']['df'], single['df']['df'])
+
+    def test_synthetic_config_matches_single_run(self):
+        # As trajetórias começam na segunda data do histórico
+        config = MarketForecastConfig('AAA', features=[1, 2], start='2020-01-02', end='2021-06-01',
+                                      synthetic_serie='block_bootstrap')
+        batch = MarketBatchForecaster([config], max_workers=1, local=True, keep_frames=True,
+                                      prices=self.source, modules=MODULES).run()
+        single = LocalForecaster(**vars(config)).run_forecast_local(prices=self.source.df)
+        self.assertEqual(without_timing(batch['runs'][0]['metrics']), without_timing(single['metrics']))
+        pd.testing.assert_frame_equal(batch['runs'][0]['df']['df'], single['df']['df'])
+
+        # A série sintética substitui os preços reais
+        df = single['df']['df']
+        self.assertFalse(np.allclose(df['Close'], self.source.df['Close'].loc[df.index]))
+
+
+class StubResponse:
+    """
+    Resposta HTTP mínima, no formato usado por `GitHubScriptLoader._response`.
+    """
+
+    def __init__(self, text: str = '', status_code: int = 200, etag: str = None):
+        self.text = text
+        self.status_code = status_code
+        self.headers = {'ETag': etag} if etag else {}
+
+    def raise_for_status(self):
+        pass
+
+
+class TestGitHubScriptLoader(unittest.TestCase):
+
+    SOURCE = 'class StubScript:\n    value = 1\n'
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.patches = [mock.patch.object(GitHubScriptLoader, 'CACHE_DIR', self.tmp.name),
+                        mock.patch.object(api.requests, 'get', side_effect=self.get)]
+        for patch in self.patches:
+            patch.start()
+        GitHubScriptLoader.clear_cache()
+        self.calls = []
+        self.status = 200
+
+    def tearDown(self):
+        for patch in self.patches:
+            patch.stop()
+        GitHubScriptLoader.clear_cache()
+        api.__dict__.pop('StubScript', None)
+        self.tmp.cleanup()
+
+    def get(self, url, headers=None):
+        self.calls.append(headers or {})
+        return StubResponse(self.SOURCE if self.status == 200 else '', self.status, etag='"v1"')
+
+    def load(self, **kwargs):
+        return GitHubScriptLoader('stub_script', **kwargs).object
+
+    def test_one_fetch_per_script(self):
+        loaded = self.load()
+        self.assertIs(self.load(), loaded)
+        self.assertEqual(len(self.calls), 1)
+
+        # Outro processo (cache de memória vazio) usa o código e o bytecode salvos em disco
+        GitHubScriptLoader.clear_cache()
+        self.assertEqual(self.load().value, 1)
+        self.assertEqual(len(self.calls), 1)
+        files = os.listdir(self.tmp.name)
+        self.assertIn(f'stub_script.{api.hashlib.sha256(self.SOURCE.encode()).hexdigest()[:16]}.'
+                      f'{sys.implementation.cache_tag}.bytecode', files)
+        self.assertFalse([f for f in files if f.endswith('.tmp')])
+
+    def test_ttl_revalidates_with_etag(self):
+        loaded = self.load()
+        with mock.patch.object(GitHubScriptLoader, 'CACHE_TTL', 0):
+            self.status = 304
+            self.assertIs(self.load(), loaded)
+        self.assertEqual(self.calls, [{}, {'If-None-Match': '"v1"'}])
+
+    def test_offline_uses_only_the_cache(self):
+        with self.assertRaises(FileNotFoundError):
+            self.load(offline=True)
+        self.assertEqual(self.calls, [])
+
+        self.load()
+        GitHubScriptLoader.clear_cache()
+        with mock.patch.object(GitHubScriptLoader, 'CACHE_TTL', 0):
+            self.assertEqual(self.load(offline=True).value, 1)
+        self.assertEqual(len(self.calls), 1)
+
+
+class TestStageCache(unittest.TestCase):
+
+    STAGES = ['targets', 'features', 'splits', 'model', 'returns']
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.prices = prices_frame(500)
+        self.kw = dict(features=[1, 2], start='2020-01-01', end='2021-01-01')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def run_config(self, cache: StageCache, **kw):
+        config = MarketForecastConfig('AAA', cache=cache is not None, **{**self.kw, **kw})
+        with mock.patch.object(MarketForecastConfig, 'stage_cache', cache):
+            return config._pipeline(self.prices, MODULES)
+
+    def assert_same_result(self, cached: dict, uncached: dict):
+        self.assertEqual(without_timing(cached['metrics']), without_timing(uncached['metrics']))
+        for split in ('train', 'test', 'after_test', 'df'):
+            pd.testing.assert_frame_equal(cached['df'][split], uncached['df'][split])
+
+    def test_hits_and_downstream_invalidation(self):
+        cache = StageCache(self.tmp.name)
+        first = self.run_config(cache)
+        self.assertEqual(first['cache'], dict.fromkeys(self.STAGES, 'miss'))
+        second = self.run_config(cache)
+        self.assertEqual(second['cache'], dict.fromkeys(self.STAGES, 'hit'))
+        self.assert_same_result(second, self.run_config(None))
+        self.assertEqual(cache.stats, {'hits': dict.fromkeys(self.STAGES, 1), 'misses': dict.fromkeys(self.STAGES, 1)})
+
+        # Cada parâmetro invalida apenas a sua etapa e as seguintes
+        for kw, first_miss in [({'ml_model': 'train_logistic_regression'}, 'model'), ({'contracts': 10}, 'returns'),
+                               ({'features': [1, 2, 3]}, 'features'), ({'p': 2}, 'targets')]:
+            with self.subTest(**kw):
+                result = self.run_config(cache, **kw)
+                position = self.STAGES.index(first_miss)
+                self.assertEqual(result['cache'], {stage: 'hit' if i < position else 'miss'
+                                                   for i, stage in enumerate(self.STAGES)})
+                self.assert_same_result(result, self.run_config(None, **kw))
+
+        # Outra sessão (memória vazia) reaproveita as entradas salvas em disco
+        self.assertEqual(self.run_config(StageCache(self.tmp.name))['cache'], dict.fromkeys(self.STAGES, 'hit'))
+
+
+class TestSyntheticForecaster(unittest.TestCase):
+
+    def test_sweep_matches_per_path_pipeline(self):
+        prices = prices_frame(700)
+        # As trajetórias começam na segunda data do histórico
+        config = MarketForecastConfig('AAA', features=[1, 2, 3], start='2020-01-02', end='2021-06-01')
+        forecaster = MarketSyntheticForecaster(config, n_paths=4, seed=3, max_workers=1, local=True, modules=MODULES)
+        synthetic = Synthetic(prices, 'block_bootstrap', seed=3)
+        model = config._pipeline(prices.loc[synthetic.index], MODULES)['model']
+        sweep = forecaster.sweep(model, prices=prices, batch_size=3)
+
+        # Pipeline completo em cada trajetória, com o mesmo modelo no lugar do ajuste
+        with mock.patch.object(Machines, config.ml_model, return_value=model):
+            for path, ohlc in enumerate(synthetic.paths(4)):
+                with self.subTest(path=path):
+                    result = config._pipeline(synthetic.frame(ohlc), MODULES)
+                    scores = sweep['paths'].loc[path]
+                    after_test = result['df']['after_test']
+                    self.assertEqual(scores['accuracy'], result['metrics']['model']['after_test']['accuracy'])
+                    self.assertEqual(scores['n_days'], len(after_test) - 1)
+                    self.assertAlmostEqual(scores['total'], after_test['resultado_predicao'].sum(), places=6)
+                    self.assertAlmostEqual(scores['mean'], after_test['resultado_predicao'].mean(), places=6)
+
+        p_value = sweep['summary']['p_value']
+        self.assertTrue(((p_value > 0) & (p_value <= 1)).all())
+        # Com 4 trajetórias, o p-valor é um múltiplo de 1/5
+        np.testing.assert_allclose(p_value * 5, np.round(p_value * 5))
+
+
+class TestModelRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.prices = prices_frame(500)
+        self.config = MarketForecastConfig('AAA', features=[1, 2], start='2020-01-01', end='2021-01-01', registry=True)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def run_config(self, prices: pd.DataFrame, **kw) -> dict:
+        with mock.patch.object(MarketForecastConfig, 'model_registry', ModelRegistry(self.tmp.name, **kw)):
+            return self.config._pipeline(prices, MODULES)
+
+    def revised(self, scale_after_end: float = 1.0) -> pd.DataFrame:
+        """
+        Preços com uma barra de treino revista e, opcionalmente, as barras após `end` multiplicadas.
+        """
+        prices = self.prices.copy()
+        prices.iloc[10, prices.columns.get_loc('Close')] *= 1.001
+        prices.loc[prices.index > self.config.end] *= scale_after_end
+        return prices
+
+    def test_reuse_invalidation_and_drift(self):
+        first = self.run_config(self.prices)
+        self.assertEqual((first['registry']['status'], first['registry']['reason']), ('fitted', 'new'))
+
+        # Mesmos dados de treino: o modelo salvo é carregado e as métricas não mudam
+        second = self.run_config(self.prices)
+        self.assertEqual(second['registry']['status'], 'loaded')
+        self.assertEqual(without_timing(second['metrics']), without_timing(first['metrics']))
+
+        # Dados de treino diferentes: com `max_age_days=0` (padrão), sempre há novo ajuste
+        revised = self.run_config(self.revised())
+        self.assertEqual((revised['registry']['status'], revised['registry']['reason']), ('fitted', 'schedule'))
+        self.assertEqual(self.run_config(self.revised())['registry']['status'], 'loaded')
+
+        # Sem agenda, o modelo salvo é mantido enquanto o PSI das features recentes fica abaixo do limite
+        self.run_config(self.prices)
+        kept = self.run_config(self.revised(), max_age_days=None, drift_threshold=0.5)
+        self.assertEqual(kept['registry']['status'], 'loaded')
+        self.assertLessEqual(max(kept['registry']['drift'].values()), 0.5)
+
+        drifted = self.run_config(self.revised(scale_after_end=10), max_age_days=None, drift_threshold=0.5)
+        self.assertEqual((drifted['registry']['status'], drifted['registry']['reason']), ('fitted', 'drift'))
+        self.assertGreater(max(drifted['registry']['drift'].values()), 0.5)
+
+
+if __name__ == '__main__':
+    unittest.main()